@@ -0,0 +1,16 @@
+from typing import List
+from fastapi import APIRouter
+from app import schemas
+from app.read_cache import cache_stats
+from app.query_guard import query_budget
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get("/stats", response_model=List[schemas.ReadCacheStats])
+@query_budget(0)
+async def get_cache_stats():
+    """
+    読み取りキャッシュ（媒体詳細・学習項目詳細）の統計情報を取得する
+    """
+    return cache_stats()
@@ -0,0 +1,27 @@
+from datetime import date
+from typing import Literal
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from app.export import EXPORT_MEDIA_TYPES, stream_export
+from app.query_guard import query_budget
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("")
+@query_budget(0)
+async def export_study_history(format: Literal["ndjson", "csv"] = "ndjson"):
+    """
+    学習履歴全体をストリーミングでエクスポートする
+
+    - ndjson: 媒体・学習項目・復習タスクの全行（1行1レコード、type 列付き）
+    - csv: 復習タスク1件1行に学習項目と媒体の列を付けた学習履歴
+
+    行はカーソルから少しずつ読み込んで送るため、件数に関わらずメモリ使用量は一定
+    """
+    filename = f"ars-export-{date.today():%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream_export(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
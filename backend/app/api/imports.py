@@ -0,0 +1,60 @@
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.importer import IMPORT_FORMATS, stream_import
+from app.query_guard import query_budget
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+# アップロードを一時ファイルに書き出す単位（バイト）
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _save_upload(source: BinaryIO, suffix: str) -> Path:
+    """アップロードを一時ファイルにコピーしてパスを返す（ブロッキングなのでスレッドプールで呼ぶ）"""
+    source.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="ars-import-", suffix=suffix, delete=False) as upload:
+        shutil.copyfileobj(source, upload, UPLOAD_CHUNK_SIZE)
+    return Path(upload.name)
+
+
+@router.post("")
+@query_budget(0)
+async def import_deck(
+    file: UploadFile,
+    format: Optional[Literal["csv", "apkg"]] = None,
+    source_title: Optional[str] = Query(None, min_length=1, max_length=255),
+    daily_cap: Optional[int] = Query(None, ge=0),
+):
+    """
+    CSV または Anki のデッキ（.apkg）をインポートする
+
+    デッキ（CSV の source/deck 列）を媒体、ノート（行）を学習項目として
+    チャンクごとのトランザクションで登録し、進捗を NDJSON でストリーミングする。
+    format を省略するとファイル名の拡張子から判定する。
+    CSV の媒体名の既定値は source_title（省略時はファイル名）
+    """
+    suffix = Path(file.filename or "").suffix.lower()
+    format = format or IMPORT_FORMATS.get(suffix)
+    if format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot determine import format; specify format=csv or format=apkg"
+        )
+
+    # レスポンスの送信中も読み込むため、アップロードを自前の一時ファイルに移す
+    # （大きなデッキのコピーでイベントループを止めないようスレッドプールで行う）
+    path = await run_in_threadpool(_save_upload, file.file, suffix)
+
+    default_source = source_title or Path(file.filename or "").stem or "Import"
+    return StreamingResponse(
+        stream_import(path, format, default_source, daily_cap=daily_cap),
+        media_type="application/x-ndjson",
+        # ストリーミングが始まる前に切断された場合も一時ファイルを削除する
+        background=BackgroundTask(path.unlink, missing_ok=True)
+    )
@@ -1,64 +1,265 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import json
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Any, AsyncIterator, List, Literal, Optional
 from app import crud, schemas
-from app.database import get_db
+from app.async_crud import run_crud
+from app.database import DbSession, get_db
+from app.http_cache import make_etag, not_modified, set_cache_headers
+from app.serialization import fast_json_response, rows_to_dicts
+from app.query_guard import query_budget
 
 router = APIRouter(prefix="/learning-items", tags=["learning_items"])
 
+# 一括作成で1トランザクションにまとめる件数
+BULK_CHUNK_SIZE = 1000
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
 
 @router.post("/", response_model=schemas.LearningItemWithTasks, status_code=status.HTTP_201_CREATED)
-def create_learning_item(
+@query_budget(6)
+async def create_learning_item(
     item: schemas.LearningItemCreate,
-    db: Session = Depends(get_db)
+    daily_cap: Optional[int] = Query(None, ge=0),
+    db: DbSession = Depends(get_db)
 ):
     """
     新規学習項目を作成し、復習タスクを自動生成する
+
+    daily_cap を指定すると、1日の復習件数がそれを超えないよう
+    Pending タスクの予定日を許容範囲内でずらす（0 ならずらさない）
     """
-    db_item = crud.create_learning_item(db=db, item=item)
+    db_item = await run_crud(db, crud.create_learning_item, item=item, daily_cap=daily_cap)
+    if db_item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Source not found"
+        )
     return db_item
 
 
+async def _iter_ndjson(request: Request) -> AsyncIterator[Any]:
+    """NDJSON のリクエストボディを1行ずつ読み込む（不正な行は None）"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_json_line(line)
+    if buffer.strip():
+        yield _parse_json_line(buffer)
+
+
+def _parse_json_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+async def _iter_json_array(request: Request) -> AsyncIterator[Any]:
+    """JSON 配列のリクエストボディを要素ごとに返す"""
+    try:
+        rows = await request.json()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be a JSON array"
+        )
+    if not isinstance(rows, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be a JSON array"
+        )
+    for row in rows:
+        yield row
+
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+        for error in e.errors()
+    )
+
+
+@router.post("/bulk", response_model=schemas.LearningItemBulkResponse)
+@query_budget(None)  # BULK_CHUNK_SIZE 件ごとにクエリを発行するため件数に比例する
+async def bulk_create_learning_items(
+    request: Request,
+    daily_cap: Optional[int] = Query(None, ge=0),
+    db: DbSession = Depends(get_db)
+):
+    """
+    学習項目を一括作成し、復習タスクを自動生成する
+
+    リクエストボディは学習項目作成スキーマの JSON 配列、または
+    Content-Type: application/x-ndjson の NDJSON（1行1項目、ストリーミング読み込み）。
+    BULK_CHUNK_SIZE 件ごとに1トランザクションで登録し、行ごとの結果を返す。
+    daily_cap を指定すると、チャンクごとにまとめて予定日をずらして1日の件数を抑える。
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    rows = _iter_ndjson(request) if content_type in NDJSON_MEDIA_TYPES else _iter_json_array(request)
+
+    results: List[schemas.LearningItemBulkResult] = []
+    chunk: List[tuple[int, schemas.LearningItemCreate]] = []
+
+    async def flush_chunk():
+        try:
+            item_ids = await run_crud(
+                db, crud.bulk_create_learning_items, [item for _, item in chunk],
+                daily_cap=daily_cap
+            )
+        except SQLAlchemyError:
+            item_ids = None
+        for position, (index, _) in enumerate(chunk):
+            if item_ids is None:
+                results.append(schemas.LearningItemBulkResult(index=index, error="Database error"))
+            elif item_ids[position] is None:
+                results.append(schemas.LearningItemBulkResult(index=index, error="Source not found"))
+            else:
+                results.append(schemas.LearningItemBulkResult(index=index, id=item_ids[position]))
+        chunk.clear()
+
+    index = 0
+    async for row in rows:
+        if row is None:
+            results.append(schemas.LearningItemBulkResult(index=index, error="Invalid JSON"))
+        else:
+            try:
+                chunk.append((index, schemas.LearningItemCreate.model_validate(row)))
+            except ValidationError as e:
+                results.append(schemas.LearningItemBulkResult(
+                    index=index, error=_format_validation_error(e)
+                ))
+        index += 1
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await flush_chunk()
+    if chunk:
+        await flush_chunk()
+
+    results.sort(key=lambda result: result.index)
+    created = sum(1 for result in results if result.id is not None)
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+
 @router.get("/", response_model=schemas.LearningItemListResponse)
-def get_learning_items(
+@query_budget(2)
+async def get_learning_items(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    source_id: Optional[int] = None,
+    due_before: Optional[date] = None,
+    stage: Optional[int] = Query(None, ge=0),
+    status_filter: Optional[Literal["Pending", "Ready", "Completed"]] = Query(None, alias="status"),
+    sort: Literal["created", "next_due", "title"] = "created",
+    db: DbSession = Depends(get_db)
 ):
     """
     学習項目の一覧を取得する
+
+    cursor に前ページの next_cursor を指定すると続きから取得する（skip は無視される）。
+    include_total=false の場合は総件数を数えず total は null になる。
+    source_id（媒体）、due_before（次の復習の予定日がこの日以前）、
+    stage（次の復習のステージのオフセット日数）、status（この状態の復習タスクを持つ）で絞り込み、
+    sort で並べ替える（created: 新しい順、next_due: 次の復習が近い順、title: タイトル順）。
+    cursor は同じ絞り込み・並び順で使うこと。
+    """
+    try:
+        items, total, next_cursor = await run_crud(
+            db, crud.get_learning_items,
+            skip=skip, limit=limit, cursor=cursor, include_total=include_total,
+            source_id=source_id, due_before=due_before, stage=stage, status=status_filter,
+            sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return fast_json_response({
+        "items": rows_to_dicts(items),
+        "total": total,
+        "next_cursor": next_cursor
+    })
+
+
+@router.get("/search", response_model=schemas.LearningItemSearchResponse)
+@query_budget(1)
+async def search_learning_items(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: DbSession = Depends(get_db)
+):
+    """
+    学習項目をタイトル・内容・媒体名で全文検索する
+
+    空白で区切った検索語をすべて含む項目を関連度の高い順に返す（3文字以上の検索語が必要）。
+    cursor に前ページの next_cursor を指定すると続きから取得する。
     """
-    items, total = crud.get_learning_items(db=db, skip=skip, limit=limit)
-    return {"items": items, "total": total}
+    try:
+        items, next_cursor = await run_crud(
+            db, crud.search_learning_items, q=q, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return fast_json_response({"items": items, "next_cursor": next_cursor})
 
 
 @router.get("/{item_id}", response_model=schemas.LearningItemWithTasks)
-def get_learning_item(
+@query_budget(2)
+async def get_learning_item(
     item_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: DbSession = Depends(get_db)
 ):
     """
     学習項目の詳細を取得する（復習タスク含む）
+
+    ETag を返し、If-None-Match が一致すれば 304 を返す
     """
-    db_item = crud.get_learning_item(db=db, item_id=item_id)
+    version = await run_crud(db, crud.get_learning_item_version, item_id=item_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Learning item not found"
+        )
+    etag = make_etag("item", item_id, *version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    db_item = await run_crud(db, crud.get_learning_item_detail, item_id=item_id, version=version)
     if db_item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Learning item not found"
         )
+    set_cache_headers(response, etag)
     return db_item
 
 
 @router.put("/{item_id}", response_model=schemas.LearningItem)
-def update_learning_item(
+@query_budget(5)
+async def update_learning_item(
     item_id: int,
     item_update: schemas.LearningItemUpdate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """
     学習項目を更新する
     """
-    db_item = crud.update_learning_item(db=db, item_id=item_id, item_update=item_update)
+    db_item = await run_crud(db, crud.update_learning_item, item_id=item_id, item_update=item_update)
     if db_item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,14 +269,15 @@ def update_learning_item(
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_learning_item(
+@query_budget(3)
+async def delete_learning_item(
     item_id: int,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """
     学習項目を削除する（復習タスクもカスケード削除される）
     """
-    success = crud.delete_learning_item(db=db, item_id=item_id)
+    success = await run_crud(db, crud.delete_learning_item, item_id=item_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
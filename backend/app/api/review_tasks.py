@@ -1,40 +1,191 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from datetime import date
+from typing import List, Optional
 from app import crud, schemas
-from app.database import get_db
+from app.async_crud import run_crud
+from app.database import DbSession, get_db
+from app.events import broker, format_sse
+from app.http_cache import make_etag, not_modified, set_cache_headers
+from app.serialization import fast_json_response, rows_to_dicts
+from app.rollover import ensure_rollover_async
+from app.query_guard import query_budget
 
 router = APIRouter(prefix="/review-tasks", tags=["review_tasks"])
 
 
-@router.get("/today", response_model=List[schemas.ReviewTask])
-def get_today_review_tasks(db: Session = Depends(get_db)):
+# /today の fields パラメータで指定できる追加フィールド
+TODAY_OPTIONAL_FIELDS = {"content"}
+
+# /stream でイベントがないときにコメントを送る間隔（秒）
+STREAM_HEARTBEAT_SECONDS = 15
+
+# /stream の1接続の最大時間（秒）。切断後は EventSource が自動で再接続する
+STREAM_MAX_DURATION_SECONDS = 300
+
+# 再接続までの待ち時間（ミリ秒）
+STREAM_RETRY_MILLISECONDS = 1000
+
+
+@router.get("/today", response_model=List[schemas.ReviewTaskWithItem])
+@query_budget(4)
+async def get_today_review_tasks(
+    request: Request,
+    fields: Optional[str] = None,
+    db: DbSession = Depends(get_db)
+):
     """
     今日の復習タスクを取得する
     （due_date が今日以前で未完了のタスク）
 
-    自動的に Pending → Ready の更新も行う
+    学習項目のタイトルと内容の先頭部分を含む。
+    fields=content を指定すると学習項目の内容全体も含める。
+
+    Pending → Ready の更新は日付切り替えジョブが行うため読み取りのみ。
+    ETag を返し、If-None-Match が一致すれば 304 を返す
+    """
+    requested = {field.strip() for field in fields.split(",") if field.strip()} if fields else set()
+    unknown = requested - TODAY_OPTIONAL_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    await ensure_rollover_async()
+    version = await run_crud(db, crud.get_today_version)
+    etag = make_etag("today", date.today(), *version, *sorted(requested))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    rows = await run_crud(
+        db, crud.get_today_review_tasks, include_content="content" in requested
+    )
+    return set_cache_headers(fast_json_response(rows_to_dicts(rows)), etag)
+
+
+@router.get("/forecast", response_model=schemas.ReviewForecast)
+@query_budget(5)
+async def get_review_forecast(
+    request: Request,
+    days: int = Query(90, ge=1, le=730),
+    db: DbSession = Depends(get_db)
+):
+    """
+    今日から days 日間の日ごとの復習タスク数を予測する
+
+    予定日が過ぎた未完了のタスクは今日に数える。
+    1年ごとのタスクは完了時に生成される次のタスクも含める
     """
-    tasks = crud.get_today_review_tasks(db=db)
+    await ensure_rollover_async()
+    version = await run_crud(db, crud.get_today_version)
+    etag = make_etag("forecast", date.today(), days, *version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
 
-    # レスポンスに学習項目の情報を追加
-    result = []
-    for task in tasks:
-        task_dict = schemas.ReviewTask.model_validate(task).model_dump()
-        result.append(task_dict)
+    forecast = await run_crud(db, crud.get_review_forecast, days=days)
+    return set_cache_headers(fast_json_response({
+        "days": [
+            {"due_date": due_date.isoformat(), "count": count}
+            for due_date, count in forecast
+        ],
+        "total": sum(count for _, count in forecast)
+    }), etag)
 
-    return result
+
+@router.get("/stream")
+@query_budget(0)
+async def stream_review_task_events(
+    timeout: float = Query(STREAM_MAX_DURATION_SECONDS, gt=0, le=3600)
+):
+    """
+    今日のタスクの変更を Server-Sent Events で配信する
+
+    接続直後に reset を送るので、クライアントは受け取ったら /today を取得し、
+    以降は task_ready（追加・更新）・task_completed（削除）・yearly_task_created の
+    差分を適用する。reset を受け取ったら再度 /today を取得する。
+    timeout 秒で接続を閉じる（EventSource は retry の間隔で再接続する）
+    """
+    async def event_stream():
+        subscription = broker.subscribe()
+        try:
+            yield f"retry: {STREAM_RETRY_MILLISECONDS}\n\n"
+            yield format_sse(0, "reset", {"reason": "connected"})
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while (remaining := deadline - loop.time()) > 0:
+                event = await subscription.get(min(remaining, STREAM_HEARTBEAT_SECONDS))
+                yield format_sse(*event) if event else ": keep-alive\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # プロキシ（nginx）にバッファリングさせない
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/complete-batch", response_model=schemas.ReviewTaskBatchResponse)
+@query_budget(10)
+async def complete_review_tasks(
+    batch: schemas.ReviewTaskBatchComplete,
+    db: DbSession = Depends(get_db)
+):
+    """
+    復習タスクをまとめて完了する（1トランザクション）
+
+    タスクごとに completed / already_completed / not_found を返す。
+    grade（0〜5）は適応型スケジューラで残りのタスクの間隔の調整に使う
+    """
+    outcomes = await run_crud(
+        db,
+        crud.complete_review_tasks,
+        completions=[(item.task_id, item.completed_at) for item in batch.items],
+        grades={item.task_id: item.grade for item in batch.items if item.grade is not None}
+    )
+    return {
+        "results": [
+            {"task_id": task_id, "outcome": outcome}
+            for task_id, outcome in outcomes.items()
+        ]
+    }
+
+
+@router.post("/uncomplete-batch", response_model=schemas.ReviewTaskBatchResponse)
+@query_budget(5)
+async def uncomplete_review_tasks(
+    batch: schemas.ReviewTaskBatchUncomplete,
+    db: DbSession = Depends(get_db)
+):
+    """
+    復習タスクの完了をまとめて取り消す（1トランザクション）
+
+    タスクごとに uncompleted / not_found を返す
+    """
+    outcomes = await run_crud(db, crud.uncomplete_review_tasks, task_ids=batch.task_ids)
+    return {
+        "results": [
+            {"task_id": task_id, "outcome": outcome}
+            for task_id, outcome in outcomes.items()
+        ]
+    }
 
 
 @router.get("/{task_id}", response_model=schemas.ReviewTask)
-def get_review_task(
+@query_budget(1)
+async def get_review_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """
     復習タスクの詳細を取得する
     """
-    task = crud.get_review_task(db=db, task_id=task_id)
+    task = await run_crud(db, crud.get_review_task, task_id=task_id)
     if task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -44,18 +195,21 @@ def get_review_task(
 
 
 @router.post("/{task_id}/complete", response_model=schemas.ReviewTask)
-def complete_review_task(
+@query_budget(10)
+async def complete_review_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    grade: Optional[int] = Query(None, ge=0, le=5),
+    db: DbSession = Depends(get_db)
 ):
     """
     復習タスクを完了する
 
     1年ごとのタスク（365, 730, 1095, ...日）の場合、
-    次の1年後タスクを自動生成する
+    次の1年後タスクを自動生成する。
+    grade（0〜5）は適応型スケジューラで残りのタスクの間隔の調整に使う
     """
     try:
-        task = crud.complete_review_task(db=db, task_id=task_id)
+        task = await run_crud(db, crud.complete_review_task, task_id=task_id, grade=grade)
         if task is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -70,14 +224,15 @@ def complete_review_task(
 
 
 @router.post("/{task_id}/uncomplete", response_model=schemas.ReviewTask)
-def uncomplete_review_task(
+@query_budget(7)
+async def uncomplete_review_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """
     復習タスクの完了を取り消す（誤操作対応）
     """
-    task = crud.uncomplete_review_task(db=db, task_id=task_id)
+    task = await run_crud(db, crud.uncomplete_review_task, task_id=task_id)
     if task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,64 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from typing import Optional
 from app import crud, schemas
-from app.database import get_db
+from app.async_crud import run_crud
+from app.database import DbSession, get_db
+from app.http_cache import make_etag, not_modified, set_cache_headers
+from app.serialization import fast_json_response, rows_to_dicts
+from app.query_guard import query_budget
 
 router = APIRouter(prefix="/sources", tags=["sources"])
 
 
 @router.post("/", response_model=schemas.Source, status_code=status.HTTP_201_CREATED)
-def create_source(
+@query_budget(3)
+async def create_source(
     source: schemas.SourceCreate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """
     新規媒体（書籍・教材など）を作成する
     """
-    db_source = crud.create_source(db=db, source=source)
+    db_source = await run_crud(db, crud.create_source, source=source)
     return db_source
 
 
 @router.get("/", response_model=schemas.SourceListResponse)
-def get_sources(
+@query_budget(2)
+async def get_sources(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    db: DbSession = Depends(get_db)
 ):
     """
     媒体の一覧を取得する
+
+    cursor に前ページの next_cursor を指定すると続きから取得する（skip は無視される）。
+    include_total=false の場合は総件数を数えず total は null になる。
     """
-    sources, total = crud.get_sources(db=db, skip=skip, limit=limit)
-    return {"items": sources, "total": total}
+    try:
+        sources, total, next_cursor = await run_crud(
+            db, crud.get_sources,
+            skip=skip, limit=limit, cursor=cursor, include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return fast_json_response({
+        "items": rows_to_dicts(sources),
+        "total": total,
+        "next_cursor": next_cursor
+    })
 
 
 @router.get("/{source_id}", response_model=schemas.SourceWithItems)
-def get_source(
+@query_budget(3)
+async def get_source(
     source_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: DbSession = Depends(get_db)
 ):
     """
     媒体の詳細を取得する（学習項目含む）
+
+    ETag を返し、If-None-Match が一致すれば 304 を返す
     """
-    db_source = crud.get_source(db=db, source_id=source_id)
+    version = await run_crud(db, crud.get_source_version, source_id=source_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Source not found"
+        )
+    etag = make_etag("source", source_id, *version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    db_source = await run_crud(db, crud.get_source_detail, source_id=source_id, version=version)
     if db_source is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Source not found"
         )
+    set_cache_headers(response, etag)
     return db_source
 
 
 @router.put("/{source_id}", response_model=schemas.Source)
-def update_source(
+@query_budget(4)
+async def update_source(
     source_id: int,
     source_update: schemas.SourceUpdate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """
     媒体を更新する
     """
-    db_source = crud.update_source(db=db, source_id=source_id, source_update=source_update)
+    db_source = await run_crud(db, crud.update_source, source_id=source_id, source_update=source_update)
     if db_source is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,14 +109,15 @@ def update_source(
 
 
 @router.delete("/{source_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_source(
+@query_budget(4)
+async def delete_source(
     source_id: int,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """
     媒体を削除する（学習項目・復習タスクもカスケード削除される）
     """
-    success = crud.delete_source(db=db, source_id=source_id)
+    success = await run_crud(db, crud.delete_source, source_id=source_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,32 @@
+from typing import Any, Callable, TypeVar, Union
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+async def run_crud(
+    db: Union[Session, AsyncSession],
+    func: Callable[..., T],
+    *args: Any,
+    **kwargs: Any
+) -> T:
+    """
+    crud の関数を非同期に実行する
+
+    AsyncSession の場合は run_sync でイベントループ上で実行し、
+    Session の場合はスレッドプールで実行する。
+    crud の関数は第1引数にセッションを受け取ること。
+
+    Args:
+        db: データベースセッション（同期・非同期どちらでも可）
+        func: 実行する crud の関数
+        *args, **kwargs: func に渡すセッション以外の引数
+
+    Returns:
+        func の戻り値
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args, **kwargs)
+    return await run_in_threadpool(func, db, *args, **kwargs)
@@ -0,0 +1,30 @@
+"""
+既存の学習項目を遅延生成モードに変換する
+
+全ステージを作成済みの学習項目について、予定日が未到来の Pending タスクを
+次の1件だけ残して削除する。新規の学習項目も遅延生成にするには
+REVIEW_TASK_STORAGE=lazy を設定すること。
+
+    python -m app.collapse_review_tasks [--batch-size N]
+"""
+import argparse
+from app import crud
+from app.database import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Collapse pending review tasks into lazy storage")
+    parser.add_argument("--batch-size", type=int, default=10000,
+                        help="learning items per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        converted, deleted = crud.collapse_pending_review_tasks(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Converted {converted} learning items, deleted {deleted} pending review tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,68 @@ load_dotenv()
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:////app/data/ars.db")
 
+# SQLite tuning (applied to every new connection)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))  # negative = KiB (about 64MB)
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milliseconds
+
+# Use the async database stack (create_async_engine + aiosqlite)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Connection pool configuration
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Review task storage for new learning items
+# - "eager": create every stage of REVIEW_SCHEDULE as a row up front
+# - "lazy": store only due stages plus the next one; the rollover job
+#   materializes later stages as they come due (items created with load
+#   smoothing still store every stage to keep their shifted due dates)
+REVIEW_TASK_STORAGE = os.getenv("REVIEW_TASK_STORAGE", "eager").lower()
+if REVIEW_TASK_STORAGE not in ("eager", "lazy"):
+    raise ValueError(f"Invalid REVIEW_TASK_STORAGE: {REVIEW_TASK_STORAGE}")
+
+# Scheduling engine for due dates after completion ("fixed" or "sm2")
+SCHEDULER_NAMES = ("fixed", "sm2")  # keys of scheduler.SCHEDULERS
+SCHEDULER = os.getenv("SCHEDULER", "fixed").lower()
+if SCHEDULER not in SCHEDULER_NAMES:
+    raise ValueError(f"Invalid SCHEDULER: {SCHEDULER}")
+# Lazy storage computes stages that are not stored yet as start_date + fixed
+# offset, so an adaptive scheduler would silently ignore grades for them
+if SCHEDULER == "sm2" and REVIEW_TASK_STORAGE == "lazy":
+    raise ValueError("SCHEDULER=sm2 cannot be used with REVIEW_TASK_STORAGE=lazy")
+
+# Load smoothing for new review tasks
+# - LOAD_BALANCE_DAILY_CAP: target maximum number of reviews per day (0 = disabled)
+# - LOAD_BALANCE_TOLERANCE: how far a due date may move, as a fraction of
+#   stage_offset_days (0.15 moves a 30-day review by up to 4 days)
+LOAD_BALANCE_DAILY_CAP = int(os.getenv("LOAD_BALANCE_DAILY_CAP", "0"))
+LOAD_BALANCE_TOLERANCE = float(os.getenv("LOAD_BALANCE_TOLERANCE", "0.15"))
+
+# In-process read cache for source and learning item detail
+# (entries are also checked against the change counters, so other
+# workers' writes are never served stale)
+READ_CACHE_MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", "1024"))  # 0 = disabled
+READ_CACHE_TTL_SECONDS = float(os.getenv("READ_CACHE_TTL_SECONDS", "300"))
+
+# Request metrics (Prometheus-format /metrics endpoint and Server-Timing headers)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# N+1 query guard for tests and debugging
+# - "off": disabled
+# - "log": log a warning when a request exceeds its query budget or repeats a statement
+# - "raise": fail the request instead (use in tests)
+QUERY_GUARD = os.getenv("QUERY_GUARD", "off").lower()
+if QUERY_GUARD not in ("off", "log", "raise"):
+    raise ValueError(f"Invalid QUERY_GUARD: {QUERY_GUARD}")
+QUERY_GUARD_DEFAULT_BUDGET = int(os.getenv("QUERY_GUARD_DEFAULT_BUDGET", "10"))  # routes without query_budget
+QUERY_GUARD_MAX_REPEATS = int(os.getenv("QUERY_GUARD_MAX_REPEATS", "3"))  # same statement per request
+
+# Per-request SQL instrumentation (needed by the metrics and the query guard)
+REQUEST_INSTRUMENTATION = METRICS_ENABLED or QUERY_GUARD != "off"
+
 # Ensure data directory exists
 data_dir = Path("/app/data")
 data_dir.mkdir(parents=True, exist_ok=True)
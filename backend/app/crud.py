@@ -1,8 +1,387 @@
-from sqlalchemy.orm import Session, joinedload
-from datetime import date, datetime, timedelta
-from typing import List, Optional
-from app import models, schemas
-from app.scheduler import generate_review_tasks, generate_next_yearly_task
+import base64
+import html
+import json
+import numpy as np
+from sqlalchemy import Date, Integer, and_, case, cast, delete, func, insert, literal, literal_column, null, or_, select, text, tuple_, union_all, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session, Query, joinedload
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+from app import config, models, schemas
+from app.events import broker
+from app.read_cache import learning_item_cache, source_cache
+from app.serialization import model_columns, rows_to_dicts, schema_columns
+from app.scheduler import (
+    REVIEW_SCHEDULE,
+    YEARLY_OFFSET_DAYS,
+    FixedScheduler,
+    balance_due_dates,
+    generate_due_review_tasks,
+    generate_next_yearly_task,
+    generate_pending_review_tasks,
+    generate_review_tasks,
+    get_scheduler,
+    load_balance_tolerance,
+)
+
+# 今日のタスク一覧に含める学習項目の内容の先頭文字数
+CONTENT_PREVIEW_LENGTH = 100
+
+# 全文検索で索引を使える検索語の最小文字数（trigram トークナイザ）
+SEARCH_MIN_TERM_LENGTH = 3
+
+# 全文検索のスニペットのトークン数（trigram ではほぼ文字数、上限は 64）
+SEARCH_SNIPPET_TOKENS = 48
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def _mark_due_tasks_ready(
+    tasks_data: List[dict],
+    today: Optional[date] = None
+) -> List[dict]:
+    """
+    予定日が到来済みの Pending タスクを Ready にする
+
+    Pending → Ready の更新は日付切り替え時にまとめて行うため、
+    過去の開始日で作成されたタスクは作成時点で Ready にしておく
+    """
+    today = today if today else date.today()
+    for task_data in tasks_data:
+        if task_data["status"] == "Pending" and task_data["due_date"] <= today:
+            task_data["status"] = "Ready"
+    return tasks_data
+
+
+def _daily_cap(daily_cap: Optional[int]) -> int:
+    """負荷の平準化の1日の件数の上限（省略時は config.LOAD_BALANCE_DAILY_CAP）"""
+    return config.LOAD_BALANCE_DAILY_CAP if daily_cap is None else daily_cap
+
+
+def _initial_review_tasks(
+    learning_item_id: Optional[int],
+    start_date: date,
+    today: date,
+    daily_cap: Optional[int] = None
+) -> tuple[List[dict], Optional[int]]:
+    """
+    新規学習項目の復習タスクを保存方式（config.REVIEW_TASK_STORAGE）に従って生成する
+
+    予定日をずらす場合（daily_cap）は、ずらした予定日を保存しておくため
+    遅延生成モードでも全ステージを生成する
+
+    Args:
+        learning_item_id: 学習項目ID（一括作成では後から設定する）
+        start_date: 学習開始日
+        today: 基準日
+        daily_cap: 予定日をずらして抑える1日の復習件数の上限
+
+    Returns:
+        (生成する復習タスクのリスト, 学習項目の materialized_through)
+    """
+    if config.REVIEW_TASK_STORAGE == "lazy" and not _daily_cap(daily_cap):
+        tasks_data, materialized_through = generate_due_review_tasks(
+            learning_item_id, start_date, today
+        )
+    else:
+        tasks_data, materialized_through = generate_review_tasks(learning_item_id, start_date), None
+    return _mark_due_tasks_ready(tasks_data, today), materialized_through
+
+
+def _balance_review_tasks(
+    db: Session,
+    tasks_data: List[dict],
+    today: date,
+    daily_cap: Optional[int] = None
+) -> None:
+    """
+    新規の Pending タスクの予定日をずらし、1日の復習件数を上限以下に抑える
+
+    既存の負荷は予測（get_review_forecast）の日ごとの件数を1回だけ取得して使う
+
+    Args:
+        db: データベースセッション
+        tasks_data: 新規に作成する復習タスクの辞書のリスト（due_date を書き換える）
+        today: 基準日
+        daily_cap: 1日の件数の上限（省略時は config.LOAD_BALANCE_DAILY_CAP、0 なら何もしない）
+    """
+    daily_cap = _daily_cap(daily_cap)
+    pending = [task for task in tasks_data if task["status"] == "Pending"]
+    if not daily_cap or not pending:
+        return
+
+    last_day = max(
+        task["due_date"] + timedelta(days=load_balance_tolerance(task["stage_offset_days"]))
+        for task in pending
+    )
+    daily_load = dict(get_review_forecast(db, (last_day - today).days + 1, today=today))
+    balance_due_dates(pending, daily_load, daily_cap, earliest=today + timedelta(days=1))
+
+
+# 一覧の更新で1回の UPDATE にまとめる学習項目数（SQLite の変数の上限より小さくする）
+NEXT_REVIEW_REFRESH_CHUNK_SIZE = 10000
+
+
+def _next_review(tasks_data: List[dict]) -> tuple[Optional[date], Optional[int]]:
+    """
+    作成する復習タスクから次の復習の (予定日, ステージのオフセット日数) を求める
+
+    遅延生成モードでも次に予定日が来るステージまでは実体化されるため、
+    作成するタスクだけで決まる
+    """
+    upcoming = [
+        (task["due_date"], task["stage_offset_days"])
+        for task in tasks_data if task["status"] != "Completed"
+    ]
+    return min(upcoming) if upcoming else (None, None)
+
+
+def _refresh_next_reviews(db: Session, item_ids) -> None:
+    """
+    学習項目の next_due_date / next_stage_offset_days を復習タスクから更新する
+    （復習タスクを変更した書き込みのトランザクション内で、commit 前に呼ぶ。
+    媒体詳細の学習項目も変わるため learning_items の変更カウンタも進めること）
+
+    未完了のタスクがなければ、遅延生成モードの未生成の次のステージを使う
+
+    Args:
+        db: データベースセッション
+        item_ids: 復習タスクを変更した学習項目ID
+    """
+    item = models.LearningItem
+    task = models.ReviewTask
+    next_task = select(task.due_date, task.stage_offset_days)\
+        .where(task.learning_item_id == item.id, task.status != "Completed")\
+        .order_by(task.due_date, task.stage_offset_days)\
+        .limit(1)
+    virtual_offset = case(*[
+        (item.materialized_through < offset, offset) for _, offset in REVIEW_SCHEDULE
+    ])
+    virtual_due = case((
+        item.materialized_through < YEARLY_OFFSET_DAYS,
+        func.date(item.start_date, func.printf("+%d days", virtual_offset), type_=Date)
+    ))
+    values = {
+        "next_due_date": func.coalesce(
+            next_task.with_only_columns(task.due_date).scalar_subquery(), virtual_due
+        ),
+        "next_stage_offset_days": func.coalesce(
+            next_task.with_only_columns(task.stage_offset_days).scalar_subquery(), virtual_offset
+        ),
+        # 復習の進行はユーザーの編集ではないため updated_at は変えない
+        "updated_at": item.updated_at,
+    }
+    item_ids = list(item_ids)
+    for start in range(0, len(item_ids), NEXT_REVIEW_REFRESH_CHUNK_SIZE):
+        db.query(item)\
+            .filter(item.id.in_(item_ids[start:start + NEXT_REVIEW_REFRESH_CHUNK_SIZE]))\
+            .update(values, synchronize_session=False)
+
+
+def _encode_cursor(value, id: int) -> str:
+    """一覧の最終行の (並べ替えの値, id) からページネーション用カーソルを作る"""
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    payload = json.dumps([value, id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor: str, column=None) -> tuple:
+    """
+    ページネーション用カーソルを (並べ替えの値, id) に戻す
+
+    Args:
+        cursor: カーソル
+        column: 並べ替えのカラム（省略時は created_at。値の型を決める）
+
+    Raises:
+        ValueError: カーソルが不正な場合
+    """
+    python_type = column.type.python_type if column is not None else datetime
+    try:
+        value, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if value is not None and python_type in (date, datetime):
+            value = python_type.fromisoformat(value)
+        elif not isinstance(value, (str, type(None))):
+            raise TypeError(value)
+        return value, int(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _encode_search_cursor(rank: float, id: int) -> str:
+    """検索結果の最終行 (rank, id) からページネーション用カーソルを作る"""
+    return base64.urlsafe_b64encode(json.dumps([rank, id]).encode()).decode()
+
+
+def _decode_search_cursor(cursor: str) -> tuple[float, int]:
+    """
+    検索結果のページネーション用カーソルを (rank, id) に戻す
+
+    Raises:
+        ValueError: カーソルが不正な場合
+    """
+    try:
+        rank, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _paginate(
+    query: Query,
+    model,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    sort_column=None,
+    descending: bool = True
+) -> tuple[list, Optional[str]]:
+    """
+    (sort_column, id) の順で一覧を取得する（既定は created_at の降順）
+
+    cursor を指定した場合は (sort_column, id) のキーセットで続きから取得し、
+    skip は無視する。次ページがあれば次のカーソルも返す。
+    昇順では sort_column が NULL の行が先頭になる（SQLite のインデックスの順序）
+
+    Returns:
+        (行のリスト, 次ページのカーソル) のタプル
+    """
+    sort_column = model.created_at if sort_column is None else sort_column
+    if descending:
+        query = query.order_by(sort_column.desc(), model.id.desc())
+    else:
+        query = query.order_by(sort_column, model.id)
+    if cursor:
+        value, id = _decode_cursor(cursor, sort_column)
+        if descending:
+            query = query.filter(tuple_(sort_column, model.id) < tuple_(value, id))
+        elif value is None:
+            query = query.filter(or_(
+                sort_column.isnot(None), and_(sort_column.is_(None), model.id > id)
+            ))
+        else:
+            query = query.filter(tuple_(sort_column, model.id) > tuple_(value, id))
+    else:
+        query = query.offset(skip)
+
+    # 次ページの有無を判定するため1件多く取得する
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(getattr(rows[-1], sort_column.key), rows[-1].id)
+    return rows, next_cursor
+
+
+def _bump_versions(db: Session, *table_names: str) -> None:
+    """
+    テーブルの変更カウンタを進める
+    （書き込みと同じトランザクション内で commit 前に呼ぶ）
+
+    Args:
+        db: データベースセッション
+        table_names: 変更したテーブル名
+    """
+    for table_name in table_names:
+        stmt = sqlite_insert(models.ChangeCounter)\
+            .values(table_name=table_name, version=1)\
+            .on_conflict_do_update(
+                index_elements=[models.ChangeCounter.table_name],
+                set_={"version": models.ChangeCounter.version + 1}
+            )
+        db.execute(stmt)
+
+
+def _version_of(table_name: str):
+    """テーブルの変更カウンタを返すスカラーサブクエリ（未変更なら0）"""
+    return func.coalesce(
+        select(models.ChangeCounter.version)
+        .where(models.ChangeCounter.table_name == table_name)
+        .scalar_subquery(),
+        0
+    )
+
+
+def _row_count(db: Session, model) -> int:
+    """
+    テーブルの行数（トリガーで保持している件数を読む）
+
+    件数を保持していないデータベース（マイグレーション未適用）では COUNT する
+    """
+    count = db.query(models.RowCount.row_count)\
+        .filter(models.RowCount.table_name == model.__tablename__)\
+        .scalar()
+    return count if count is not None else db.query(model).count()
+
+
+def reconcile_row_counts(db: Session) -> Dict[str, int]:
+    """
+    保持しているテーブルの行数を実際の行数に合わせる（日付切り替えジョブから呼ばれる）
+
+    トリガーで増減するため通常はずれないが、トリガーを経由しない変更
+    （トリガー追加前のバックアップからの復元など）があった場合に補正する。
+    数えてから書き込むまでの間の変更を取りこぼさないよう、テーブルごとに1文で数えて書き込む。
+    件数を保持していないテーブルは対象外
+
+    Args:
+        db: データベースセッション
+
+    Returns:
+        ずれていたテーブル名から補正後の行数への対応
+    """
+    corrected = {}
+    for model in (models.Source, models.LearningItem):
+        actual = select(func.count()).select_from(model).scalar_subquery()
+        row_count = db.execute(
+            update(models.RowCount)
+            .where(
+                models.RowCount.table_name == model.__tablename__,
+                models.RowCount.row_count != actual
+            )
+            .values(row_count=actual)
+            .returning(models.RowCount.row_count)
+        ).scalar()
+        if row_count is not None:
+            corrected[model.__tablename__] = row_count
+    db.commit()
+    return corrected
+
+
+def _invalidate_read_cache(source_ids=(), item_ids=()) -> None:
+    """
+    書き込みのコミット後に、媒体・学習項目詳細の読み取りキャッシュを破棄する
+
+    Args:
+        source_ids: 破棄する媒体ID
+        item_ids: 破棄する学習項目ID
+    """
+    source_cache.invalidate(*source_ids)
+    learning_item_cache.invalidate(*item_ids)
+
+
+def _publish_ready_tasks(db: Session, *criteria) -> None:
+    """
+    条件に合う今日のタスク（Ready）の行を task_ready イベントとして配信する
+    （コミット後に呼ぶ。購読者がいなければ何もしない）
+
+    Args:
+        db: データベースセッション
+        criteria: 対象のタスクを絞り込む条件
+    """
+    if not broker.has_subscribers():
+        return
+    rows = _today_review_task_query(db).filter(*criteria).all()
+    if rows:
+        broker.publish("task_ready", {"tasks": rows_to_dicts(rows)})
+
+
+def _publish_reset(reason: str) -> None:
+    """今日のタスクを取得し直させる reset イベントを配信する"""
+    broker.publish("reset", {"reason": reason})
 
 
 # ============================================================================
@@ -26,16 +405,40 @@ def create_source(db: Session, source: schemas.SourceCreate) -> models.Source:
         description=source.description
     )
     db.add(db_source)
+    _bump_versions(db, "sources")
     db.commit()
     db.refresh(db_source)
     return db_source
 
 
+def get_or_create_source(db: Session, source: schemas.SourceCreate) -> tuple[int, bool]:
+    """
+    同じタイトルの媒体があればそのIDを返し、なければ作成する（インポート用）
+
+    Args:
+        db: データベースセッション
+        source: 媒体作成スキーマ
+
+    Returns:
+        (媒体ID, 作成したか)
+    """
+    source_id = db.query(models.Source.id)\
+        .filter(models.Source.title == source.title)\
+        .order_by(models.Source.id)\
+        .limit(1)\
+        .scalar()
+    if source_id is not None:
+        return source_id, False
+    return create_source(db, source).id, True
+
+
 def get_sources(
     db: Session,
     skip: int = 0,
-    limit: int = 100
-) -> tuple[List[models.Source], int]:
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = True
+) -> tuple[list, Optional[int], Optional[str]]:
     """
     媒体の一覧を取得する
 
@@ -43,17 +446,22 @@ def get_sources(
         db: データベースセッション
         skip: スキップする件数
         limit: 取得する最大件数
+        cursor: 前ページの next_cursor（指定時は skip を無視する）
+        include_total: 総件数を取得するか
 
     Returns:
-        (媒体のリスト, 総件数) のタプル
+        (媒体の行のリスト, 総件数, 次ページのカーソル) のタプル
+        （行の列は schemas.Source のフィールド順）
+
+    Raises:
+        ValueError: カーソルが不正な場合
     """
-    total = db.query(models.Source).count()
-    sources = db.query(models.Source)\
-        .order_by(models.Source.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-    return sources, total
+    total = _row_count(db, models.Source) if include_total else None
+    sources, next_cursor = _paginate(
+        db.query(*model_columns(models.Source, schemas.Source)),
+        models.Source, skip, limit, cursor
+    )
+    return sources, total, next_cursor
 
 
 def get_source(db: Session, source_id: int) -> Optional[models.Source]:
@@ -73,6 +481,61 @@ def get_source(db: Session, source_id: int) -> Optional[models.Source]:
         .first()
 
 
+def get_source_version(db: Session, source_id: int) -> Optional[tuple]:
+    """
+    媒体詳細の ETag の元になる値を取得する（主キー・インデックスの参照のみ）
+
+    Args:
+        db: データベースセッション
+        source_id: 媒体ID
+
+    Returns:
+        (更新日時, 学習項目IDの最大値, learning_items の変更カウンタ)
+        （見つからない場合はNone）
+    """
+    max_item_id = select(func.max(models.LearningItem.id))\
+        .where(models.LearningItem.source_id == source_id)\
+        .scalar_subquery()
+    return db.execute(
+        select(models.Source.updated_at, max_item_id, _version_of("learning_items"))
+        .where(models.Source.id == source_id)
+    ).one_or_none()
+
+
+def get_source_detail(
+    db: Session,
+    source_id: int,
+    version: Optional[tuple] = None
+) -> Optional[schemas.SourceWithItems]:
+    """
+    媒体の詳細を読み取りキャッシュ経由で取得する
+
+    キャッシュは変更カウンタを含むバージョンと一致する場合だけ使うため、
+    他のワーカーやバッチ処理の書き込み後に古い内容を返すことはない
+
+    Args:
+        db: データベースセッション
+        source_id: 媒体ID
+        version: get_source_version の値（省略時は取得する）
+
+    Returns:
+        媒体のスナップショット（見つからない場合はNone）
+    """
+    version = version if version is not None else get_source_version(db, source_id)
+    if version is None:
+        return None
+    cached = source_cache.get(source_id)
+    if cached is not None and cached[0] == tuple(version):
+        return cached[1]
+
+    db_source = get_source(db, source_id)
+    if db_source is None:
+        return None
+    detail = schemas.SourceWithItems.model_validate(db_source)
+    source_cache.set(source_id, (tuple(version), detail))
+    return detail
+
+
 def update_source(
     db: Session,
     source_id: int,
@@ -97,7 +560,9 @@ def update_source(
     for key, value in update_data.items():
         setattr(db_source, key, value)
 
+    _bump_versions(db, "sources")
     db.commit()
+    _invalidate_read_cache(source_ids=[source_id])
     db.refresh(db_source)
     return db_source
 
@@ -106,6 +571,9 @@ def delete_source(db: Session, source_id: int) -> bool:
     """
     媒体を削除する（学習項目・復習タスクもカスケード削除される）
 
+    子の行は読み込まず、1回の DELETE から外部キーの ON DELETE CASCADE で
+    学習項目・復習タスクを削除する（件数に関わらず発行する文の数は一定）
+
     Args:
         db: データベースセッション
         source_id: 媒体ID
@@ -113,12 +581,19 @@ def delete_source(db: Session, source_id: int) -> bool:
     Returns:
         削除成功ならTrue、見つからない場合はFalse
     """
-    db_source = db.query(models.Source).filter(models.Source.id == source_id).first()
-    if not db_source:
+    deleted = db.execute(
+        delete(models.Source)
+        .where(models.Source.id == source_id)
+        .returning(models.Source.id)
+    ).scalar()
+    if deleted is None:
         return False
 
-    db.delete(db_source)
+    _bump_versions(db, "sources", "learning_items", "review_tasks")
     db.commit()
+    _invalidate_read_cache(source_ids=[source_id])
+    learning_item_cache.clear()
+    _publish_reset("source_deleted")
     return True
 
 
@@ -128,7 +603,8 @@ def delete_source(db: Session, source_id: int) -> bool:
 
 def create_learning_item(
     db: Session,
-    item: schemas.LearningItemCreate
+    item: schemas.LearningItemCreate,
+    daily_cap: Optional[int] = None
 ) -> models.LearningItem:
     """
     新規学習項目を作成し、復習タスクを自動生成する
@@ -136,56 +612,221 @@ def create_learning_item(
     Args:
         db: データベースセッション
         item: 学習項目作成スキーマ
+        daily_cap: 予定日をずらして抑える1日の復習件数の上限
+            （省略時は config.LOAD_BALANCE_DAILY_CAP、0 なら予定日をずらさない）
 
     Returns:
-        作成された学習項目（復習タスク含む）
+        作成された学習項目（復習タスク含む）、媒体が見つからない場合はNone
     """
+    # 開始日を取得（省略時は今日）
+    today = date.today()
+    start_date = item.start_date if item.start_date else today
+
+    # 復習タスクを生成（予定日が到来済みのものは最初から Ready にする）
+    tasks_data, materialized_through = _initial_review_tasks(None, start_date, today, daily_cap)
+    _balance_review_tasks(db, tasks_data, today, daily_cap)
+    next_due_date, next_stage_offset_days = _next_review(tasks_data)
+
     # 学習項目を作成
     db_item = models.LearningItem(
         source_id=item.source_id,
         title=item.title,
-        content=item.content
+        content=item.content,
+        start_date=start_date,
+        materialized_through=materialized_through,
+        next_due_date=next_due_date,
+        next_stage_offset_days=next_stage_offset_days
     )
     db.add(db_item)
-    db.flush()  # IDを取得するためにflush
-
-    # 開始日を取得（省略時は今日）
-    start_date = item.start_date if item.start_date else date.today()
+    try:
+        db.flush()  # IDを取得するためにflush
+    except IntegrityError:
+        # 媒体が存在しない（外部キー制約違反）
+        db.rollback()
+        return None
 
-    # 復習タスクを生成
-    tasks_data = generate_review_tasks(db_item.id, start_date)
+    # ORM の flush はタスクごとに INSERT ... RETURNING を発行するため、
+    # テーブルに直接 executemany する
+    now = datetime.utcnow()
     for task_data in tasks_data:
-        db_task = models.ReviewTask(**task_data)
-        db.add(db_task)
+        task_data["learning_item_id"] = db_item.id
+        task_data["created_at"] = now
+    db.execute(insert(models.ReviewTask.__table__), tasks_data)
 
+    _bump_versions(db, "learning_items", "review_tasks")
     db.commit()
-    db.refresh(db_item)
-    return db_item
+    _invalidate_read_cache(source_ids=[item.source_id])
+    _publish_ready_tasks(db, models.ReviewTask.learning_item_id == db_item.id)
+    # 非同期モードでは遅延ロードできないため復習タスクを含めて読み直す
+    return get_learning_item(db, db_item.id)
+
+
+def bulk_create_learning_items(
+    db: Session,
+    items: List[schemas.LearningItemCreate],
+    daily_cap: Optional[int] = None
+) -> List[Optional[int]]:
+    """
+    学習項目をまとめて作成し、復習タスクも一括で生成する
+
+    学習項目と復習タスクはそれぞれ1回の一括 INSERT で登録し、
+    1回のトランザクションでコミットする（大量登録時は呼び出し側で分割すること）。
+    daily_cap を指定すると、全項目の Pending タスクの予定日をまとめてずらす
+
+    Args:
+        db: データベースセッション
+        items: 学習項目作成スキーマのリスト
+        daily_cap: 予定日をずらして抑える1日の復習件数の上限
+            （省略時は config.LOAD_BALANCE_DAILY_CAP、0 なら予定日をずらさない）
+
+    Returns:
+        items と同じ順序の作成された学習項目IDのリスト
+        （媒体が存在しない項目は None）
+
+    Raises:
+        SQLAlchemyError: 登録に失敗した場合（ロールバック済み）
+    """
+    source_ids = {item.source_id for item in items}
+    existing_source_ids = {
+        source_id for (source_id,) in db.query(models.Source.id)
+        .filter(models.Source.id.in_(source_ids))
+    }
+    valid_items = [item for item in items if item.source_id in existing_source_ids]
+    if not valid_items:
+        return [None] * len(items)
+
+    now = datetime.utcnow()
+    today = date.today()
+    start_dates = [item.start_date if item.start_date else today for item in valid_items]
+    initial_tasks = [
+        _initial_review_tasks(None, start_date, today, daily_cap) for start_date in start_dates
+    ]
+    _balance_review_tasks(
+        db, [task for item_tasks, _ in initial_tasks for task in item_tasks], today, daily_cap
+    )
+    next_reviews = [_next_review(item_tasks) for item_tasks, _ in initial_tasks]
+
+    try:
+        # 学習項目を一括作成
+        # RETURNING の行順は保証されないが、SQLite は VALUES の順に昇順の rowid を
+        # 割り当てるため、ソートしたIDが入力順に対応する
+        item_ids = sorted(db.execute(
+            insert(models.LearningItem.__table__).returning(models.LearningItem.id),
+            [
+                {
+                    "source_id": item.source_id,
+                    "title": item.title,
+                    "content": item.content,
+                    "start_date": start_date,
+                    "materialized_through": materialized_through,
+                    "next_due_date": next_due_date,
+                    "next_stage_offset_days": next_stage_offset_days,
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for item, start_date, (_, materialized_through), (next_due_date, next_stage_offset_days)
+                in zip(valid_items, start_dates, initial_tasks, next_reviews)
+            ]
+        ).scalars().all())
+
+        # 復習タスクを一括作成
+        tasks_data = []
+        for item_id, (item_tasks, _) in zip(item_ids, initial_tasks):
+            for task_data in item_tasks:
+                task_data["learning_item_id"] = item_id
+                task_data["created_at"] = now
+            tasks_data.extend(item_tasks)
+        # ORM の一括処理を経由せずテーブルに直接 executemany する
+        db.execute(insert(models.ReviewTask.__table__), tasks_data)
+
+        _bump_versions(db, "learning_items", "review_tasks")
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    _invalidate_read_cache(source_ids=existing_source_ids)
+    _publish_ready_tasks(db, models.ReviewTask.learning_item_id.in_(item_ids))
+
+    created_ids = iter(item_ids)
+    return [
+        next(created_ids) if item.source_id in existing_source_ids else None
+        for item in items
+    ]
+
+
+# 学習項目一覧の並べ替え: (カラム, 降順か)
+LEARNING_ITEM_SORTS = {
+    "created": (models.LearningItem.created_at, True),
+    "next_due": (models.LearningItem.next_due_date, False),
+    "title": (models.LearningItem.title, False),
+}
 
 
 def get_learning_items(
     db: Session,
     skip: int = 0,
-    limit: int = 100
-) -> tuple[List[models.LearningItem], int]:
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    source_id: Optional[int] = None,
+    due_before: Optional[date] = None,
+    stage: Optional[int] = None,
+    status: Optional[str] = None,
+    sort: str = "created"
+) -> tuple[list, Optional[int], Optional[str]]:
     """
     学習項目の一覧を取得する
 
+    絞り込みは学習項目の next_due_date / next_stage_offset_days（復習タスクからの複製）と
+    インデックスで行い、復習タスクを読まない（status のみ復習タスクのインデックスを使う）
+
     Args:
         db: データベースセッション
         skip: スキップする件数
         limit: 取得する最大件数
+        cursor: 前ページの next_cursor（指定時は skip を無視する）
+        include_total: 総件数を取得するか
+        source_id: 媒体IDで絞り込む
+        due_before: 次の復習の予定日がこの日以前のものに絞り込む
+        stage: 次の復習のステージ（オフセット日数）で絞り込む
+        status: この状態の復習タスクを持つものに絞り込む（Pending / Ready / Completed）
+        sort: 並び順（created: 作成日時の新しい順、next_due: 次の復習の予定日順、
+            title: タイトル順）
 
     Returns:
-        (学習項目のリスト, 総件数) のタプル
+        (学習項目の行のリスト, 総件数, 次ページのカーソル) のタプル
+        （行の列は schemas.LearningItem のフィールド順）
+
+    Raises:
+        ValueError: カーソル・並び順が不正な場合
     """
-    total = db.query(models.LearningItem).count()
-    items = db.query(models.LearningItem)\
-        .order_by(models.LearningItem.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-    return items, total
+    if sort not in LEARNING_ITEM_SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+    sort_column, descending = LEARNING_ITEM_SORTS[sort]
+
+    criteria = []
+    if source_id is not None:
+        criteria.append(models.LearningItem.source_id == source_id)
+    if due_before is not None:
+        criteria.append(models.LearningItem.next_due_date <= due_before)
+    if stage is not None:
+        criteria.append(models.LearningItem.next_stage_offset_days == stage)
+    if status is not None:
+        criteria.append(models.LearningItem.id.in_(
+            select(models.ReviewTask.learning_item_id).where(models.ReviewTask.status == status)
+        ))
+
+    if not include_total:
+        total = None
+    elif criteria:
+        total = db.query(models.LearningItem).filter(*criteria).count()
+    else:
+        total = _row_count(db, models.LearningItem)
+    items, next_cursor = _paginate(
+        db.query(*model_columns(models.LearningItem, schemas.LearningItem)).filter(*criteria),
+        models.LearningItem, skip, limit, cursor, sort_column, descending
+    )
+    return items, total, next_cursor
 
 
 def get_learning_item(db: Session, item_id: int) -> Optional[models.LearningItem]:
@@ -199,10 +840,65 @@ def get_learning_item(db: Session, item_id: int) -> Optional[models.LearningItem
     Returns:
         学習項目（見つからない場合はNone）
     """
+    # first() は LIMIT 付きサブクエリになりタスクの並び替えが発生するため使わない
     return db.query(models.LearningItem)\
         .options(joinedload(models.LearningItem.review_tasks))\
         .filter(models.LearningItem.id == item_id)\
-        .first()
+        .one_or_none()
+
+
+def get_learning_item_version(db: Session, item_id: int) -> Optional[tuple]:
+    """
+    学習項目詳細の ETag の元になる値を取得する（主キー・インデックスの参照のみ）
+
+    Args:
+        db: データベースセッション
+        item_id: 学習項目ID
+
+    Returns:
+        (更新日時, 復習タスクIDの最大値, review_tasks の変更カウンタ)
+        （見つからない場合はNone）
+    """
+    max_task_id = select(func.max(models.ReviewTask.id))\
+        .where(models.ReviewTask.learning_item_id == item_id)\
+        .scalar_subquery()
+    return db.execute(
+        select(models.LearningItem.updated_at, max_task_id, _version_of("review_tasks"))
+        .where(models.LearningItem.id == item_id)
+    ).one_or_none()
+
+
+def get_learning_item_detail(
+    db: Session,
+    item_id: int,
+    version: Optional[tuple] = None
+) -> Optional[schemas.LearningItemWithTasks]:
+    """
+    学習項目の詳細を読み取りキャッシュ経由で取得する
+
+    キャッシュの使い方は get_source_detail と同じ
+
+    Args:
+        db: データベースセッション
+        item_id: 学習項目ID
+        version: get_learning_item_version の値（省略時は取得する）
+
+    Returns:
+        学習項目のスナップショット（見つからない場合はNone）
+    """
+    version = version if version is not None else get_learning_item_version(db, item_id)
+    if version is None:
+        return None
+    cached = learning_item_cache.get(item_id)
+    if cached is not None and cached[0] == tuple(version):
+        return cached[1]
+
+    db_item = get_learning_item(db, item_id)
+    if db_item is None:
+        return None
+    detail = schemas.LearningItemWithTasks.model_validate(db_item)
+    learning_item_cache.set(item_id, (tuple(version), detail))
+    return detail
 
 
 def update_learning_item(
@@ -229,7 +925,10 @@ def update_learning_item(
     for key, value in update_data.items():
         setattr(db_item, key, value)
 
+    _bump_versions(db, "learning_items")
     db.commit()
+    _invalidate_read_cache(source_ids=[db_item.source_id], item_ids=[item_id])
+    _publish_reset("learning_item_updated")
     db.refresh(db_item)
     return db_item
 
@@ -245,51 +944,494 @@ def delete_learning_item(db: Session, item_id: int) -> bool:
     Returns:
         削除成功ならTrue、見つからない場合はFalse
     """
-    db_item = db.query(models.LearningItem).filter(models.LearningItem.id == item_id).first()
-    if not db_item:
+    # 復習タスクは外部キーの ON DELETE CASCADE で削除される
+    source_id = db.execute(
+        delete(models.LearningItem)
+        .where(models.LearningItem.id == item_id)
+        .returning(models.LearningItem.source_id)
+    ).scalar()
+    if source_id is None:
         return False
 
-    db.delete(db_item)
+    _bump_versions(db, "learning_items", "review_tasks")
     db.commit()
+    _invalidate_read_cache(source_ids=[source_id], item_ids=[item_id])
+    _publish_reset("learning_item_deleted")
     return True
 
 
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_learning_items(
+    db: Session,
+    q: str,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> tuple[list, Optional[str]]:
+    """
+    学習項目をタイトル・内容・媒体名で全文検索する（learning_items_fts）
+
+    空白で区切った検索語をすべて含む学習項目を、関連度（bm25、タイトルの一致を重視）の
+    高い順に返す。3文字以上の検索語は索引で絞り込み、それより短い検索語は
+    絞り込んだ結果に部分一致の条件として加える。
+    cursor を指定すると (rank, id) のキーセットで続きから取得する
+
+    Args:
+        db: データベースセッション
+        q: 検索語
+        limit: 取得する最大件数
+        cursor: 前ページの next_cursor
+
+    Returns:
+        (検索結果の dict のリスト, 次ページのカーソル) のタプル。
+        snippet は HTML エスケープ済みで、一致箇所を <mark> で囲む
+
+    Raises:
+        ValueError: 3文字以上の検索語がない場合、カーソルが不正な場合
+    """
+    terms = q.split()
+    indexed_terms = [term for term in terms if len(term) >= SEARCH_MIN_TERM_LENGTH]
+    if not indexed_terms:
+        raise ValueError(
+            f"Search query must contain a term of at least {SEARCH_MIN_TERM_LENGTH} characters"
+        )
+
+    # 検索語は FTS5 のフレーズとして渡し、構文として解釈させない
+    params = {
+        "query": " AND ".join('"' + term.replace('"', '""') + '"' for term in indexed_terms),
+        "limit": limit + 1,
+        "snippet_tokens": SEARCH_SNIPPET_TOKENS,
+    }
+    conditions = ["learning_items_fts MATCH :query"]
+    for i, term in enumerate(term for term in terms if len(term) < SEARCH_MIN_TERM_LENGTH):
+        params[f"term_{i}"] = f"%{_escape_like(term)}%"
+        conditions.append(
+            f"(f.title LIKE :term_{i} ESCAPE '\\' OR f.content LIKE :term_{i} ESCAPE '\\' "
+            f"OR f.source_title LIKE :term_{i} ESCAPE '\\')"
+        )
+    if cursor:
+        params["after_rank"], params["after_id"] = _decode_search_cursor(cursor)
+        conditions.append(
+            "(f.rank > :after_rank OR (f.rank = :after_rank AND f.rowid > :after_id))"
+        )
+
+    # 一致箇所の目印には本文に現れない制御文字を使い、エスケープ後に <mark> に置き換える
+    rows = db.execute(text(
+        "SELECT f.rowid AS id, li.source_id, f.source_title, f.title, "
+        "snippet(learning_items_fts, -1, char(2), char(3), '…', :snippet_tokens) AS snippet, "
+        "f.rank AS rank "
+        "FROM learning_items_fts f JOIN learning_items li ON li.id = f.rowid "
+        f"WHERE {' AND '.join(conditions)} "
+        "ORDER BY f.rank, f.rowid LIMIT :limit"
+    ), params).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_search_cursor(rows[-1].rank, rows[-1].id)
+    results = rows_to_dicts(rows)
+    for result in results:
+        result["snippet"] = html.escape(result["snippet"] or "")\
+            .replace("\x02", "<mark>").replace("\x03", "</mark>")
+    return results, next_cursor
+
+
 # ============================================================================
 # Review Task CRUD Operations
 # ============================================================================
 
-def get_today_review_tasks(db: Session) -> List[models.ReviewTask]:
+def _materialize_due_review_tasks(db: Session, today: date) -> int:
     """
-    今日の復習タスクを取得する
-    （due_date が今日以前で未完了のタスク）
+    遅延生成モードの学習項目について、予定日が到来したステージとその次の1件を実体化する
 
-    同時に Pending → Ready の自動更新も行う
+    実体化済みの最後のステージの予定日が到来した学習項目だけが対象になる
+    （コミットは呼び出し側で行う）
 
     Args:
         db: データベースセッション
+        today: 基準日
 
     Returns:
-        今日の復習タスクのリスト
+        Ready で作成されたタスク数
     """
+    last_offset = YEARLY_OFFSET_DAYS
+    last_due_date = func.date(
+        models.LearningItem.start_date,
+        func.printf("+%d days", models.LearningItem.materialized_through),
+        type_=Date
+    )
+    items = db.query(
+        models.LearningItem.id,
+        models.LearningItem.start_date,
+        models.LearningItem.materialized_through,
+        models.LearningItem.updated_at
+    ).filter(
+        models.LearningItem.materialized_through < last_offset,
+        last_due_date <= today
+    ).all()
+    if not items:
+        return 0
+
+    now = datetime.utcnow()
+    tasks_data = []
+    item_updates = []
+    for item in items:
+        item_tasks, materialized_through = generate_due_review_tasks(
+            item.id, item.start_date, today, item.materialized_through
+        )
+        tasks_data.extend(_mark_due_tasks_ready(item_tasks, today))
+        # 実体化はユーザーの編集ではないため updated_at は変えない
+        item_updates.append({
+            "id": item.id,
+            "materialized_through": materialized_through,
+            "updated_at": item.updated_at
+        })
+    for task_data in tasks_data:
+        task_data["created_at"] = now
+
+    if tasks_data:
+        db.execute(insert(models.ReviewTask.__table__), tasks_data)
+    db.execute(update(models.LearningItem), item_updates)
+    _bump_versions(db, "review_tasks")
+    return sum(1 for task_data in tasks_data if task_data["status"] == "Ready")
+
+
+def _materialize_remaining_review_tasks(db: Session, item_ids: Optional[List[int]] = None) -> int:
+    """
+    遅延生成モードの学習項目の未生成のステージをすべて実体化し、全ステージ作成済みにする
+
+    適応型スケジューラは保存済みのタスクの予定日だけを変更するため、
+    遅延生成モードで作成した学習項目を再計算する前に呼ぶ
+    （コミットは呼び出し側で行う）
+
+    Args:
+        db: データベースセッション
+        item_ids: 対象の学習項目ID（省略時は遅延生成モードのすべての学習項目）
+
+    Returns:
+        全ステージ作成済みにした学習項目数
+    """
+    query = db.query(
+        models.LearningItem.id,
+        models.LearningItem.start_date,
+        models.LearningItem.materialized_through,
+        models.LearningItem.updated_at
+    ).filter(models.LearningItem.materialized_through.isnot(None))
+    if item_ids is not None:
+        query = query.filter(models.LearningItem.id.in_(item_ids))
+    items = query.all()
+    if not items:
+        return 0
+
     today = date.today()
+    now = datetime.utcnow()
+    tasks_data = _mark_due_tasks_ready([
+        task for item in items
+        for task in generate_pending_review_tasks(item.id, item.start_date, item.materialized_through)
+    ], today)
+    for task_data in tasks_data:
+        task_data["created_at"] = now
+
+    if tasks_data:
+        db.execute(insert(models.ReviewTask.__table__), tasks_data)
+    # 実体化はユーザーの編集ではないため updated_at は変えない
+    db.execute(update(models.LearningItem), [
+        {"id": item.id, "materialized_through": None, "updated_at": item.updated_at}
+        for item in items
+    ])
+    _bump_versions(db, "review_tasks")
+    return len(items)
+
+
+def promote_due_review_tasks(db: Session, today: Optional[date] = None) -> int:
+    """
+    予定日が到来した Pending タスクを Ready に更新する
+    （日付切り替えジョブから1日1回呼ばれる）
 
-    # Pending → Ready の自動更新
-    db.query(models.ReviewTask)\
+    遅延生成モードの学習項目は、予定日が到来したステージをここで実体化する
+
+    Args:
+        db: データベースセッション
+        today: 基準日（省略時は今日）
+
+    Returns:
+        Ready になったタスク数
+    """
+    today = today if today else date.today()
+
+    updated = db.query(models.ReviewTask)\
         .filter(
             models.ReviewTask.due_date <= today,
             models.ReviewTask.status == "Pending"
         )\
-        .update({"status": "Ready"})
+        .update({"status": "Ready"}, synchronize_session=False)
+    updated += _materialize_due_review_tasks(db, today)
+    if updated:
+        _bump_versions(db, "review_tasks")
     db.commit()
+    if updated:
+        learning_item_cache.clear()
+        _publish_reset("rollover")
+    return updated
 
-    # Ready状態のタスクを取得（学習項目も一緒にロード）
-    tasks = db.query(models.ReviewTask)\
-        .options(joinedload(models.ReviewTask.learning_item))\
-        .filter(models.ReviewTask.status == "Ready")\
+
+def collapse_pending_review_tasks(
+    db: Session,
+    today: Optional[date] = None,
+    batch_size: int = 10000
+) -> tuple[int, int]:
+    """
+    全ステージを作成済みの学習項目を遅延生成モードに変換する
+
+    REVIEW_SCHEDULE のステージのうち、予定日が未到来の Pending タスクは
+    最初の1件だけを残して削除し、残りは読み出し時の計算に任せる。
+    削除するタスクの予定日が開始日 + オフセット日数でない学習項目と
+    1年ごとの継続タスクは対象外。学習項目 batch_size 件ごとにコミットする
+
+    Args:
+        db: データベースセッション
+        today: 基準日（省略時は今日）
+        batch_size: 1トランザクションで処理する学習項目数
+
+    Returns:
+        (変換した学習項目数, 削除したタスク数) のタプル
+    """
+    today = today if today else date.today()
+    schedule_offsets = [offset for _, offset in REVIEW_SCHEDULE]
+    converted = 0
+    deleted = 0
+    last_id = 0
+
+    while True:
+        items = db.query(models.LearningItem.id, models.LearningItem.start_date, models.LearningItem.updated_at)\
+            .filter(
+                models.LearningItem.materialized_through.is_(None),
+                models.LearningItem.id > last_id
+            )\
+            .order_by(models.LearningItem.id)\
+            .limit(batch_size)\
+            .all()
+        if not items:
+            break
+        last_id = items[-1].id
+
+        tasks_by_item: Dict[int, list] = {}
+        for task in db.query(
+            models.ReviewTask.id,
+            models.ReviewTask.learning_item_id,
+            models.ReviewTask.stage_offset_days,
+            models.ReviewTask.due_date,
+            models.ReviewTask.status
+        ).filter(
+            models.ReviewTask.learning_item_id.in_([item.id for item in items]),
+            models.ReviewTask.stage_offset_days.in_(schedule_offsets)
+        ).order_by(models.ReviewTask.learning_item_id, models.ReviewTask.stage_offset_days):
+            tasks_by_item.setdefault(task.learning_item_id, []).append(task)
+
+        item_updates = []
+        for item in items:
+            tasks = tasks_by_item.get(item.id)
+            if not tasks:
+                continue
+            first = tasks[0]
+            start_date = item.start_date if item.start_date \
+                else first.due_date - timedelta(days=first.stage_offset_days)
+
+            # 予定日が未到来の Pending タスクは最初の1件だけを残す
+            future_offsets = [
+                task.stage_offset_days for task in tasks
+                if task.status == "Pending" and task.due_date > today
+            ]
+            # 予定日を変更したタスク（適応型スケジューラ・負荷の平準化）は
+            # 開始日 + オフセット日数で計算し直せないため、その学習項目は変換しない
+            if any(
+                task.stage_offset_days in future_offsets[1:]
+                and task.due_date != start_date + timedelta(days=task.stage_offset_days)
+                for task in tasks
+            ):
+                continue
+            materialized_through = max(
+                task.stage_offset_days for task in tasks
+                if task.stage_offset_days not in future_offsets[1:]
+            )
+            item_updates.append({
+                "id": item.id,
+                "start_date": start_date,
+                "materialized_through": materialized_through,
+                "updated_at": item.updated_at
+            })
+        if not item_updates:
+            continue
+
+        db.execute(update(models.LearningItem), item_updates)
+        # 実体化済みの最後のステージより後のステージのタスクを削除する
+        materialized_through = select(models.LearningItem.materialized_through)\
+            .where(models.LearningItem.id == models.ReviewTask.learning_item_id)\
+            .scalar_subquery()
+        deleted += db.query(models.ReviewTask)\
+            .filter(
+                models.ReviewTask.learning_item_id.in_([data["id"] for data in item_updates]),
+                models.ReviewTask.stage_offset_days.in_(schedule_offsets),
+                models.ReviewTask.stage_offset_days > materialized_through
+            )\
+            .delete(synchronize_session=False)
+        _bump_versions(db, "learning_items", "review_tasks")
+        db.commit()
+        _invalidate_read_cache(item_ids=[data["id"] for data in item_updates])
+        converted += len(item_updates)
+
+    if converted:
+        _publish_reset("collapse")
+
+    return converted, deleted
+
+
+def _today_review_task_query(db: Session, include_content: bool = False) -> Query:
+    """今日の復習タスクの行（schemas.ReviewTaskWithItem のフィールド順）のクエリ"""
+    columns = schema_columns(schemas.ReviewTaskWithItem, {
+        "stage_name": models.ReviewTask.stage_name,
+        "stage_offset_days": models.ReviewTask.stage_offset_days,
+        "due_date": models.ReviewTask.due_date,
+        "status": models.ReviewTask.status,
+        "id": models.ReviewTask.id,
+        "learning_item_id": models.ReviewTask.learning_item_id,
+        "completed_at": models.ReviewTask.completed_at,
+        "created_at": models.ReviewTask.created_at,
+        "learning_item_title": models.LearningItem.title,
+        "learning_item_content_preview": func.substr(
+            models.LearningItem.content, 1, CONTENT_PREVIEW_LENGTH
+        ),
+        "learning_item_content": models.LearningItem.content if include_content else null(),
+    })
+
+    return db.query(*columns)\
+        .join(models.LearningItem, models.ReviewTask.learning_item_id == models.LearningItem.id)\
+        .filter(models.ReviewTask.status == "Ready")
+
+
+def get_today_review_tasks(db: Session, include_content: bool = False) -> list:
+    """
+    今日の復習タスクを取得する
+    （due_date が今日以前で未完了のタスク）
+
+    読み取り専用。Pending → Ready の更新は日付切り替えジョブ
+    （app.rollover）が行う。
+    学習項目はタイトルと内容の先頭部分だけを列指定で結合して取得する
+
+    Args:
+        db: データベースセッション
+        include_content: 学習項目の内容全体も取得するか
+
+    Returns:
+        今日の復習タスクの行のリスト
+        （行の列は schemas.ReviewTaskWithItem のフィールド順）
+    """
+    return _today_review_task_query(db, include_content)\
         .order_by(models.ReviewTask.due_date)\
         .all()
 
-    return tasks
+
+def get_today_version(db: Session) -> tuple:
+    """
+    今日の復習タスク一覧の ETag の元になる値を取得する
+
+    Args:
+        db: データベースセッション
+
+    Returns:
+        (review_tasks の変更カウンタ, learning_items の変更カウンタ)
+    """
+    return db.execute(
+        select(_version_of("review_tasks"), _version_of("learning_items"))
+    ).one()
+
+
+def get_review_forecast(
+    db: Session,
+    days: int,
+    today: Optional[date] = None
+) -> List[tuple[date, int]]:
+    """
+    今日から days 日間の日ごとの復習タスク数を予測する
+
+    - Ready のタスクは今日に数える
+    - Pending のタスクは (status, due_date) インデックスだけを使う
+      GROUP BY due_date で数える
+    - 1年ごとのタスクは、完了時に生成される365日ごとの次のタスクも
+      未完了のタスクの予定日から計算して数える（予定日を過ぎた分は今日に数える）
+    - 遅延生成モードの未生成ステージは学習項目の開始日から数える
+
+    Args:
+        db: データベースセッション
+        days: 予測する日数
+        today: 基準日（省略時は今日）
+
+    Returns:
+        今日から順に (日付, タスク数) のリスト
+    """
+    today = today if today else date.today()
+    end = today + timedelta(days=days - 1)
+    counts = [0] * days
+
+    def add(due_date: date, count: int) -> None:
+        if due_date <= end:
+            counts[max((due_date - today).days, 0)] += count
+
+    def add_yearly_continuation(due_date: date, count: int) -> None:
+        # 完了ごとに予定日の365日後のタスクが生成される
+        # （complete_review_tasks と同じ規則。予定日を過ぎた分は生成時に Ready になるため今日に数える）
+        next_due_date = due_date + timedelta(days=365)
+        while next_due_date <= end:
+            add(next_due_date, count)
+            next_due_date += timedelta(days=365)
+
+    # 保存済みの未完了タスク（どの範囲も予定日順に読めるため一時 B-tree を使わない）
+    ready_count = db.query(func.count())\
+        .filter(models.ReviewTask.status == "Ready")\
+        .scalar()
+    add(today, ready_count)
+    for due_date, count in db.query(models.ReviewTask.due_date, func.count())\
+            .filter(
+                models.ReviewTask.status == "Pending",
+                models.ReviewTask.due_date <= end
+            )\
+            .group_by(models.ReviewTask.due_date):
+        add(due_date, count)
+
+    # 1年ごとの継続タスク（部分インデックスを使わせるため条件はリテラルで書く）
+    yearly_heads = [
+        select(models.ReviewTask.due_date, func.count()).where(
+            models.ReviewTask.status == status,
+            models.ReviewTask.due_date <= end - timedelta(days=365),
+            models.ReviewTask.stage_offset_days >= literal_column(str(YEARLY_OFFSET_DAYS))
+        ).group_by(models.ReviewTask.due_date)
+        for status in ("Ready", "Pending")
+    ]
+    for due_date, count in db.execute(union_all(*yearly_heads)):
+        add_yearly_continuation(due_date, count)
+
+    # 遅延生成モードの未生成ステージ（予定日は開始日 + オフセット日数）
+    virtual_stages = [
+        select(
+            literal(offset).label("offset"),
+            models.LearningItem.start_date,
+            func.count()
+        ).where(
+            models.LearningItem.start_date > today - timedelta(days=offset),
+            models.LearningItem.start_date <= end - timedelta(days=offset),
+            models.LearningItem.materialized_through < offset
+        ).group_by(models.LearningItem.start_date)
+        for _, offset in REVIEW_SCHEDULE if offset > 0
+    ]
+    for offset, start_date, count in db.execute(union_all(*virtual_stages)):
+        due_date = start_date + timedelta(days=offset)
+        add(due_date, count)
+        if offset >= YEARLY_OFFSET_DAYS:
+            add_yearly_continuation(due_date, count)
+
+    return [(today + timedelta(days=i), count) for i, count in enumerate(counts)]
 
 
 def get_review_task(db: Session, task_id: int) -> Optional[models.ReviewTask]:
@@ -308,7 +1450,252 @@ def get_review_task(db: Session, task_id: int) -> Optional[models.ReviewTask]:
         .first()
 
 
-def complete_review_task(db: Session, task_id: int) -> Optional[models.ReviewTask]:
+def _is_yearly_stage(stage_offset_days: int) -> bool:
+    """1年ごとのステージ（365, 730, 1095, ...日）かどうか"""
+    return stage_offset_days >= 365 and stage_offset_days % 365 == 0
+
+
+def _epoch_days(column, *modifiers: str):
+    """
+    日付（日時）カラムを 1970-01-01 からの日数にする（NumPy の datetime64[D] 用）
+
+    modifiers は SQLite の日時関数の修飾子（"localtime" なら UTC の日時をローカル時刻にする）
+    """
+    return cast(func.julianday(column, *modifiers) - 2440587.5, Integer)
+
+
+def _local_date(value: datetime) -> date:
+    """
+    UTC の日時（タイムゾーンなし）をローカルの日付にする
+
+    completed_at は UTC で保存し、予定日はローカルの日付のため、
+    完了日を基準にするときはローカルの日付に直す
+    """
+    return value.replace(tzinfo=timezone.utc).astimezone().date()
+
+
+def _fetch_columns(db: Session, stmt, columns: int, dtype=np.int64) -> np.ndarray:
+    """
+    SELECT の結果を列ごとの NumPy 配列（列数 × 行数）にする
+
+    大量の行を読むため ORM の行の組み立てを通さずにコネクションで実行し、
+    zip で列に組み替えてから変換する
+    """
+    rows = db.connection().execute(stmt).all()
+    if not rows:
+        return np.empty((columns, 0), dtype=dtype)
+    return np.array(list(zip(*rows)), dtype=dtype)
+
+
+def _reschedule_after_completion(
+    db: Session,
+    scheduler: FixedScheduler,
+    completed: List[tuple],
+    next_tasks_data: List[dict]
+) -> None:
+    """
+    適応型スケジューラで、完了した学習項目の易しさ係数と残りのタスクの予定日を更新する
+    （1年ごとの次タスクの予定日もここで決める。コミットは呼び出し側で行う）
+
+    Args:
+        db: データベースセッション
+        scheduler: スケジューラ
+        completed: (完了したタスクの行, 完了日時, 評価) のリスト
+        next_tasks_data: 生成する1年ごとの次タスク（予定日を書き換える）
+    """
+    # 遅延生成モードで作成した学習項目は、未生成のステージも変更できるよう先に実体化する
+    _materialize_remaining_review_tasks(db, list({task.learning_item_id for task, _, _ in completed}))
+    items = {
+        item.id: item for item in db.query(
+            models.LearningItem.id,
+            models.LearningItem.ease_factor,
+            models.LearningItem.updated_at
+        ).filter(models.LearningItem.id.in_({task.learning_item_id for task, _, _ in completed}))
+    }
+    ease = scheduler.update_ease(
+        np.array([items[task.learning_item_id].ease_factor for task, _, _ in completed], dtype=float),
+        np.array([np.nan if grade is None else grade for _, _, grade in completed], dtype=float)
+    )
+    anchor_dates = scheduler.anchor_dates(
+        np.array([task.due_date for task, _, _ in completed], dtype="datetime64[D]"),
+        np.array([_local_date(completed_at) for _, completed_at, _ in completed], dtype="datetime64[D]")
+    )
+
+    # 学習項目ごとに最も後のステージの完了を基準にする
+    anchors: Dict[int, tuple] = {}
+    for (task, _, _), item_ease, anchor_date in zip(completed, ease, anchor_dates):
+        anchor = anchors.get(task.learning_item_id)
+        if anchor is None or task.stage_offset_days >= anchor[1]:
+            anchors[task.learning_item_id] = (anchor_date, task.stage_offset_days, item_ease)
+
+    pending = [
+        task for task in db.query(
+            models.ReviewTask.id,
+            models.ReviewTask.learning_item_id,
+            models.ReviewTask.stage_offset_days
+        ).filter(
+            models.ReviewTask.learning_item_id.in_(list(anchors)),
+            models.ReviewTask.status == "Pending"
+        )
+        if task.stage_offset_days > anchors[task.learning_item_id][1]
+    ]
+    targets = [(task.learning_item_id, task.stage_offset_days) for task in pending] + [
+        (data["learning_item_id"], data["stage_offset_days"]) for data in next_tasks_data
+    ]
+    if targets:
+        target_anchors = [anchors[item_id] for item_id, _ in targets]
+        due_dates = scheduler.due_dates(
+            np.array([anchor[0] for anchor in target_anchors], dtype="datetime64[D]"),
+            np.array([anchor[1] for anchor in target_anchors]),
+            np.array([offset for _, offset in targets]),
+            np.array([anchor[2] for anchor in target_anchors])
+        ).astype(object)
+
+        today = date.today()
+        if pending:
+            db.execute(update(models.ReviewTask), [
+                {"id": task.id, "due_date": due, "status": "Ready" if due <= today else "Pending"}
+                for task, due in zip(pending, due_dates)
+            ])
+        for data, due in zip(next_tasks_data, due_dates[len(pending):]):
+            data["due_date"] = due
+
+    # 易しさ係数の更新はユーザーの編集ではないため updated_at は変えない
+    db.execute(update(models.LearningItem), [
+        {"id": item_id, "ease_factor": float(anchor[2]), "updated_at": items[item_id].updated_at}
+        for item_id, anchor in anchors.items()
+    ])
+
+
+def complete_review_tasks(
+    db: Session,
+    completions: List[tuple[int, Optional[datetime]]],
+    grades: Optional[Dict[int, int]] = None
+) -> Dict[int, str]:
+    """
+    復習タスクをまとめて完了する
+
+    1回のトランザクションで、対象タスクの SELECT・完了の一括 UPDATE・
+    1年ごとの次タスクの一括 INSERT を行う。
+    適応型スケジューラ（config.SCHEDULER）では、評価から易しさ係数を更新し、
+    同じ学習項目の残りのタスクの予定日を変更する
+
+    Args:
+        db: データベースセッション
+        completions: (復習タスクID, 完了日時) のリスト（完了日時が None なら現在時刻）
+        grades: 復習タスクIDごとの評価（0〜5、省略したタスクは易しさ係数を変えない）
+
+    Returns:
+        復習タスクIDごとの結果
+        （"completed" / "already_completed" / "not_found"）
+    """
+    task_ids = {task_id for task_id, _ in completions}
+    tasks = {
+        task.id: task for task in db.query(
+            models.ReviewTask.id,
+            models.ReviewTask.learning_item_id,
+            models.ReviewTask.stage_offset_days,
+            models.ReviewTask.due_date,
+            models.ReviewTask.status
+        ).filter(models.ReviewTask.id.in_(task_ids))
+    }
+
+    grades = grades if grades else {}
+    now = datetime.utcnow()
+    outcomes: Dict[int, str] = {}
+    updates = []
+    completed = []
+    next_tasks_data = []
+    for task_id, completed_at in completions:
+        task = tasks.get(task_id)
+        if task is None:
+            outcomes[task_id] = "not_found"
+            continue
+        if task.status == "Completed" or task_id in outcomes:
+            outcomes.setdefault(task_id, "already_completed")
+            continue
+
+        if completed_at is None:
+            completed_at = now
+        elif completed_at.tzinfo is not None:
+            completed_at = completed_at.astimezone(timezone.utc).replace(tzinfo=None)
+        updates.append({"id": task_id, "status": "Completed", "completed_at": completed_at})
+        completed.append((task, completed_at, grades.get(task_id)))
+        outcomes[task_id] = "completed"
+
+        # 1年ごとのタスクの場合、次のタスクを生成
+        if _is_yearly_stage(task.stage_offset_days):
+            next_tasks_data.append(generate_next_yearly_task(
+                task.learning_item_id,
+                task.stage_offset_days,
+                task.due_date
+            ))
+
+    if updates:
+        db.execute(update(models.ReviewTask), updates)
+
+    scheduler = get_scheduler()
+    if scheduler.adaptive and completed:
+        _reschedule_after_completion(db, scheduler, completed, next_tasks_data)
+
+    if next_tasks_data:
+        # 完了取り消し後に再度完了した場合は既存の次タスクを再利用する
+        existing = set(
+            db.query(models.ReviewTask.learning_item_id, models.ReviewTask.stage_offset_days)
+            .filter(tuple_(
+                models.ReviewTask.learning_item_id,
+                models.ReviewTask.stage_offset_days
+            ).in_([
+                (data["learning_item_id"], data["stage_offset_days"])
+                for data in next_tasks_data
+            ]))
+            .all()
+        )
+        next_tasks_data = _mark_due_tasks_ready([
+            data for data in next_tasks_data
+            if (data["learning_item_id"], data["stage_offset_days"]) not in existing
+        ])
+        for data in next_tasks_data:
+            data["created_at"] = now
+        if next_tasks_data:
+            # sort_by_parameter_order は SQLite では1行ずつの INSERT になるため使わない。
+            # SQLite は VALUES の順に昇順の rowid を割り当てるため、ソートしたIDが入力順に対応する
+            next_task_ids = sorted(db.execute(
+                insert(models.ReviewTask.__table__).returning(models.ReviewTask.id),
+                next_tasks_data
+            ).scalars().all())
+            for data, next_task_id in zip(next_tasks_data, next_task_ids):
+                data["id"] = next_task_id
+
+    completed_item_ids = {task.learning_item_id for task, _, _ in completed}
+    if updates:
+        _refresh_next_reviews(db, completed_item_ids)
+        _bump_versions(db, "learning_items", "review_tasks")
+    db.commit()
+    _invalidate_read_cache(item_ids=completed_item_ids)
+
+    if completed:
+        broker.publish("task_completed", {"ids": [task.id for task, _, _ in completed]})
+    if next_tasks_data:
+        broker.publish("yearly_task_created", {"tasks": [
+            {key: data[key] for key in (
+                "id", "learning_item_id", "stage_name", "stage_offset_days", "due_date", "status"
+            )}
+            for data in next_tasks_data
+        ]})
+    # 適応型スケジューラで予定日が早まったタスクや、予定日を過ぎた次のタスクは今日に加わる
+    if completed and (scheduler.adaptive or any(
+        data["status"] == "Ready" for data in next_tasks_data
+    )):
+        _publish_ready_tasks(db, models.ReviewTask.learning_item_id.in_(completed_item_ids))
+    return outcomes
+
+
+def complete_review_task(
+    db: Session,
+    task_id: int,
+    grade: Optional[int] = None
+) -> Optional[models.ReviewTask]:
     """
     復習タスクを完了する
 
@@ -318,6 +1705,7 @@ def complete_review_task(db: Session, task_id: int) -> Optional[models.ReviewTas
     Args:
         db: データベースセッション
         task_id: 復習タスクID
+        grade: 評価（0〜5、適応型スケジューラで使う）
 
     Returns:
         完了した復習タスク（見つからない場合はNone）
@@ -325,31 +1713,47 @@ def complete_review_task(db: Session, task_id: int) -> Optional[models.ReviewTas
     Raises:
         ValueError: 既に完了済みの場合
     """
-    task = db.query(models.ReviewTask).filter(models.ReviewTask.id == task_id).first()
-    if not task:
+    grades = {task_id: grade} if grade is not None else None
+    outcome = complete_review_tasks(db, [(task_id, None)], grades)[task_id]
+    if outcome == "not_found":
         return None
-
-    if task.status == "Completed":
+    if outcome == "already_completed":
         raise ValueError("Task is already completed")
 
-    # 完了処理
-    task.status = "Completed"
-    task.completed_at = datetime.utcnow()
-    db.commit()
+    return get_review_task(db, task_id)
 
-    # 1年ごとのタスクの場合、次のタスクを生成
-    if task.stage_offset_days >= 365 and task.stage_offset_days % 365 == 0:
-        next_task_data = generate_next_yearly_task(
-            task.learning_item_id,
-            task.stage_offset_days,
-            task.due_date
-        )
-        next_task = models.ReviewTask(**next_task_data)
-        db.add(next_task)
+
+def uncomplete_review_tasks(db: Session, task_ids: List[int]) -> Dict[int, str]:
+    """
+    復習タスクの完了をまとめて取り消す
+
+    Args:
+        db: データベースセッション
+        task_ids: 復習タスクIDのリスト
+
+    Returns:
+        復習タスクIDごとの結果（"uncompleted" / "not_found"）
+    """
+    item_ids = dict(
+        db.query(models.ReviewTask.id, models.ReviewTask.learning_item_id)
+        .filter(models.ReviewTask.id.in_(set(task_ids)))
+        .all()
+    )
+    existing_ids = set(item_ids)
+    if existing_ids:
+        db.query(models.ReviewTask)\
+            .filter(models.ReviewTask.id.in_(existing_ids))\
+            .update({"status": "Ready", "completed_at": None}, synchronize_session=False)
+        _refresh_next_reviews(db, set(item_ids.values()))
+        _bump_versions(db, "learning_items", "review_tasks")
         db.commit()
+        _invalidate_read_cache(item_ids=set(item_ids.values()))
+        _publish_ready_tasks(db, models.ReviewTask.id.in_(existing_ids))
 
-    db.refresh(task)
-    return task
+    return {
+        task_id: "uncompleted" if task_id in existing_ids else "not_found"
+        for task_id in task_ids
+    }
 
 
 def uncomplete_review_task(db: Session, task_id: int) -> Optional[models.ReviewTask]:
@@ -369,6 +1773,192 @@ def uncomplete_review_task(db: Session, task_id: int) -> Optional[models.ReviewT
 
     task.status = "Ready"
     task.completed_at = None
+    db.flush()
+    _refresh_next_reviews(db, [task.learning_item_id])
+    _bump_versions(db, "learning_items", "review_tasks")
     db.commit()
+    _invalidate_read_cache(item_ids=[task.learning_item_id])
+    _publish_ready_tasks(db, models.ReviewTask.id == task_id)
     db.refresh(task)
     return task
+
+
+def recompute_due_dates(
+    db: Session,
+    scheduler: Optional[FixedScheduler] = None,
+    today: Optional[date] = None
+) -> int:
+    """
+    未到来の（Pending の）復習タスクの予定日をスケジューラで一括再計算する
+
+    学習項目ごとに最後に完了したステージ（なければ開始日）を基準にする。
+    行ごとの Python のループではなく NumPy の配列演算で計算し、
+    予定日が変わったタスクだけを1回の executemany で更新する
+
+    Args:
+        db: データベースセッション
+        scheduler: スケジューラ（省略時は config.SCHEDULER）
+        today: 基準日（省略時は今日）
+
+    Returns:
+        予定日を変更したタスク数
+    """
+    scheduler = scheduler if scheduler else get_scheduler()
+    today = today if today else date.today()
+
+    # 遅延生成モードで作成した学習項目は未生成のステージも再計算できるよう実体化する
+    # （実体化しても予定日は変わらないため、再計算とは別にコミットしてよい）
+    if scheduler.adaptive and _materialize_remaining_review_tasks(db):
+        db.commit()
+        learning_item_cache.clear()
+
+    task_ids, task_item_ids, task_offsets, task_due = _fetch_columns(db, select(
+        models.ReviewTask.id,
+        models.ReviewTask.learning_item_id,
+        models.ReviewTask.stage_offset_days,
+        _epoch_days(models.ReviewTask.due_date)
+    ).where(models.ReviewTask.status == "Pending"), 4)
+
+    items = select(models.LearningItem.id)\
+        .where(models.LearningItem.start_date.isnot(None))\
+        .order_by(models.LearningItem.id)
+    item_ids, start_dates = _fetch_columns(
+        db, items.add_columns(_epoch_days(models.LearningItem.start_date)), 2
+    )
+    ease = _fetch_columns(
+        db, items.with_only_columns(models.LearningItem.ease_factor), 1, dtype=float
+    )[0]
+    if not len(task_ids) or not len(item_ids):
+        return 0
+    anchor_dates = start_dates.astype("datetime64[D]")
+    anchor_offsets = np.zeros(len(item_ids), dtype=np.int64)
+
+    # 学習項目ごとに最後に完了したステージ
+    # （SQLite では max() と同じ行の列が返る）
+    completed_item_ids, completed_offsets, completed_due, completed_dates = _fetch_columns(
+        db,
+        select(
+            models.ReviewTask.learning_item_id,
+            func.max(models.ReviewTask.stage_offset_days),
+            _epoch_days(models.ReviewTask.due_date),
+            _epoch_days(models.ReviewTask.completed_at, "localtime")
+        ).where(models.ReviewTask.status == "Completed")
+            .group_by(models.ReviewTask.learning_item_id),
+        4
+    )
+    index = np.minimum(np.searchsorted(item_ids, completed_item_ids), len(item_ids) - 1)
+    found = item_ids[index] == completed_item_ids
+    index = index[found]
+    anchor_dates[index] = scheduler.anchor_dates(
+        completed_due[found].astype("datetime64[D]"),
+        completed_dates[found].astype("datetime64[D]")
+    )
+    anchor_offsets[index] = completed_offsets[found]
+
+    index = np.minimum(np.searchsorted(item_ids, task_item_ids), len(item_ids) - 1)
+    due = scheduler.due_dates(
+        anchor_dates[index], anchor_offsets[index], task_offsets, ease[index]
+    )
+    # 基準より前のステージ（予定日前に後のステージを完了した場合）はそのままにする
+    changed = (item_ids[index] == task_item_ids) \
+        & (task_offsets > anchor_offsets[index]) \
+        & (due != task_due.astype("datetime64[D]"))
+    if not changed.any():
+        return 0
+
+    new_due = due[changed]
+    statuses = np.where(new_due <= np.datetime64(today, "D"), "Ready", "Pending")
+    # 件数が多いため、日付を NumPy で文字列にしてドライバの executemany に直接渡す
+    db.connection().exec_driver_sql(
+        "UPDATE review_tasks SET due_date = ?, status = ? WHERE id = ?",
+        list(zip(
+            np.datetime_as_string(new_due, unit="D").tolist(),
+            statuses.tolist(),
+            task_ids[changed].tolist()
+        ))
+    )
+    _refresh_next_reviews(db, np.unique(task_item_ids[changed]).tolist())
+    _bump_versions(db, "learning_items", "review_tasks")
+    db.commit()
+    learning_item_cache.clear()
+    _publish_reset("recompute")
+    return int(changed.sum())
+
+
+# ============================================================================
+# Export
+# ============================================================================
+
+# エクスポートで1回に読み込む行数
+EXPORT_BATCH_SIZE = 1000
+
+# CSV エクスポート（復習タスク1件1行）の列
+EXPORT_HISTORY_COLUMNS = {
+    "source_id": models.Source.id,
+    "source_title": models.Source.title,
+    "source_category": models.Source.category,
+    "learning_item_id": models.LearningItem.id,
+    "learning_item_title": models.LearningItem.title,
+    "learning_item_content": models.LearningItem.content,
+    "start_date": models.LearningItem.start_date,
+    "review_task_id": models.ReviewTask.id,
+    "stage_name": models.ReviewTask.stage_name,
+    "stage_offset_days": models.ReviewTask.stage_offset_days,
+    "due_date": models.ReviewTask.due_date,
+    "status": models.ReviewTask.status,
+    "completed_at": models.ReviewTask.completed_at,
+}
+
+
+def iter_export_tables(
+    db: Session,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[tuple[str, list, list]]:
+    """
+    媒体・学習項目・復習タスクの全行を、テーブルごとに主キー順で少しずつ読み込む
+
+    yield_per で batch_size 行ずつカーソルから取り出すため、
+    行数に関わらずメモリ使用量は一定になる
+
+    Args:
+        db: データベースセッション
+        batch_size: 1回に読み込む行数
+
+    Yields:
+        (テーブル名, 列名のリスト, 行のリスト)
+    """
+    for model in (models.Source, models.LearningItem, models.ReviewTask):
+        # 行数が多いため ORM を経由せず Core の接続で読む
+        result = db.connection().execute(
+            select(*model.__table__.columns)
+            .order_by(model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        keys = list(result.keys())
+        for rows in result.partitions():
+            yield model.__tablename__, keys, rows
+
+
+def iter_export_history(db: Session, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+    """
+    復習タスク1件を1行として、学習項目と媒体を結合した学習履歴を少しずつ読み込む
+
+    (learning_item_id, stage_offset_days) インデックスの順に読むため並び替えは発生しない
+    （復習タスクのない学習項目・媒体は含まない）
+
+    Args:
+        db: データベースセッション
+        batch_size: 1回に読み込む行数
+
+    Yields:
+        行のリスト（列は EXPORT_HISTORY_COLUMNS の順）
+    """
+    result = db.connection().execute(
+        select(*(column.label(name) for name, column in EXPORT_HISTORY_COLUMNS.items()))
+        .select_from(models.ReviewTask)
+        .join(models.LearningItem, models.ReviewTask.learning_item_id == models.LearningItem.id)
+        .join(models.Source, models.LearningItem.source_id == models.Source.id)
+        .order_by(models.ReviewTask.learning_item_id, models.ReviewTask.stage_offset_days)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from result.partitions()
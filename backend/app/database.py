@@ -1,22 +1,117 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from app.config import DATABASE_URL
-
-# Create SQLite engine
-engine = create_engine(
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Union
+from app.config import (
     DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    DB_ASYNC,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_BUSY_TIMEOUT,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    REQUEST_INSTRUMENTATION,
 )
+from app.metrics import CountingConnection, instrument_engine
+
+
+def is_memory_database(url: str) -> bool:
+    """インメモリの SQLite データベースかどうか"""
+    return make_url(url).database in (None, "", ":memory:")
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """新規接続ごとに SQLite の PRAGMA を設定する"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE:d}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE:d}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT:d}")
+    # 媒体・学習項目の削除は外部キーの ON DELETE CASCADE で子の行を消す
+    # （SQLite の既定では外部キー制約が無効）
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _engine_options(url: str) -> dict:
+    # インメモリデータベースは接続ごとに別データベースになるためプール設定を使わない
+    pool_options = {} if is_memory_database(url) else {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+    }
+    connect_args = {
+        "check_same_thread": False,  # Needed for SQLite
+        "timeout": SQLITE_BUSY_TIMEOUT / 1000,
+    }
+    if REQUEST_INSTRUMENTATION:
+        # リクエストごとの取得行数を数える
+        connect_args["factory"] = CountingConnection
+    return {
+        "connect_args": connect_args,
+        **pool_options
+    }
+
+
+def create_async_sessionmaker(url: str):
+    """
+    aiosqlite を使う非同期エンジンとセッションファクトリを作成する
+
+    Args:
+        url: データベースURL（ドライバ指定は aiosqlite に置き換える）
+
+    Returns:
+        AsyncSession のファクトリ
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    options = _engine_options(url)
+    if not is_memory_database(url):
+        # aiosqlite の既定は NullPool のため、プール設定を使うよう明示する
+        options["poolclass"] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(
+        make_url(url).set(drivername="sqlite+aiosqlite"),
+        **options
+    )
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+    if REQUEST_INSTRUMENTATION:
+        instrument_engine(async_engine.sync_engine)
+    # コミット後にレスポンスを組み立てるため属性を失効させない
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+# Create SQLite engine
+# マイグレーションや日付切り替えジョブは非同期モードでも同期エンジンを使う
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+event.listen(engine, "connect", set_sqlite_pragmas)
+if REQUEST_INSTRUMENTATION:
+    instrument_engine(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create AsyncSessionLocal class (DB_ASYNC=true の場合のみ)
+AsyncSessionLocal = create_async_sessionmaker(DATABASE_URL) if DB_ASYNC else None
+
+# ルーターが受け取るセッションの型（DB_ASYNC の設定で切り替わる）
+DbSession = Union[Session, AsyncSession]
+
 # Create Base class for models
 Base = declarative_base()
 
 # Dependency to get database session
-def get_db():
+# DB_ASYNC=true なら AsyncSession、それ以外は Session を返す
+async def get_db():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,127 @@
+import asyncio
+import itertools
+import logging
+import threading
+from typing import Any, Optional, Set
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# 購読者ごとにためておくイベント数の上限（超えたら reset に置き換える）
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+# ============================================================================
+# Review Task Events
+# ============================================================================
+# crud の書き込み（コミット後）から発行し、SSE（/api/review-tasks/stream）で
+# ダッシュボードに配信する。イベントの種類:
+# - task_ready: 今日のタスクに加わった（または内容が変わった）タスクの行
+# - task_completed: 完了して今日のタスクから外れたタスクのID
+# - yearly_task_created: 完了時に生成された1年ごとの次のタスク
+# - reset: 変更が多いため今日のタスクを取得し直す（日付切り替え・削除など）
+# 配信は同じプロセス内の書き込みだけが対象。
+
+class Subscription:
+    """1つの SSE 接続の購読（イベントループ上のキューで受け取る）"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue: "asyncio.Queue[tuple[int, str, Any]]" = asyncio.Queue(queue_size)
+
+    def put(self, event: tuple[int, str, Any]) -> None:
+        """イベントをキューに入れる（イベントループのスレッドで呼ぶ）"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 取りこぼした変更は差分で表せないため、取得し直させる
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((event[0], "reset", {"reason": "overflow"}))
+
+    async def get(self, timeout: float) -> Optional[tuple[int, str, Any]]:
+        """
+        次のイベントを待つ
+
+        Args:
+            timeout: 待つ秒数
+
+        Returns:
+            (イベントID, イベント名, データ)（時間内に届かなければNone）
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """
+    イベントを購読者に配信する
+
+    publish はどのスレッドからでも呼べる（crud はスレッドプールで実行される）
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self) -> Subscription:
+        """実行中のイベントループで受け取る購読を登録する"""
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """購読を解除する"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def has_subscribers(self) -> bool:
+        """購読者がいるか（いなければイベントの組み立てを省略できる）"""
+        return bool(self._subscribers)
+
+    def publish(self, event: str, data: Any) -> None:
+        """
+        イベントをすべての購読者に配信する
+
+        Args:
+            event: イベント名
+            data: JSON にできるデータ
+        """
+        with self._lock:
+            event_id = next(self._ids)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, (event_id, event, data))
+            except RuntimeError:
+                # イベントループが終了済み
+                logger.warning("Dropping subscriber of a closed event loop")
+                self.unsubscribe(subscription)
+
+
+def format_sse(event_id: int, event: str, data: Any) -> str:
+    """
+    イベントを Server-Sent Events の形式にする
+
+    Args:
+        event_id: イベントID
+        event: イベント名
+        data: JSON にできるデータ
+
+    Returns:
+        SSE のメッセージ（空行で終わる）
+    """
+    return f"id: {event_id}\nevent: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+
+# アプリケーション全体で共有するブローカー
+broker = EventBroker()
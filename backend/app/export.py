@@ -0,0 +1,95 @@
+import csv
+import io
+from typing import Callable, Iterator
+import orjson
+from sqlalchemy.orm import Session
+from app import crud
+from app.database import SessionLocal
+
+# エクスポート形式と Content-Type
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# NDJSON の各行の type（テーブル名から）
+NDJSON_ROW_TYPES = {
+    "sources": "source",
+    "learning_items": "learning_item",
+    "review_tasks": "review_task",
+}
+
+
+def iter_ndjson(db: Session, batch_size: int = crud.EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    媒体・学習項目・復習タスクの全行を NDJSON（1行1レコード、type 付き）にする
+
+    Args:
+        db: データベースセッション
+        batch_size: 1回に読み込む行数
+
+    Yields:
+        batch_size 行分の NDJSON
+    """
+    for table_name, keys, rows in crud.iter_export_tables(db, batch_size):
+        keys = ["type", *keys]
+        row_type = NDJSON_ROW_TYPES[table_name]
+        yield b"".join(
+            orjson.dumps(dict(zip(keys, (row_type, *row)))) + b"\n" for row in rows
+        )
+
+
+def iter_csv(db: Session, batch_size: int = crud.EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    学習履歴（復習タスク1件1行、学習項目・媒体の列付き）を CSV にする
+
+    Args:
+        db: データベースセッション
+        batch_size: 1回に読み込む行数
+
+    Yields:
+        ヘッダー行、以降は batch_size 行分の CSV
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(crud.EXPORT_HISTORY_COLUMNS)
+    for rows in crud.iter_export_history(db, batch_size):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def stream_export(
+    format: str,
+    batch_size: int = crud.EXPORT_BATCH_SIZE,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> Iterator[bytes]:
+    """
+    エクスポートを少しずつ生成する（StreamingResponse 用）
+
+    レスポンスの送信中も読み込みを続けるため、リクエストのセッションではなく
+    専用のセッションを開き、生成が終わったら（切断時も）閉じる
+
+    Args:
+        format: "ndjson" または "csv"
+        batch_size: 1回に読み込む行数
+        session_factory: セッションのファクトリ
+
+    Yields:
+        エクスポートの断片
+
+    Raises:
+        ValueError: 未知の形式の場合
+    """
+    if format not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unknown export format: {format}")
+    iter_rows = iter_ndjson if format == "ndjson" else iter_csv
+
+    db = session_factory()
+    try:
+        yield from iter_rows(db, batch_size)
+    finally:
+        db.close()
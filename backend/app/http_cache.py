@@ -0,0 +1,74 @@
+from datetime import date
+from typing import Any, Optional
+from fastapi import Request, Response, status
+
+# 条件付き GET 対応のレスポンスに付ける Cache-Control
+# （ブラウザにはキャッシュさせるが、使う前に必ず ETag で再検証させる）
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    値の並びから弱い ETag を作る
+
+    Args:
+        parts: ETag の元になる値（更新日時・ID・変更カウンタなど）
+
+    Returns:
+        W/"..." 形式の ETag
+    """
+    return 'W/"' + "-".join(_etag_part(part) for part in parts) + '"'
+
+
+def _etag_part(part: Any) -> str:
+    # ETag には空白を含められない（RFC 9110 の etagc）ため、日時は ISO 形式にする
+    if part is None:
+        return ""
+    if isinstance(part, date):
+        return part.isoformat()
+    return str(part)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match ヘッダーが ETag に一致するか（弱い比較）
+
+    Args:
+        if_none_match: If-None-Match ヘッダーの値
+        etag: 現在の ETag
+
+    Returns:
+        一致すればTrue
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def set_cache_headers(response: Response, etag: str) -> Response:
+    """レスポンスに ETag と Cache-Control を付ける"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    リクエストの If-None-Match が ETag に一致すれば 304 レスポンスを返す
+
+    Args:
+        request: リクエスト
+        etag: 現在の ETag
+
+    Returns:
+        304 レスポンス（一致しない場合はNone）
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return set_cache_headers(Response(status_code=status.HTTP_304_NOT_MODIFIED), etag)
+    return None
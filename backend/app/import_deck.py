@@ -0,0 +1,48 @@
+"""
+CSV または Anki のデッキ（.apkg）をインポートする
+
+デッキを媒体、ノートを学習項目として登録し、復習タスクを生成する。
+
+    python -m app.import_deck deck.apkg [--source-title NAME] [--chunk-size N] [--daily-cap N]
+"""
+import argparse
+import sys
+from pathlib import Path
+from app.database import SessionLocal
+from app.importer import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, import_notes, read_notes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a CSV file or Anki deck package")
+    parser.add_argument("path", type=Path, help="CSV or .apkg file")
+    parser.add_argument("--format", choices=sorted(set(IMPORT_FORMATS.values())),
+                        help="file format (default: from the file extension)")
+    parser.add_argument("--source-title", help="source for CSV rows without a source column")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE,
+                        help="learning items per transaction")
+    parser.add_argument("--daily-cap", type=int, default=None,
+                        help="spread due dates to keep at most N reviews per day")
+    args = parser.parse_args()
+
+    format = args.format or IMPORT_FORMATS.get(args.path.suffix.lower())
+    if format is None:
+        parser.error("cannot determine format from the file extension; use --format")
+
+    db = SessionLocal()
+    try:
+        notes = read_notes(args.path, format, args.source_title or args.path.stem)
+        for progress in import_notes(db, notes, args.chunk_size, args.daily_cap):
+            print(
+                f"\rProcessed {progress['processed']}, created {progress['created']}, "
+                f"skipped {progress['skipped']}",
+                end="", file=sys.stderr, flush=True
+            )
+    finally:
+        db.close()
+    print(file=sys.stderr)
+    print(f"Imported {progress['created']} learning items "
+          f"({progress['sources_created']} new sources, {progress['skipped']} skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import csv
+import html
+import json
+import re
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import crud, schemas
+from app.database import SessionLocal
+
+# 1トランザクションで登録する学習項目数
+IMPORT_CHUNK_SIZE = 1000
+
+# 学習項目のタイトルの最大長（schemas.LearningItemBase と同じ）
+TITLE_MAX_LENGTH = 255
+
+# CSV の列名（別名も受け付ける）
+CSV_COLUMN_ALIASES = {
+    "title": ("title", "front", "question"),
+    "content": ("content", "back", "answer"),
+    "source": ("source", "deck"),
+    "start_date": ("start_date",),
+}
+
+# Anki のコレクションファイル（新しい順。collection.anki21b は zstd 圧縮のため未対応）
+ANKI_COLLECTION_NAMES = ("collection.anki21", "collection.anki2")
+
+# インポートできる形式とファイルの拡張子
+IMPORT_FORMATS = {".csv": "csv", ".apkg": "apkg", ".colpkg": "apkg"}
+
+# インポートする1件: (媒体名, タイトル, 内容, 開始日)
+ImportedNote = Tuple[str, str, Optional[str], Optional[date]]
+
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_BREAK_PATTERN = re.compile(r"<br\s*/?>|</?(?:div|p)(?:\s[^>]*)?>", re.IGNORECASE)
+
+
+def html_to_text(value: str) -> str:
+    """Anki のフィールド（HTML）をプレーンテキストにする"""
+    text = _BREAK_PATTERN.sub("\n", value)
+    text = html.unescape(_TAG_PATTERN.sub("", text))
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+# ============================================================================
+# Readers
+# ============================================================================
+
+def iter_csv_notes(file: TextIO, default_source: str) -> Iterator[ImportedNote]:
+    """
+    CSV を1行ずつ読み込む
+
+    1行目は列名（title/front, content/back, source/deck, start_date）。
+    source 列がない行は default_source の媒体に登録する
+
+    Args:
+        file: CSV のテキストファイル
+        default_source: 既定の媒体名
+
+    Yields:
+        (媒体名, タイトル, 内容, 開始日)
+
+    Raises:
+        ValueError: title 列がない場合、開始日の形式が不正な場合
+    """
+    reader = csv.reader(file)
+    header = [name.strip().lower() for name in next(reader, [])]
+    columns = {
+        key: next((header.index(name) for name in aliases if name in header), None)
+        for key, aliases in CSV_COLUMN_ALIASES.items()
+    }
+    if columns["title"] is None:
+        raise ValueError("CSV must have a title (or front) column")
+
+    def cell(row: List[str], key: str) -> Optional[str]:
+        index = columns[key]
+        value = row[index].strip() if index is not None and index < len(row) else ""
+        return value or None
+
+    for line_number, row in enumerate(reader, start=2):
+        start_date = cell(row, "start_date")
+        try:
+            start_date = date.fromisoformat(start_date) if start_date else None
+        except ValueError:
+            raise ValueError(f"Invalid start_date on line {line_number}: {start_date}")
+        yield (
+            cell(row, "source") or default_source,
+            cell(row, "title") or "",
+            cell(row, "content"),
+            start_date,
+        )
+
+
+def _anki_deck_names(conn: sqlite3.Connection) -> Dict[int, str]:
+    """デッキIDからデッキ名（階層は :: 区切り）への対応"""
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "decks" in tables:
+        # スキーマ v18 以降（階層の区切りは \x1f）
+        rows = conn.execute("SELECT id, name FROM decks")
+        return {deck_id: name.replace("\x1f", "::") for deck_id, name in rows}
+    (decks,) = conn.execute("SELECT decks FROM col").fetchone()
+    return {int(deck_id): deck["name"] for deck_id, deck in json.loads(decks).items()}
+
+
+def iter_apkg_notes(path: Path) -> Iterator[ImportedNote]:
+    """
+    Anki のデッキパッケージ（.apkg / .colpkg）のノートを1件ずつ読み込む
+
+    パッケージ内のコレクション（SQLite）を一時ファイルに展開し、カーソルで
+    読み進めるため、ノート数に関わらずメモリ使用量は一定。
+    最初のフィールドをタイトル、残りのフィールドを内容にし、
+    ノートの最初のカードのデッキを媒体にする
+
+    Args:
+        path: パッケージのパス
+
+    Yields:
+        (媒体名, タイトル, 内容, 開始日)（開始日は常に None）
+
+    Raises:
+        ValueError: 読み込めるコレクションがない場合
+    """
+    with zipfile.ZipFile(path) as package:
+        names = set(package.namelist())
+        member = next((name for name in ANKI_COLLECTION_NAMES if name in names), None)
+        if member is None:
+            raise ValueError(
+                "No supported collection in package "
+                "(export with 'Support older Anki versions' enabled)"
+            )
+        with tempfile.TemporaryDirectory(prefix="ars-import-") as tmpdir:
+            collection_path = Path(tmpdir) / "collection.db"
+            with package.open(member) as source, open(collection_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+
+            conn = sqlite3.connect(collection_path)
+            try:
+                # 展開したコピーなので、ノートごとのカードの検索用の索引を追加してよい
+                conn.execute("CREATE INDEX IF NOT EXISTS ars_import_cards_nid ON cards (nid, ord)")
+                decks = _anki_deck_names(conn)
+                notes = conn.execute(
+                    "SELECT n.flds, (SELECT c.did FROM cards c WHERE c.nid = n.id "
+                    "ORDER BY c.ord LIMIT 1) FROM notes n ORDER BY n.id"
+                )
+                for fields, deck_id in notes:
+                    front, *back = (html_to_text(field) for field in fields.split("\x1f"))
+                    content = "\n\n".join(field for field in back if field)
+                    yield decks.get(deck_id, "Default"), front, content or None, None
+            finally:
+                conn.close()
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+def import_notes(
+    db: Session,
+    notes: Iterator[ImportedNote],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    daily_cap: Optional[int] = None
+) -> Iterator[dict]:
+    """
+    ノートを媒体と学習項目として登録する
+
+    chunk_size 件ごとに crud.bulk_create_learning_items で1トランザクションにまとめて
+    登録し（復習タスクは app.scheduler で生成される）、そのたびに進捗を返す。
+    媒体は同じタイトルのものがあれば再利用する。
+    タイトルが空のノートはスキップし、255文字を超えるタイトルは切り詰める
+
+    Args:
+        db: データベースセッション
+        notes: (媒体名, タイトル, 内容, 開始日) のイテレータ
+        chunk_size: 1トランザクションで登録する件数
+        daily_cap: 予定日をずらして抑える1日の復習件数の上限（load smoothing）
+
+    Yields:
+        進捗（processed: 読み込んだ件数, created: 登録した件数,
+        skipped: スキップした件数, sources_created: 作成した媒体数,
+        done: 最後の進捗なら True）
+    """
+    source_ids: Dict[str, int] = {}
+    progress = {"processed": 0, "created": 0, "skipped": 0, "sources_created": 0}
+    chunk: List[schemas.LearningItemCreate] = []
+
+    def source_id_for(name: str) -> int:
+        if name not in source_ids:
+            title = name[:TITLE_MAX_LENGTH]
+            source_ids[name], created = crud.get_or_create_source(
+                db, schemas.SourceCreate(title=title, category="Import")
+            )
+            progress["sources_created"] += created
+        return source_ids[name]
+
+    def flush() -> None:
+        item_ids = crud.bulk_create_learning_items(db, chunk, daily_cap=daily_cap)
+        created = sum(1 for item_id in item_ids if item_id is not None)
+        progress["created"] += created
+        progress["skipped"] += len(chunk) - created
+        chunk.clear()
+
+    for source_name, title, content, start_date in notes:
+        progress["processed"] += 1
+        try:
+            chunk.append(schemas.LearningItemCreate(
+                source_id=source_id_for(source_name),
+                title=title[:TITLE_MAX_LENGTH],
+                content=content,
+                start_date=start_date
+            ))
+        except ValidationError:
+            progress["skipped"] += 1
+        if len(chunk) >= chunk_size:
+            flush()
+            yield dict(progress, done=False)
+    if chunk:
+        flush()
+    yield dict(progress, done=True)
+
+
+def read_notes(path: Path, format: str, default_source: str) -> Iterator[ImportedNote]:
+    """
+    形式に応じてファイルのノートを読み込む
+
+    Args:
+        path: ファイルのパス
+        format: "csv" または "apkg"
+        default_source: CSV で媒体名がない行の媒体名
+
+    Yields:
+        (媒体名, タイトル, 内容, 開始日)
+    """
+    if format == "apkg":
+        yield from iter_apkg_notes(path)
+        return
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        yield from iter_csv_notes(file, default_source)
+
+
+def stream_import(
+    path: Path,
+    format: str,
+    default_source: str,
+    daily_cap: Optional[int] = None,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> Iterator[bytes]:
+    """
+    ファイルをインポートし、進捗を NDJSON で返す（StreamingResponse 用）
+
+    専用のセッションを開き、終わったら（切断時も）セッションを閉じて
+    アップロードされた一時ファイルを削除する。
+    読み込み中・登録中のエラーは error 付きの最後の進捗として返す
+
+    Args:
+        path: アップロードされた一時ファイルのパス
+        format: "csv" または "apkg"
+        default_source: CSV で媒体名がない行の媒体名
+        daily_cap: 予定日をずらして抑える1日の復習件数の上限
+        session_factory: セッションのファクトリ
+
+    Yields:
+        進捗の NDJSON の行
+    """
+    db = session_factory()
+    progress: dict = {}
+    try:
+        for progress in import_notes(
+            db, read_notes(path, format, default_source), daily_cap=daily_cap
+        ):
+            yield orjson.dumps(progress) + b"\n"
+    except (ValueError, zipfile.BadZipFile, sqlite3.DatabaseError, UnicodeDecodeError) as e:
+        yield orjson.dumps(dict(progress, done=True, error=str(e))) + b"\n"
+    except SQLAlchemyError as e:
+        # 登録済みのチャンクはコミット済み。途中のチャンクだけ取り消す
+        db.rollback()
+        error = f"Database error: {getattr(e, 'orig', None) or e}"
+        yield orjson.dumps(dict(progress, done=True, error=error)) + b"\n"
+    finally:
+        db.close()
+        path.unlink(missing_ok=True)
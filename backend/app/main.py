@@ -1,16 +1,38 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app import metrics
+from app.config import METRICS_ENABLED, REQUEST_INSTRUMENTATION
 from app.database import engine, Base
-from app.api import sources, learning_items, review_tasks
+from app.api import sources, learning_items, review_tasks, cache, export, imports
+from app.migrations import run_migrations
+from app.query_guard import GUARD
+from app.rollover import rollover_loop
 
-# データベーステーブルを作成
+# データベーステーブルを作成し、既存データベースのスキーマを更新
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """起動時に日付切り替えジョブを開始し、終了時に停止する"""
+    rollover_task = asyncio.create_task(rollover_loop())
+    try:
+        yield
+    finally:
+        rollover_task.cancel()
+
 
 # FastAPIアプリケーションを作成
 app = FastAPI(
     title="Active Recall Scheduler API",
     description="忘却曲線に基づく復習スケジューラーAPI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=metrics.TimedJSONResponse if METRICS_ENABLED else JSONResponse
 )
 
 # CORSミドルウェアを追加
@@ -22,10 +44,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# リクエストごとのクエリ数・行数・直列化の時間を計測する（Server-Timing ヘッダーと /metrics）
+# QUERY_GUARD が有効なら同じ計測値で N+1 クエリを検出する
+if REQUEST_INSTRUMENTATION:
+    metrics.instrument_response_models()
+    app.add_middleware(
+        metrics.MetricsMiddleware,
+        registry=metrics.REGISTRY if METRICS_ENABLED else None,
+        guard=GUARD
+    )
+
 # ルーターを登録
 app.include_router(sources.router, prefix="/api")
 app.include_router(learning_items.router, prefix="/api")
 app.include_router(review_tasks.router, prefix="/api")
+app.include_router(cache.router, prefix="/api")
+app.include_router(export.router, prefix="/api")
+app.include_router(imports.router, prefix="/api")
 
 
 @app.get("/")
@@ -42,3 +77,10 @@ def root():
 def health_check():
     """ヘルスチェックエンドポイント"""
     return {"status": "healthy"}
+
+
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def get_metrics():
+        """ルートごとのレイテンシ・クエリ数・取得行数・直列化の時間（Prometheus 形式）"""
+        return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
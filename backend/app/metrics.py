@@ -0,0 +1,385 @@
+import functools
+import sqlite3
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Dict, Optional, Tuple
+import fastapi.routing
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+# レイテンシのヒストグラムのバケット（秒）
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 1リクエストあたりのクエリ数のヒストグラムのバケット
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+# ルートに一致しなかったリクエストのラベル（404 のパスでラベルが増え続けないようにまとめる）
+UNMATCHED_ROUTE = "unmatched"
+
+# Prometheus のテキスト形式の Content-Type
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ============================================================================
+# Per-request metrics
+# ============================================================================
+
+class RequestMetrics:
+    """1リクエストの計測値（リクエストのコンテキストで共有される）"""
+
+    __slots__ = ("queries", "query_seconds", "rows", "serialize_seconds", "statements")
+
+    def __init__(self, track_statements: bool = False):
+        """
+        Args:
+            track_statements: SQL 文ごとの実行回数も記録するか（N+1 クエリの検出用）
+        """
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.rows = 0
+        self.serialize_seconds = 0.0
+        self.statements: Optional[Dict[str, int]] = {} if track_statements else None
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing ヘッダーの値（dur はミリ秒）"""
+        return (
+            f'db;dur={self.query_seconds * 1000:.3f};desc="{self.queries} queries, {self.rows} rows", '
+            f"serialize;dur={self.serialize_seconds * 1000:.3f}, "
+            f"total;dur={total_seconds * 1000:.3f}"
+        )
+
+
+# 処理中のリクエストの計測値（リクエスト外のクエリでは None）
+# スレッドプールで実行される crud にもコンテキストごと引き継がれる
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """処理中のリクエストの計測値（リクエスト外なら None）"""
+    return _current.get()
+
+
+def add_serialization_time(seconds: float) -> None:
+    """処理中のリクエストに直列化の時間を加える"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.serialize_seconds += seconds
+
+
+# ============================================================================
+# SQL instrumentation
+# ============================================================================
+
+class CountingCursor(sqlite3.Cursor):
+    """取得した行数を処理中のリクエストに加える sqlite3 のカーソル"""
+
+    def _count(self, rows: int) -> None:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.rows += rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._count(1)
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._count(len(rows))
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+    """
+    CountingCursor を返す sqlite3 の接続（connect_args の factory に指定する）
+
+    aiosqlite（DB_ASYNC=true）では行の取得が専用スレッドで行われ、
+    リクエストのコンテキストが届かないため行数は数えられない
+    """
+
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 開始時刻は実行コンテキストに持たせる（失敗した文は after が呼ばれないため、
+    # 接続に積むとプールに戻った接続に残って以降の計測がずれる）
+    if context is not None and _current.get() is not None:
+        context._metrics_start = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    start = getattr(context, "_metrics_start", None)
+    if metrics is None or start is None:
+        return
+    metrics.queries += 1
+    metrics.query_seconds += perf_counter() - start
+    if metrics.statements is not None:
+        metrics.statements[statement] = metrics.statements.get(statement, 0) + 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """エンジンのクエリの回数と時間をリクエストごとに記録する"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ============================================================================
+# Serialization instrumentation
+# ============================================================================
+
+class TimedJSONResponse(JSONResponse):
+    """JSON への変換の時間を記録する JSONResponse（FastAPI の既定のレスポンスクラス用）"""
+
+    def render(self, content) -> bytes:
+        start = perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            add_serialization_time(perf_counter() - start)
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    """JSON への変換の時間を記録する ORJSONResponse（fast_json_response 用）"""
+
+    def render(self, content) -> bytes:
+        start = perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            add_serialization_time(perf_counter() - start)
+
+
+def instrument_response_models() -> None:
+    """
+    response_model による検証・変換（fastapi.routing.serialize_response）の時間を記録する
+
+    FastAPI にはこの処理のフックがないため、モジュールの関数を置き換える
+    """
+    original = fastapi.routing.serialize_response
+    if getattr(original, "__wrapped__", None) is not None:
+        return
+
+    @functools.wraps(original)
+    async def serialize_response(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            add_serialization_time(perf_counter() - start)
+
+    fastapi.routing.serialize_response = serialize_response
+
+
+# ============================================================================
+# Registry
+# ============================================================================
+
+class Histogram:
+    """累積バケットのヒストグラム（Prometheus の histogram と同じ形）"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(上限, その上限以下の件数) を上限の昇順に返す（最後は +Inf）"""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+        yield float("inf"), self.count
+
+
+class RouteMetrics:
+    """ルート（メソッドとパスのテンプレート）ごとの集計"""
+
+    __slots__ = ("latency", "queries", "query_seconds", "rows", "serialize_seconds", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.query_seconds = 0.0
+        self.rows = 0
+        self.serialize_seconds = 0.0
+        self.statuses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """リクエストの計測値をルートごとに集計するスレッドセーフなレジストリ"""
+
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status: int, seconds: float, metrics: RequestMetrics) -> None:
+        """
+        1リクエストの計測値を加える
+
+        Args:
+            method: HTTP メソッド
+            route: ルートのパスのテンプレート
+            status: レスポンスのステータスコード
+            seconds: レスポンスヘッダーを送るまでの時間（秒）
+            metrics: リクエストの計測値
+        """
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = RouteMetrics()
+            stats.latency.observe(seconds)
+            stats.queries.observe(metrics.queries)
+            stats.query_seconds += metrics.query_seconds
+            stats.rows += metrics.rows
+            stats.serialize_seconds += metrics.serialize_seconds
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def reset(self) -> None:
+        """集計を破棄する（テスト用）"""
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        """Prometheus のテキスト形式で出力する"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+
+            def header(name: str, kind: str, help_text: str) -> None:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            def histogram(name: str, help_text: str, attribute: str) -> None:
+                header(name, "histogram", help_text)
+                for (method, route), stats in routes:
+                    values = getattr(stats, attribute)
+                    labels = _labels(method=method, route=route)
+                    for bound, count in values.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {values.sum}")
+                    lines.append(f"{name}_count{{{labels}}} {values.count}")
+
+            def counter(name: str, help_text: str, attribute: str) -> None:
+                header(name, "counter", help_text)
+                for (method, route), stats in routes:
+                    lines.append(f"{name}{{{_labels(method=method, route=route)}}} {getattr(stats, attribute)}")
+
+            header("ars_http_requests_total", "counter", "HTTP requests by route and status")
+            for (method, route), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    labels = _labels(method=method, route=route, status=str(status))
+                    lines.append(f"ars_http_requests_total{{{labels}}} {count}")
+            histogram(
+                "ars_http_request_duration_seconds",
+                "Time until the response headers are sent", "latency"
+            )
+            histogram("ars_db_queries_per_request", "SQL queries executed per request", "queries")
+            counter("ars_db_query_seconds_total", "Time spent executing SQL queries", "query_seconds")
+            counter("ars_db_rows_total", "Rows fetched from SQL queries", "rows")
+            counter(
+                "ars_serialization_seconds_total",
+                "Time spent validating and encoding responses", "serialize_seconds"
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    """Prometheus のラベル（値の \\ と " と改行はエスケープする）"""
+    return ",".join(
+        '{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels.items()
+    )
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ============================================================================
+# ASGI middleware
+# ============================================================================
+
+class MetricsMiddleware:
+    """
+    リクエストごとにクエリ数・クエリ時間・取得行数・直列化の時間を計測する ASGI ミドルウェア
+
+    レスポンスヘッダーを送る時点の計測値を Server-Timing ヘッダーに付け、
+    レジストリに集計する。ストリーミングのレスポンス（SSE・エクスポート）は
+    ヘッダーを送るまでの時間だけを計測する
+    """
+
+    def __init__(
+        self,
+        app,
+        registry: Optional[MetricsRegistry] = REGISTRY,
+        guard: Optional[Callable[[dict, RequestMetrics], None]] = None
+    ):
+        """
+        Args:
+            app: ASGI アプリケーション
+            registry: 集計先（None なら集計も Server-Timing ヘッダーも付けない）
+            guard: レスポンスヘッダーを送る前に計測値を検査する関数
+                （app.query_guard.QueryGuard。例外を送出するとリクエストは失敗する）
+        """
+        self.app = app
+        self.registry = registry
+        self.guard = guard
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(track_statements=getattr(self.guard, "enabled", False))
+        token = _current.set(metrics)
+        start = perf_counter()
+        started = False
+
+        def observe(status: int) -> float:
+            elapsed = perf_counter() - start
+            if self.registry is not None:
+                route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+                self.registry.observe(scope["method"], route, status, elapsed, metrics)
+            return elapsed
+
+        async def send_with_timing(message):
+            nonlocal started
+            if message["type"] == "http.response.start" and not started:
+                if self.guard is not None:
+                    self.guard(scope, metrics)
+                started = True
+                elapsed = observe(message["status"])
+                if self.registry is not None:
+                    MutableHeaders(scope=message).append("Server-Timing", metrics.server_timing(elapsed))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except Exception:
+            if not started:
+                observe(500)
+            raise
+        finally:
+            _current.reset(token)
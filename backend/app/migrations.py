@@ -0,0 +1,247 @@
+from typing import Callable, List, Tuple
+from sqlalchemy.engine import Connection, Engine
+from app.scheduler import REVIEW_SCHEDULE, YEARLY_OFFSET_DAYS
+
+
+# ============================================================================
+# Migrations
+# ============================================================================
+# 既存のデータベースに対するスキーマ変更を順番に定義する。
+# 適用済みのバージョンは PRAGMA user_version に記録する。
+# 新規作成のデータベースでは create_all 済みのスキーマに対して実行されるため、
+# 各マイグレーションは何度実行しても同じ結果になるように書くこと。
+
+def _migrate_review_task_composite_indexes(conn: Connection) -> None:
+    """復習タスクの単一カラムインデックスを複合インデックスに置き換える"""
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_status_due_date "
+        "ON review_tasks (status, due_date)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_learning_item_id_stage_offset_days "
+        "ON review_tasks (learning_item_id, stage_offset_days)"
+    )
+    conn.exec_driver_sql("DROP INDEX IF EXISTS idx_learning_item_id")
+    conn.exec_driver_sql("DROP INDEX IF EXISTS idx_due_date")
+    conn.exec_driver_sql("DROP INDEX IF EXISTS idx_status")
+
+
+def _migrate_keyset_pagination_indexes(conn: Connection) -> None:
+    """一覧のキーセットページネーション用インデックスを追加する"""
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_sources_created_at_id "
+        "ON sources (created_at, id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_learning_items_created_at_id "
+        "ON learning_items (created_at, id)"
+    )
+
+
+def _migrate_lazy_materialization_columns(conn: Connection) -> None:
+    """学習項目に開始日と実体化済みステージのカラムを追加する"""
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(learning_items)")}
+    if "start_date" not in columns:
+        conn.exec_driver_sql("ALTER TABLE learning_items ADD COLUMN start_date DATE")
+    if "materialized_through" not in columns:
+        conn.exec_driver_sql("ALTER TABLE learning_items ADD COLUMN materialized_through INTEGER")
+    # 既存の学習項目の開始日は「学習直後」タスクの予定日から復元する
+    conn.exec_driver_sql(
+        "UPDATE learning_items SET start_date = ("
+        "SELECT due_date FROM review_tasks "
+        "WHERE review_tasks.learning_item_id = learning_items.id "
+        "AND review_tasks.stage_offset_days = 0"
+        ") WHERE start_date IS NULL"
+    )
+
+
+def _migrate_ease_factor_column(conn: Connection) -> None:
+    """学習項目に適応型スケジューラの易しさ係数のカラムを追加する"""
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(learning_items)")}
+    if "ease_factor" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE learning_items ADD COLUMN ease_factor FLOAT NOT NULL DEFAULT 2.5"
+        )
+
+
+def _migrate_forecast_indexes(conn: Connection) -> None:
+    """予測用の部分インデックスを追加する"""
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_review_tasks_yearly_status_due_date "
+        "ON review_tasks (status, due_date) WHERE stage_offset_days >= 365"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_learning_items_start_date_materialized "
+        "ON learning_items (start_date, materialized_through) "
+        "WHERE materialized_through IS NOT NULL"
+    )
+
+
+def _migrate_learning_item_search_index(conn: Connection) -> None:
+    """
+    学習項目の全文検索用の FTS5 テーブルと同期トリガーを追加する
+
+    日本語は空白で区切られないため trigram トークナイザを使う（3文字以上の部分一致）。
+    rowid は学習項目ID。媒体名も検索できるよう媒体のタイトルを複製して持つ
+    """
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS learning_items_fts "
+        "USING fts5(title, content, source_title, tokenize='trigram')"
+    )
+    # タイトルの一致を内容・媒体名より重く評価する
+    conn.exec_driver_sql(
+        "INSERT INTO learning_items_fts (learning_items_fts, rank) "
+        "VALUES ('rank', 'bm25(10.0, 1.0, 2.0)')"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS learning_items_fts_insert "
+        "AFTER INSERT ON learning_items BEGIN "
+        "INSERT INTO learning_items_fts (rowid, title, content, source_title) "
+        "VALUES (new.id, new.title, new.content, "
+        "(SELECT title FROM sources WHERE id = new.source_id)); "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS learning_items_fts_update "
+        "AFTER UPDATE OF title, content, source_id ON learning_items BEGIN "
+        "UPDATE learning_items_fts SET title = new.title, content = new.content, "
+        "source_title = (SELECT title FROM sources WHERE id = new.source_id) "
+        "WHERE rowid = new.id; "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS learning_items_fts_delete "
+        "AFTER DELETE ON learning_items BEGIN "
+        "DELETE FROM learning_items_fts WHERE rowid = old.id; "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS sources_fts_update "
+        "AFTER UPDATE OF title ON sources BEGIN "
+        "UPDATE learning_items_fts SET source_title = new.title "
+        "WHERE rowid IN (SELECT id FROM learning_items WHERE source_id = new.id); "
+        "END"
+    )
+    # 既存の学習項目を索引に登録し直す
+    conn.exec_driver_sql("DELETE FROM learning_items_fts")
+    conn.exec_driver_sql(
+        "INSERT INTO learning_items_fts (rowid, title, content, source_title) "
+        "SELECT li.id, li.title, li.content, s.title "
+        "FROM learning_items li LEFT JOIN sources s ON s.id = li.source_id"
+    )
+
+
+def _migrate_next_review_columns(conn: Connection) -> None:
+    """学習項目に次の復習の予定日・ステージのカラムと一覧用インデックスを追加する"""
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(learning_items)")}
+    if "next_due_date" not in columns:
+        conn.exec_driver_sql("ALTER TABLE learning_items ADD COLUMN next_due_date DATE")
+    if "next_stage_offset_days" not in columns:
+        conn.exec_driver_sql("ALTER TABLE learning_items ADD COLUMN next_stage_offset_days INTEGER")
+
+    # 未完了の最も早いタスク。なければ遅延生成モードの未生成の次のステージ
+    next_task = (
+        "FROM review_tasks WHERE review_tasks.learning_item_id = learning_items.id "
+        "AND review_tasks.status != 'Completed' "
+        "ORDER BY review_tasks.due_date, review_tasks.stage_offset_days LIMIT 1"
+    )
+    virtual_offset = "CASE " + " ".join(
+        f"WHEN materialized_through < {offset} THEN {offset}" for _, offset in REVIEW_SCHEDULE
+    ) + " END"
+    conn.exec_driver_sql(
+        "UPDATE learning_items SET "
+        f"next_due_date = COALESCE((SELECT due_date {next_task}), "
+        f"CASE WHEN materialized_through < {YEARLY_OFFSET_DAYS} "
+        f"THEN date(start_date, '+' || ({virtual_offset}) || ' days') END), "
+        f"next_stage_offset_days = COALESCE((SELECT stage_offset_days {next_task}), {virtual_offset})"
+    )
+
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_learning_items_next_due_date_id "
+        "ON learning_items (next_due_date, id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_learning_items_title_id "
+        "ON learning_items (title, id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_learning_items_source_id_created_at_id "
+        "ON learning_items (source_id, created_at, id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_learning_items_next_stage_next_due_date_id "
+        "ON learning_items (next_stage_offset_days, next_due_date, id)"
+    )
+
+
+# 行数を row_counts に保持するテーブル
+COUNTED_TABLES = ("sources", "learning_items")
+
+
+def _migrate_row_counts(conn: Connection) -> None:
+    """
+    一覧の総件数用に、テーブルの行数を保持するテーブルと増減のトリガーを追加する
+
+    トリガーは SQL で直接追加・削除した行やカスケード削除でも発火する
+    """
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS row_counts ("
+        "table_name VARCHAR(50) NOT NULL PRIMARY KEY, "
+        "row_count INTEGER NOT NULL)"
+    )
+    for table in COUNTED_TABLES:
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_row_count_insert "
+            f"AFTER INSERT ON {table} BEGIN "
+            f"UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = '{table}'; "
+            "END"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_row_count_delete "
+            f"AFTER DELETE ON {table} BEGIN "
+            f"UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = '{table}'; "
+            "END"
+        )
+        # 既存の行を数える
+        conn.exec_driver_sql(
+            "INSERT OR REPLACE INTO row_counts (table_name, row_count) "
+            f"SELECT '{table}', count(*) FROM {table}"
+        )
+
+
+MIGRATIONS: List[Tuple[int, Callable[[Connection], None]]] = [
+    (1, _migrate_review_task_composite_indexes),
+    (2, _migrate_keyset_pagination_indexes),
+    (3, _migrate_lazy_materialization_columns),
+    (4, _migrate_ease_factor_column),
+    (5, _migrate_forecast_indexes),
+    (6, _migrate_learning_item_search_index),
+    (7, _migrate_next_review_columns),
+    (8, _migrate_row_counts),
+]
+
+
+def get_schema_version(conn: Connection) -> int:
+    """適用済みのスキーマバージョンを取得する"""
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def run_migrations(engine: Engine) -> int:
+    """
+    未適用のマイグレーションを順番に適用する
+
+    Args:
+        engine: データベースエンジン
+
+    Returns:
+        適用後のスキーマバージョン
+    """
+    with engine.begin() as conn:
+        version = get_schema_version(conn)
+        for target_version, migrate in MIGRATIONS:
+            if target_version <= version:
+                continue
+            migrate(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {target_version}")
+            version = target_version
+    return version
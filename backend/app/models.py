@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, Index
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, Date, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
+from app.scheduler import DEFAULT_EASE, YEARLY_OFFSET_DAYS, generate_pending_review_tasks
 
 
 class Source(Base):
@@ -16,10 +17,18 @@ class Source(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationship with LearningItem
+    # 削除時に学習項目を読み込まず、外部キーの ON DELETE CASCADE に任せる
     learning_items = relationship(
         "LearningItem",
         back_populates="source",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    # Indexes for performance
+    # - (created_at, id): 一覧のキーセットページネーション
+    __table_args__ = (
+        Index('idx_sources_created_at_id', 'created_at', 'id'),
     )
 
 
@@ -31,6 +40,16 @@ class LearningItem(Base):
     source_id = Column(Integer, ForeignKey("sources.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
     content = Column(Text)
+    start_date = Column(Date, nullable=True)  # 学習開始日
+    # 遅延生成モードで実体化済みの最後のステージのオフセット日数
+    # （NULL なら全ステージを作成時に生成済み）
+    materialized_through = Column(Integer, nullable=True)
+    # 適応型スケジューラの易しさ係数（完了時の評価で更新される）
+    ease_factor = Column(Float, default=DEFAULT_EASE, server_default=str(DEFAULT_EASE), nullable=False)
+    # 次の（未完了の最も早い）復習の予定日とステージのオフセット日数
+    # （一覧の絞り込み・並べ替え用に復習タスクから複製し、crud の書き込みで更新する）
+    next_due_date = Column(Date, nullable=True)
+    next_stage_offset_days = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -38,10 +57,47 @@ class LearningItem(Base):
     source = relationship("Source", back_populates="learning_items")
 
     # Relationship with ReviewTask
+    # 削除時に復習タスクを読み込まず、外部キーの ON DELETE CASCADE に任せる
     review_tasks = relationship(
         "ReviewTask",
         back_populates="learning_item",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="ReviewTask.stage_offset_days"
+    )
+
+    @property
+    def scheduled_review_tasks(self) -> list:
+        """
+        保存済みの復習タスクに、遅延生成モードで未生成のステージを加えたもの
+        （未生成のステージは id を持たない）
+        """
+        if self.materialized_through is None:
+            return self.review_tasks
+        return self.review_tasks + generate_pending_review_tasks(
+            self.id, self.start_date, self.materialized_through
+        )
+
+    # Indexes for performance
+    # - (created_at, id): 一覧のキーセットページネーション
+    # - (next_due_date, id), (title, id): 一覧の並べ替え（sort=next_due, title）
+    # - (source_id, created_at, id): 媒体での絞り込み
+    # - (next_stage_offset_days, next_due_date, id): ステージでの絞り込み
+    # - (start_date, materialized_through): 遅延生成モードの未生成ステージの予測
+    #   （遅延生成モードの学習項目だけの部分インデックス）
+    __table_args__ = (
+        Index('idx_learning_items_created_at_id', 'created_at', 'id'),
+        Index('idx_learning_items_next_due_date_id', 'next_due_date', 'id'),
+        Index('idx_learning_items_title_id', 'title', 'id'),
+        Index('idx_learning_items_source_id_created_at_id', 'source_id', 'created_at', 'id'),
+        Index(
+            'idx_learning_items_next_stage_next_due_date_id',
+            'next_stage_offset_days', 'next_due_date', 'id'
+        ),
+        Index(
+            'idx_learning_items_start_date_materialized', 'start_date', 'materialized_through',
+            sqlite_where=text("materialized_through IS NOT NULL")
+        ),
     )
 
 
@@ -62,8 +118,37 @@ class ReviewTask(Base):
     learning_item = relationship("LearningItem", back_populates="review_tasks")
 
     # Indexes for performance
+    # - (status, due_date): 今日のタスク取得・日付切り替えをソートなしで処理する
+    # - (learning_item_id, stage_offset_days): 学習項目ごとのタスク取得と
+    #   1年ごとの継続タスクの重複チェック
+    # - 1年ごとのタスクの (status, due_date): 予測での継続タスクの計算
+    #   （1年ごとのタスクだけの部分インデックス）
     __table_args__ = (
-        Index('idx_learning_item_id', 'learning_item_id'),
-        Index('idx_due_date', 'due_date'),
-        Index('idx_status', 'status'),
+        Index('idx_status_due_date', 'status', 'due_date'),
+        Index('idx_learning_item_id_stage_offset_days', 'learning_item_id', 'stage_offset_days'),
+        Index(
+            'idx_review_tasks_yearly_status_due_date', 'status', 'due_date',
+            sqlite_where=text(f"stage_offset_days >= {YEARLY_OFFSET_DAYS}")
+        ),
     )
+
+
+class ChangeCounter(Base):
+    """テーブルごとの変更カウンタ（ETag の生成に使う）"""
+    __tablename__ = "change_counters"
+
+    table_name = Column(String(50), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+
+class RowCount(Base):
+    """
+    テーブルの行数（一覧の総件数用）
+
+    行の追加・削除のたびにトリガー（migrations._migrate_row_counts）で増減するため、
+    カスケード削除や一括登録でも正確に保たれる
+    """
+    __tablename__ = "row_counts"
+
+    table_name = Column(String(50), primary_key=True)
+    row_count = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,123 @@
+import logging
+import re
+from typing import Callable, List, Optional, TypeVar
+from app import config
+from app.metrics import RequestMetrics
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+# 違反の報告に含める SQL 文の長さ
+STATEMENT_PREVIEW_LENGTH = 160
+
+# IN (?, ?, ...) のプレースホルダの並び（件数が違っても同じ形の文として数える）
+_IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """リクエストのクエリ数が上限を超えた、または同じ SQL 文を繰り返した（QUERY_GUARD=raise）"""
+
+
+def query_budget(max_queries: Optional[int]) -> Callable[[F], F]:
+    """
+    ルートの1リクエストあたりのクエリ数の上限を指定するデコレーター
+
+    ルーターのデコレーターの下に付ける。関数は包まずに属性を付けるだけなので、
+    FastAPI が見る引数やドキュメントは変わらない
+
+    Args:
+        max_queries: 上限（ストリーミングのレスポンスはヘッダーを送るまでのクエリ数）。
+            None ならリクエストの大きさに比例するルートとして検査しない
+
+    Returns:
+        デコレーター
+    """
+    def decorate(endpoint: F) -> F:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorate
+
+
+def statement_shape(statement: str) -> str:
+    """SQL 文の形（IN のプレースホルダの数と空白の違いをまとめる）"""
+    return _IN_LIST_PATTERN.sub("(?...)", _WHITESPACE_PATTERN.sub(" ", statement).strip())
+
+
+class QueryGuard:
+    """
+    N+1 クエリの検出（metrics.MetricsMiddleware の guard に渡す）
+
+    レスポンスヘッダーを送る前に、リクエストのクエリ数がルートの上限
+    （query_budget、なければ default_budget）を超えていないか、
+    同じ形の SQL 文を max_repeats 回より多く実行していないか
+    （executemany が1行ずつの実行に分かれた場合も回数に含む）を調べ、
+    mode に応じて警告をログに出す（log）か QueryBudgetExceeded を送出する（raise）。
+    mode はテストのために実行中に切り替えてよい
+    """
+
+    def __init__(self, mode: str, default_budget: int, max_repeats: int):
+        """
+        Args:
+            mode: "off" / "log" / "raise"
+            default_budget: query_budget がないルートのクエリ数の上限
+            max_repeats: 1リクエストで同じ形の SQL 文を実行してよい回数
+        """
+        self.mode = mode
+        self.default_budget = default_budget
+        self.max_repeats = max_repeats
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def violations(self, endpoint: Optional[Callable], metrics: RequestMetrics) -> List[str]:
+        """
+        リクエストの計測値の違反を列挙する
+
+        Args:
+            endpoint: ルートの関数（ルートに一致しなかった場合は None）
+            metrics: リクエストの計測値（statements を記録したもの）
+
+        Returns:
+            違反の説明のリスト（違反がなければ空）
+        """
+        budget = getattr(endpoint, "__query_budget__", self.default_budget)
+        if budget is None:
+            return []
+        problems = []
+        if metrics.queries > budget:
+            problems.append(f"{metrics.queries} queries exceed the budget of {budget}")
+
+        shapes: dict = {}
+        for statement, count in (metrics.statements or {}).items():
+            shape = statement_shape(statement)
+            shapes[shape] = shapes.get(shape, 0) + count
+        for shape, count in shapes.items():
+            if count > self.max_repeats:
+                preview = shape if len(shape) <= STATEMENT_PREVIEW_LENGTH \
+                    else shape[:STATEMENT_PREVIEW_LENGTH] + "..."
+                problems.append(f"statement repeated {count} times: {preview}")
+        return problems
+
+    def __call__(self, scope: dict, metrics: RequestMetrics) -> None:
+        """
+        リクエストを検査する
+
+        Raises:
+            QueryBudgetExceeded: mode が raise で違反がある場合
+        """
+        if not self.enabled:
+            return
+        problems = self.violations(scope.get("endpoint"), metrics)
+        if not problems:
+            return
+        route = getattr(scope.get("route"), "path", None) or scope.get("path")
+        message = f"{scope['method']} {route}: " + "; ".join(problems)
+        if self.mode == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning("Query guard: %s", message)
+
+
+GUARD = QueryGuard(config.QUERY_GUARD, config.QUERY_GUARD_DEFAULT_BUDGET, config.QUERY_GUARD_MAX_REPEATS)
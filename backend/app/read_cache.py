@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from app import config
+
+
+class LRUCache:
+    """
+    件数上限（LRU）と有効期限（TTL）付きのスレッドセーフなキャッシュ
+
+    値は複数のスレッドから共有されるため、書き換えないもの
+    （pydantic のスキーマなどのスナップショット）を入れること
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            name: キャッシュ名（統計情報の表示用）
+            max_entries: 保持する最大件数（0 ならキャッシュしない）
+            ttl_seconds: 有効期限（秒、0 以下なら期限なし）
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        キャッシュされた値を取得する
+
+        Args:
+            key: キー
+
+        Returns:
+            値（キャッシュされていない、または期限切れの場合はNone）
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        値をキャッシュする（上限を超えたら最も古く使われたものから追い出す）
+
+        Args:
+            key: キー
+            value: 値
+        """
+        if self.max_entries <= 0:
+            return
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds > 0 else float("inf")
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """
+        指定したキーのキャッシュを破棄する
+
+        Args:
+            keys: 破棄するキー
+        """
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """すべてのキャッシュを破棄する"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        統計情報を取得する
+
+        Returns:
+            件数・ヒット数・ミス数・追い出し数などの辞書
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# 媒体詳細（学習項目含む）のキャッシュ
+source_cache = LRUCache("sources", config.READ_CACHE_MAX_ENTRIES, config.READ_CACHE_TTL_SECONDS)
+
+# 学習項目詳細（復習タスク含む）のキャッシュ
+learning_item_cache = LRUCache(
+    "learning_items", config.READ_CACHE_MAX_ENTRIES, config.READ_CACHE_TTL_SECONDS
+)
+
+
+def cache_stats() -> list:
+    """
+    すべての読み取りキャッシュの統計情報を取得する
+
+    Returns:
+        キャッシュごとの統計情報のリスト
+    """
+    return [source_cache.stats(), learning_item_cache.stats()]
@@ -0,0 +1,32 @@
+"""
+未到来の復習タスクの予定日をスケジューラで一括再計算する
+
+スケジューラを切り替えた後や、易しさ係数の調整後に実行する。
+
+    python -m app.recompute_due_dates [--scheduler fixed|sm2]
+"""
+import argparse
+import time
+from app import crud
+from app.database import SessionLocal
+from app.scheduler import SCHEDULERS, get_scheduler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute due dates of pending review tasks")
+    parser.add_argument("--scheduler", choices=sorted(SCHEDULERS),
+                        help="scheduling engine (default: SCHEDULER setting)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        updated = crud.recompute_due_dates(db, get_scheduler(args.scheduler))
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"Rescheduled {updated} review tasks in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
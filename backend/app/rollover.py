@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from app import crud
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 最後に日付切り替え処理を行った日
+_last_rollover_date: Optional[date] = None
+_lock = threading.Lock()
+
+
+def run_rollover(db: Optional[Session] = None, today: Optional[date] = None) -> int:
+    """
+    日付切り替え処理（予定日が到来した Pending → Ready の更新）を実行する
+
+    あわせて一覧の総件数用に保持しているテーブルの行数を実際の行数に合わせる
+
+    Args:
+        db: データベースセッション（省略時は新規に作成する）
+        today: 基準日（省略時は今日）
+
+    Returns:
+        Ready に更新されたタスク数
+    """
+    global _last_rollover_date
+    today = today if today else date.today()
+
+    with _lock:
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            updated = crud.promote_due_review_tasks(db, today=today)
+            corrected = crud.reconcile_row_counts(db)
+        finally:
+            if own_session:
+                db.close()
+        _last_rollover_date = today
+
+    logger.info("Rollover for %s promoted %d review tasks", today, updated)
+    if corrected:
+        logger.warning("Reconciled row counts: %s", corrected)
+    return updated
+
+
+def ensure_rollover(db: Optional[Session] = None) -> None:
+    """
+    今日の日付切り替え処理が未実施なら実行する
+
+    通常は定期ジョブが実行済みのため、日付の比較だけで終わる
+    （スリープ復帰などでジョブが遅れた場合の保険）
+    """
+    if _last_rollover_date != date.today():
+        run_rollover(db)
+
+
+async def ensure_rollover_async() -> None:
+    """
+    ensure_rollover のルーター用（未実施ならワーカースレッドで実行する）
+
+    run_rollover はスレッドのロックを取るため、DB_ASYNC の run_sync（イベントループのスレッド）で
+    実行すると、I/O 待ちの間にロックを待つ別のリクエストがループごと止めてしまう。
+    定期ジョブと同じく専用の同期セッションでワーカースレッドから実行する
+    """
+    if _last_rollover_date != date.today():
+        await asyncio.to_thread(run_rollover)
+
+
+def seconds_until_next_midnight(now: Optional[datetime] = None) -> float:
+    """
+    次のローカル時刻の0時までの秒数を返す
+    """
+    now = now if now else datetime.now()
+    next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (next_midnight - now).total_seconds()
+
+
+async def rollover_loop() -> None:
+    """
+    起動時に1回、以降は毎日ローカル時刻の0時に日付切り替え処理を実行する
+    """
+    while True:
+        try:
+            await asyncio.to_thread(run_rollover)
+        except Exception:
+            logger.exception("Rollover failed")
+        # 0時ちょうどに起きて前日扱いにならないよう少し余裕を持たせる
+        await asyncio.sleep(seconds_until_next_midnight() + 1)
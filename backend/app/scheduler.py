@@ -1,5 +1,7 @@
+import numpy as np
 from datetime import date, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from app import config
 
 # 復習スケジュールの定義（忘却曲線に基づく）
 REVIEW_SCHEDULE = [
@@ -14,6 +16,9 @@ REVIEW_SCHEDULE = [
     ("1年後", 365),
 ]
 
+# 以降は1年ごとに継続するステージのオフセット日数
+YEARLY_OFFSET_DAYS = REVIEW_SCHEDULE[-1][1]
+
 
 def generate_review_tasks(learning_item_id: int, start_date: date) -> List[Dict[str, Any]]:
     """
@@ -45,6 +50,62 @@ def generate_review_tasks(learning_item_id: int, start_date: date) -> List[Dict[
     return tasks
 
 
+def generate_due_review_tasks(
+    learning_item_id: int,
+    start_date: date,
+    today: date,
+    materialized_through: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    遅延生成モードで実体化する復習タスクを生成する
+
+    materialized_through より後のステージのうち、予定日が到来したものと
+    その次の1件（次に予定日が来るステージ）だけを生成する
+
+    Args:
+        learning_item_id: 学習項目のID
+        start_date: 学習開始日
+        today: 基準日
+        materialized_through: 実体化済みの最後のステージのオフセット日数
+            （None なら未生成）
+
+    Returns:
+        (生成する復習タスクのリスト, 実体化済みの最後のステージのオフセット日数)
+    """
+    tasks = []
+    for task in generate_review_tasks(learning_item_id, start_date):
+        if materialized_through is not None and task["stage_offset_days"] <= materialized_through:
+            continue
+        tasks.append(task)
+        materialized_through = task["stage_offset_days"]
+        if task["due_date"] > today:
+            break
+    return tasks, materialized_through
+
+
+def generate_pending_review_tasks(
+    learning_item_id: int,
+    start_date: date,
+    materialized_through: int
+) -> List[Dict[str, Any]]:
+    """
+    遅延生成モードでまだ実体化していないステージを計算する（保存はしない）
+
+    Args:
+        learning_item_id: 学習項目のID
+        start_date: 学習開始日
+        materialized_through: 実体化済みの最後のステージのオフセット日数
+
+    Returns:
+        未生成のステージの復習タスクのリスト（status は Pending）
+    """
+    return [
+        dict(task, status="Pending")
+        for task in generate_review_tasks(learning_item_id, start_date)
+        if task["stage_offset_days"] > materialized_through
+    ]
+
+
 def generate_next_yearly_task(learning_item_id: int, current_offset_days: int, current_due_date: date) -> Dict[str, Any]:
     """
     1年ごとの復習タスクの次のタスクを生成する
@@ -68,3 +129,219 @@ def generate_next_yearly_task(learning_item_id: int, current_offset_days: int, c
         "due_date": next_due_date,
         "status": "Pending"
     }
+
+
+# ============================================================================
+# Load Smoothing
+# ============================================================================
+# 同じ開始日で大量に登録すると同じ日に復習が集中するため、新規タスクの予定日を
+# ステージのオフセット日数に比例した許容範囲内でずらし、1日の件数を上限以下に抑える。
+# 既存の負荷は日ごとの件数（ヒストグラム）として事前に受け取り、1件ずつ
+# クエリを発行せずにまとめて割り当てる。
+
+def load_balance_tolerance(stage_offset_days: int, tolerance: Optional[float] = None) -> int:
+    """
+    ステージの予定日をずらしてよい日数を返す
+
+    比率は隣のステージと範囲が重ならない大きさ（0.3 未満）を想定する
+
+    Args:
+        stage_offset_days: ステージのオフセット日数
+        tolerance: オフセット日数に対する比率（省略時は config.LOAD_BALANCE_TOLERANCE）
+
+    Returns:
+        前後にずらしてよい日数
+    """
+    tolerance = config.LOAD_BALANCE_TOLERANCE if tolerance is None else tolerance
+    return int(stage_offset_days * tolerance)
+
+
+def balance_due_dates(
+    tasks: List[Dict[str, Any]],
+    daily_load: Dict[date, int],
+    daily_cap: int,
+    earliest: date,
+    tolerance: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Pending タスクの予定日を許容範囲内でずらし、1日の件数を上限以下に抑える
+
+    予定日順に、元の予定日が上限未満ならそのまま、上限に達していれば
+    許容範囲内で最も近い空きのある日（同じ距離なら後の日）に割り当てる。
+    満杯の日から次の空き日へのリンクを経路圧縮しながらたどるため、
+    全体でソートの O(n log n) で済む。許容範囲内に空きがなければ
+    元の予定日のまま（上限を超える）にする。
+
+    Args:
+        tasks: 復習タスクの辞書のリスト（Pending のタスクの due_date を書き換える）
+        daily_load: 日ごとの既存のタスク数（割り当てたタスクの分を加算する）
+        daily_cap: 1日のタスク数の上限
+        earliest: 割り当ててよい最初の日
+        tolerance: オフセット日数に対する比率（省略時は config.LOAD_BALANCE_TOLERANCE）
+
+    Returns:
+        tasks（同じリスト）
+
+    Raises:
+        ValueError: daily_cap が1未満の場合
+    """
+    if daily_cap < 1:
+        raise ValueError(f"daily_cap must be positive: {daily_cap}")
+    load = {day.toordinal(): count for day, count in daily_load.items()}
+    later_links: Dict[int, int] = {}
+    earlier_links: Dict[int, int] = {}
+
+    def free_day(day: int, links: Dict[int, int], step: int) -> int:
+        path = []
+        while load.get(day, 0) >= daily_cap:
+            path.append(day)
+            day = links.get(day, day + step)
+        for full_day in path:
+            links[full_day] = day
+        return day
+
+    pending = sorted(
+        (task for task in tasks if task["status"] == "Pending" and task["stage_offset_days"] > 0),
+        key=lambda task: (task["due_date"], task["stage_offset_days"])
+    )
+    for task in pending:
+        due_day = task["due_date"].toordinal()
+        window = load_balance_tolerance(task["stage_offset_days"], tolerance)
+        if load.get(due_day, 0) >= daily_cap and window > 0:
+            later = free_day(due_day, later_links, 1)
+            earlier = free_day(due_day, earlier_links, -1)
+            candidates = [
+                day for day in (later, earlier)
+                if abs(day - due_day) <= window and day >= earliest.toordinal()
+            ]
+            if candidates:
+                due_day = min(candidates, key=lambda day: (abs(day - due_day), -day))
+                task["due_date"] = date.fromordinal(due_day)
+        load[due_day] = load.get(due_day, 0) + 1
+
+    for day, count in load.items():
+        daily_load[date.fromordinal(day)] = count
+    return tasks
+
+
+# ============================================================================
+# Scheduling Engines
+# ============================================================================
+# 完了時の評価（0〜5）から学習項目ごとの間隔を調整するスケジューラ。
+# 一括再計算で大量のタスクを扱えるよう、計算はすべて NumPy の配列で行う
+# （日付は datetime64[D]、オフセット日数と易しさ係数は数値配列）。
+
+# 易しさ係数の初期値（SM-2 の EF）
+DEFAULT_EASE = 2.5
+
+
+class FixedScheduler:
+    """
+    固定スケジュール（REVIEW_SCHEDULE）
+
+    評価に関わらず、各ステージの予定日は開始日 + オフセット日数になる
+    """
+    name = "fixed"
+    # 完了時に残りのタスクの予定日を変更するか
+    adaptive = False
+
+    def update_ease(self, ease: np.ndarray, grades: np.ndarray) -> np.ndarray:
+        """
+        評価から易しさ係数を更新する
+
+        Args:
+            ease: 現在の易しさ係数
+            grades: 評価（0〜5、未指定は NaN）
+
+        Returns:
+            更新後の易しさ係数
+        """
+        return ease
+
+    def anchor_dates(self, due_dates: np.ndarray, completed_dates: np.ndarray) -> np.ndarray:
+        """
+        完了したタスクのうち、以降の予定日の基準にする日付を選ぶ
+
+        Args:
+            due_dates: 完了したタスクの予定日
+            completed_dates: 完了した日
+
+        Returns:
+            基準日
+        """
+        return due_dates
+
+    def due_dates(
+        self,
+        anchor_dates: np.ndarray,
+        anchor_offsets: np.ndarray,
+        stage_offsets: np.ndarray,
+        ease: np.ndarray
+    ) -> np.ndarray:
+        """
+        基準日から各ステージの予定日を計算する
+
+        Args:
+            anchor_dates: 基準日（datetime64[D]）
+            anchor_offsets: 基準日のステージのオフセット日数
+            stage_offsets: 予定日を計算するステージのオフセット日数
+            ease: 易しさ係数
+
+        Returns:
+            予定日（datetime64[D]）
+        """
+        return anchor_dates + (stage_offsets - anchor_offsets).astype("timedelta64[D]")
+
+
+class SM2Scheduler(FixedScheduler):
+    """
+    SM-2 の易しさ係数で学習項目ごとに間隔を伸縮するスケジュール
+
+    完了時の評価で易しさ係数を更新し、完了日を基準に残りのステージ間隔を
+    「固定スケジュールの間隔 × 易しさ係数 / 2.5」に置き換える
+    """
+    name = "sm2"
+    adaptive = True
+    min_ease = 1.3
+
+    def update_ease(self, ease: np.ndarray, grades: np.ndarray) -> np.ndarray:
+        q = 5 - grades
+        updated = np.maximum(ease + (0.1 - q * (0.08 + q * 0.02)), self.min_ease)
+        return np.where(np.isnan(grades), ease, updated)
+
+    def anchor_dates(self, due_dates: np.ndarray, completed_dates: np.ndarray) -> np.ndarray:
+        return completed_dates
+
+    def due_dates(
+        self,
+        anchor_dates: np.ndarray,
+        anchor_offsets: np.ndarray,
+        stage_offsets: np.ndarray,
+        ease: np.ndarray
+    ) -> np.ndarray:
+        intervals = np.ceil((stage_offsets - anchor_offsets) * ease / DEFAULT_EASE)
+        return anchor_dates + intervals.astype("timedelta64[D]")
+
+
+SCHEDULERS = {
+    scheduler.name: scheduler for scheduler in (FixedScheduler(), SM2Scheduler())
+}
+
+
+def get_scheduler(name: Optional[str] = None) -> FixedScheduler:
+    """
+    スケジューラを取得する
+
+    Args:
+        name: スケジューラ名（省略時は config.SCHEDULER）
+
+    Returns:
+        スケジューラ
+
+    Raises:
+        ValueError: 未知のスケジューラ名の場合
+    """
+    name = name if name else config.SCHEDULER
+    if name not in SCHEDULERS:
+        raise ValueError(f"Unknown scheduler: {name}")
+    return SCHEDULERS[name]
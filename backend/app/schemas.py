@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import date, datetime
 from typing import Optional, List
 
@@ -69,10 +69,61 @@ class ReviewTask(ReviewTaskBase):
         from_attributes = True
 
 
+class ScheduledReviewTask(ReviewTask):
+    """
+    学習項目詳細に含める復習タスクスキーマ
+
+    遅延生成モードでまだ実体化していないステージは id と created_at が null になる
+    """
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+
+class ReviewForecastDay(BaseModel):
+    """復習タスク数の予測（1日分）"""
+    due_date: date
+    count: int
+
+
+class ReviewForecast(BaseModel):
+    """復習タスク数の予測"""
+    days: List[ReviewForecastDay]
+    total: int
+
+
+class ReviewTaskCompletion(BaseModel):
+    """復習タスク一括完了の1件分"""
+    task_id: int
+    completed_at: Optional[datetime] = None  # 省略時は現在時刻
+    grade: Optional[int] = Field(None, ge=0, le=5)  # 評価（適応型スケジューラで使う）
+
+
+class ReviewTaskBatchComplete(BaseModel):
+    """復習タスク一括完了用スキーマ"""
+    items: List[ReviewTaskCompletion] = Field(..., min_length=1, max_length=1000)
+
+
+class ReviewTaskBatchUncomplete(BaseModel):
+    """復習タスク一括完了取り消し用スキーマ"""
+    task_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class ReviewTaskBatchResult(BaseModel):
+    """復習タスク一括処理の1件分の結果"""
+    task_id: int
+    outcome: str  # completed, already_completed, uncompleted, not_found
+
+
+class ReviewTaskBatchResponse(BaseModel):
+    """復習タスク一括処理レスポンス"""
+    results: List[ReviewTaskBatchResult]
+
+
 class ReviewTaskWithItem(ReviewTask):
     """学習項目情報を含む復習タスクスキーマ"""
     learning_item_title: str
-    learning_item_content: Optional[str] = None
+    learning_item_content_preview: Optional[str] = None  # 内容の先頭部分
+    learning_item_content: Optional[str] = None  # fields=content 指定時のみ
 
 
 # ============================================================================
@@ -101,6 +152,8 @@ class LearningItem(LearningItemBase):
     """学習項目レスポンス用スキーマ"""
     id: int
     source_id: int
+    next_due_date: Optional[date] = None  # 次の復習の予定日（未完了の復習がなければ None）
+    next_stage_offset_days: Optional[int] = None  # 次の復習のステージのオフセット日数
     created_at: datetime
     updated_at: datetime
 
@@ -110,7 +163,10 @@ class LearningItem(LearningItemBase):
 
 class LearningItemWithTasks(LearningItem):
     """復習タスク情報を含む学習項目スキーマ"""
-    review_tasks: List[ReviewTask] = []
+    # 遅延生成モードの未生成ステージも含める
+    review_tasks: List[ScheduledReviewTask] = Field(
+        [], validation_alias=AliasChoices("scheduled_review_tasks", "review_tasks")
+    )
 
 
 class LearningItemWithSource(LearningItem):
@@ -126,13 +182,58 @@ class LearningItemWithSource(LearningItem):
 class SourceListResponse(BaseModel):
     """媒体一覧レスポンス"""
     items: List[Source]
-    total: int
+    total: Optional[int] = None  # include_total=false の場合は None
+    next_cursor: Optional[str] = None  # 次ページがない場合は None
 
 
 class LearningItemListResponse(BaseModel):
     """学習項目一覧レスポンス"""
     items: List[LearningItem]
-    total: int
+    total: Optional[int] = None  # include_total=false の場合は None
+    next_cursor: Optional[str] = None  # 次ページがない場合は None
+
+
+class LearningItemSearchResult(BaseModel):
+    """学習項目の検索結果"""
+    id: int
+    source_id: int
+    source_title: Optional[str] = None
+    title: str
+    snippet: str  # HTML エスケープ済み、一致箇所を <mark> で囲む
+    rank: float  # bm25（小さいほど関連度が高い）
+
+
+class LearningItemSearchResponse(BaseModel):
+    """学習項目の検索レスポンス"""
+    items: List[LearningItemSearchResult]
+    next_cursor: Optional[str] = None  # 次ページがない場合は None
+
+
+class LearningItemBulkResult(BaseModel):
+    """学習項目一括作成の行ごとの結果"""
+    index: int  # 入力中の位置（0始まり）
+    id: Optional[int] = None  # 作成された学習項目ID（失敗時は None）
+    error: Optional[str] = None  # エラー内容（成功時は None）
+
+
+class LearningItemBulkResponse(BaseModel):
+    """学習項目一括作成レスポンス"""
+    created: int
+    failed: int
+    results: List[LearningItemBulkResult]
+
+
+class ReadCacheStats(BaseModel):
+    """読み取りキャッシュの統計情報"""
+    name: str
+    size: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int  # 件数上限による追い出し
+    expirations: int  # 有効期限切れ
+    invalidations: int  # 書き込みによる破棄
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,41 @@
+from typing import Any, Dict, Iterable, List, Type
+from pydantic import BaseModel
+from sqlalchemy.sql.elements import ColumnElement
+from app.metrics import TimedORJSONResponse
+
+
+# ============================================================================
+# Raw-row serialization
+# ============================================================================
+# 一覧系のエンドポイントでは ORM オブジェクト → Pydantic モデル → dict の
+# 変換を省き、列指定で取得した行をそのまま JSON にする。
+# 行の列はレスポンススキーマのフィールド順に並べておくことで、
+# response_model を通した場合と同じ JSON になる。
+
+def schema_columns(schema: Type[BaseModel], columns: Dict[str, ColumnElement]) -> List[ColumnElement]:
+    """
+    スキーマのフィールド順に、フィールド名でラベル付けした列を並べる
+
+    Args:
+        schema: レスポンススキーマ
+        columns: フィールド名から列（式）への対応
+
+    Returns:
+        select に渡す列のリスト
+    """
+    return [columns[name].label(name) for name in schema.model_fields]
+
+
+def model_columns(model, schema: Type[BaseModel]) -> List[ColumnElement]:
+    """スキーマのフィールドと同名のモデルの列をフィールド順に並べる"""
+    return schema_columns(schema, {name: getattr(model, name) for name in schema.model_fields})
+
+
+def rows_to_dicts(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """列指定で取得した行を dict のリストにする"""
+    return [row._asdict() for row in rows]
+
+
+def fast_json_response(content: Any, status_code: int = 200) -> TimedORJSONResponse:
+    """モデル検証を通さずに orjson で JSON レスポンスを作る（変換の時間はメトリクスに記録される）"""
+    return TimedORJSONResponse(content=content, status_code=status_code)
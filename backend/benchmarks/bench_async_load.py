@@ -0,0 +1,137 @@
+"""
+同期スタックと非同期スタック（DB_ASYNC=true）のスループット比較
+
+それぞれの設定で uvicorn を起動し、同時接続クライアントから
+/today・一覧・詳細の読み取りとタスク完了の書き込みを混ぜて送り、
+req/s と p50/p99 レイテンシを計測する。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.bench_async_load --clients 200 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+
+async def wait_until_ready(base_url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def seed(base_url: str, items: int) -> tuple[list, list]:
+    """学習項目を作成し、/today に残るタスクが1割程度になるよう大半を完了にする"""
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        source = (await client.post("/api/sources/", json={"title": "Load"})).json()
+        bulk = (await client.post("/api/learning-items/bulk", json=[
+            {"source_id": source["id"], "title": f"Item {i}"}
+            for i in range(items)
+        ])).json()
+        item_ids = [r["id"] for r in bulk["results"]]
+        today_ids = [t["id"] for t in (await client.get("/api/review-tasks/today")).json()]
+        done = today_ids[: len(today_ids) * 9 // 10]
+        for i in range(0, len(done), 1000):
+            await client.post("/api/review-tasks/complete-batch", json={
+                "items": [{"task_id": task_id} for task_id in done[i:i + 1000]]
+            })
+        return item_ids, today_ids[len(done):]
+
+
+async def run_load(base_url: str, clients: int, duration: float, item_ids: list, task_ids: list) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    pending_tasks = list(task_ids)
+    random.shuffle(pending_tasks)
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            roll = random.random()
+            if roll < 0.1 and pending_tasks:
+                request = client.post(f"/api/review-tasks/{pending_tasks.pop()}/complete")
+            elif roll < 0.4:
+                request = client.get("/api/review-tasks/today")
+            elif roll < 0.7:
+                request = client.get("/api/learning-items/?limit=20&include_total=false")
+            else:
+                request = client.get(f"/api/learning-items/{random.choice(item_ids)}")
+            start = time.perf_counter()
+            try:
+                response = await request
+                if response.status_code >= 500:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def bench_mode(async_mode: bool, args) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix="ars-bench-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmpdir}/bench.db",
+        "DB_ASYNC": "true" if async_mode else "false",
+    }
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=env
+    )
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        item_ids, task_ids = asyncio.run(seed(base_url, args.items))
+        return asyncio.run(run_load(base_url, args.clients, args.duration, item_ids, task_ids))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"clients={args.clients} duration={args.duration}s items={args.items}")
+    print(f"{'mode':<8}{'req/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'errors':>8}")
+    for async_mode in (False, True):
+        result = bench_mode(async_mode, args)
+        mode = "async" if async_mode else "sync"
+        print(
+            f"{mode:<8}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+            f"{result['p99_ms']:>10.1f}{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
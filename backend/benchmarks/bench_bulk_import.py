@@ -0,0 +1,69 @@
+"""
+POST /api/learning-items/bulk の一括登録時間の計測
+
+NDJSON で学習項目を送り、学習項目と復習タスク（1項目あたり9件）の
+登録にかかる時間を計測する。目標は 100k 項目 / 900k タスクで 30 秒未満。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.bench_bulk_import --items 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="ars-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def build_body(source_id: int, items: int) -> bytes:
+    today = date.today()
+    lines = (
+        json.dumps({
+            "source_id": source_id,
+            "title": f"Card {i}",
+            "content": f"Back of card {i}",
+            "start_date": (today - timedelta(days=i % 400)).isoformat()
+        })
+        for i in range(items)
+    )
+    return "\n".join(lines).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100_000)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    source = client.post("/api/sources/", json={"title": "Benchmark Deck"}).json()
+    body = build_body(source["id"], args.items)
+
+    start = time.perf_counter()
+    response = client.post(
+        "/api/learning-items/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    elapsed = time.perf_counter() - start
+    data = response.json()
+
+    db = SessionLocal()
+    try:
+        tasks = db.execute(text("SELECT count(*) FROM review_tasks")).scalar()
+    finally:
+        db.close()
+
+    print(f"items={data['created']} failed={data['failed']} tasks={tasks}")
+    print(f"elapsed={elapsed:.2f}s ({data['created'] / elapsed:,.0f} items/s)")
+
+
+if __name__ == "__main__":
+    main()
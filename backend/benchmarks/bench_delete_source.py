@@ -0,0 +1,119 @@
+"""
+媒体の削除（crud.delete_source）の計測
+
+学習項目と復習タスク（既定で10万件）を持つ媒体を2つ作り、一方を ORM の
+カスケード（子の行を読み込んで1行ずつ DELETE する、以前の実装）で、
+もう一方を crud.delete_source（外部キーの ON DELETE CASCADE）で削除し、
+所要時間と発行した SQL 文の数を比較する。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.bench_delete_source --tasks 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+
+_tmpdir = tempfile.mkdtemp(prefix="ars-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from app import crud, models  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.scheduler import REVIEW_SCHEDULE  # noqa: E402
+
+
+def seed(source_id: int, items: int) -> None:
+    """媒体と、学習項目1件あたり全ステージの復習タスクを投入する"""
+    stages = " UNION ALL ".join(
+        f"SELECT '{name}' AS name, {offset} AS offset" for name, offset in REVIEW_SCHEDULE
+    )
+    first_item_id = (source_id - 1) * items
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO sources (id, title, created_at, updated_at) "
+            f"VALUES ({source_id}, 'Benchmark Deck {source_id}', datetime('now'), datetime('now'))"
+        )
+        conn.exec_driver_sql(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq "
+            f"WHERE n < {items}) "
+            "INSERT INTO learning_items "
+            "(id, source_id, title, content, start_date, created_at, updated_at) "
+            f"SELECT {first_item_id} + n, {source_id}, 'Card ' || n, 'content ' || n, "
+            "date('now', '-' || (n % 400) || ' days'), datetime('now'), datetime('now') FROM seq"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO review_tasks "
+            "(learning_item_id, stage_name, stage_offset_days, due_date, status, created_at) "
+            "SELECT li.id, s.name, s.offset, date(li.start_date, '+' || s.offset || ' days'), "
+            "'Pending', datetime('now') "
+            f"FROM learning_items li CROSS JOIN ({stages}) s WHERE li.source_id = {source_id}"
+        )
+        conn.exec_driver_sql("ANALYZE")
+
+
+def delete_with_orm_cascade(db: Session, source_id: int) -> bool:
+    """以前の実装: 学習項目・復習タスクを読み込み、セッションのカスケードで1行ずつ削除する"""
+    db_source = db.get(models.Source, source_id)
+    if not db_source:
+        return False
+    for item in db_source.learning_items:
+        for task in item.review_tasks:
+            db.delete(task)
+        db.delete(item)
+    db.delete(db_source)
+    db.commit()
+    return True
+
+
+def measure(name: str, delete: Callable[[Session, int], bool], source_id: int) -> float:
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        assert delete(db, source_id)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", count)
+    print(f"{name}: {elapsed * 1000:,.1f}ms, {statements:,} statements")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000,
+                        help="媒体1つあたりの復習タスク数")
+    args = parser.parse_args()
+
+    items = -(-args.tasks // len(REVIEW_SCHEDULE))
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    start = time.perf_counter()
+    for source_id in (1, 2):
+        seed(source_id, items)
+    print(f"seeded 2 sources x {items:,} items ({items * len(REVIEW_SCHEDULE):,} tasks) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    orm = measure("orm cascade", delete_with_orm_cascade, 1)
+    cascade = measure("on delete cascade", crud.delete_source, 2)
+    print(f"speedup: {orm / cascade:.1f}x")
+
+    with engine.connect() as conn:
+        leftover = conn.exec_driver_sql(
+            "SELECT (SELECT count(*) FROM learning_items) + (SELECT count(*) FROM review_tasks)"
+        ).scalar()
+    assert leftover == 0, f"{leftover} rows left after deleting both sources"
+
+
+if __name__ == "__main__":
+    main()
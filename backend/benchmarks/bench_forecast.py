@@ -0,0 +1,77 @@
+"""
+GET /api/review-tasks/forecast の応答時間の計測
+
+学習項目 111,112 件 × 9 ステージ（約100万件）の復習タスクを投入し、
+予測エンドポイントの応答時間の中央値を計測する。目標は 90 日で 50ms 未満。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.bench_forecast --items 111112 --days 90
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="ars-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.scheduler import REVIEW_SCHEDULE  # noqa: E402
+
+
+def seed(items: int) -> None:
+    stages = " UNION ALL ".join(
+        f"SELECT '{name}' AS name, {offset} AS offset" for name, offset in REVIEW_SCHEDULE
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO sources (id, title, created_at, updated_at) "
+            "VALUES (1, 'Benchmark Deck', datetime('now'), datetime('now'))"
+        )
+        conn.exec_driver_sql(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq "
+            f"WHERE n < {items}) "
+            "INSERT INTO learning_items (id, source_id, title, start_date, created_at, updated_at) "
+            "SELECT n, 1, 'Card ' || n, date('now', '-' || (n % 730) || ' days'), "
+            "datetime('now'), datetime('now') FROM seq"
+        )
+        # 予定日が過ぎたタスクは 9 割を完了済み、残りを Ready にする
+        conn.exec_driver_sql(
+            "INSERT INTO review_tasks "
+            "(learning_item_id, stage_name, stage_offset_days, due_date, status, created_at) "
+            "SELECT li.id, s.name, s.offset, date(li.start_date, '+' || s.offset || ' days'), "
+            "CASE WHEN date(li.start_date, '+' || s.offset || ' days') > date('now') THEN 'Pending' "
+            "WHEN (li.id + s.offset) % 10 = 0 THEN 'Ready' ELSE 'Completed' END, datetime('now') "
+            f"FROM learning_items li CROSS JOIN ({stages}) s"
+        )
+        conn.exec_driver_sql("ANALYZE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=111_112)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.items)
+    client = TestClient(app)
+    url = f"/api/review-tasks/forecast?days={args.days}"
+    data = client.get(url).json()
+
+    timings = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+
+    print(f"tasks={args.items * len(REVIEW_SCHEDULE):,} days={args.days} forecast_total={data['total']:,}")
+    print(f"median={statistics.median(timings) * 1000:.1f}ms max={max(timings) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+予定日の一括再計算（crud.recompute_due_dates）の計測
+
+学習項目ごとに完了済みの「学習直後」タスクと次の Pending タスクを1件ずつ持つ
+データベースを作り、SM-2 スケジューラで全 Pending タスクの予定日を再計算する。
+あわせて予定日の計算部分を NumPy の配列演算と行ごとの Python ループで比較する。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.bench_recompute --items 1000000
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="ars-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+import numpy as np  # noqa: E402
+from app import crud  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.scheduler import DEFAULT_EASE, REVIEW_SCHEDULE, get_scheduler  # noqa: E402
+
+
+def seed(items: int) -> None:
+    # 開始日からの経過日数で次の Pending ステージを決める
+    next_offset = "CASE " + " ".join(
+        f"WHEN li.id % 400 < {offset} THEN {offset}" for _, offset in REVIEW_SCHEDULE[1:]
+    ) + f" ELSE {REVIEW_SCHEDULE[-1][1]} END"
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO sources (id, title, created_at, updated_at) "
+            "VALUES (1, 'Benchmark Deck', datetime('now'), datetime('now'))"
+        )
+        conn.exec_driver_sql(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq "
+            f"WHERE n < {items}) "
+            "INSERT INTO learning_items "
+            "(id, source_id, title, start_date, ease_factor, created_at, updated_at) "
+            "SELECT n, 1, 'Card ' || n, date('now', '-' || (n % 400) || ' days'), "
+            "1.3 + (n % 25) * 0.1, datetime('now'), datetime('now') FROM seq"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO review_tasks "
+            "(learning_item_id, stage_name, stage_offset_days, due_date, status, completed_at, created_at) "
+            "SELECT id, '学習直後', 0, start_date, 'Completed', start_date, datetime('now') "
+            "FROM learning_items"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO review_tasks "
+            "(learning_item_id, stage_name, stage_offset_days, due_date, status, created_at) "
+            f"SELECT li.id, 'next', {next_offset}, "
+            f"date(li.start_date, '+' || ({next_offset}) || ' days'), 'Pending', datetime('now') "
+            "FROM learning_items li"
+        )
+        conn.exec_driver_sql("ANALYZE")
+
+
+def compare_arithmetic(items: int) -> None:
+    """予定日の計算部分だけを NumPy と行ごとの Python ループで比較する"""
+    rng = np.random.default_rng(0)
+    anchor_dates = np.datetime64("2024-01-01") + rng.integers(0, 400, items).astype("timedelta64[D]")
+    anchor_offsets = np.zeros(items, dtype=np.int64)
+    stage_offsets = rng.choice([offset for _, offset in REVIEW_SCHEDULE[1:]], items)
+    ease = 1.3 + rng.integers(0, 25, items) * 0.1
+    scheduler = get_scheduler("sm2")
+
+    start = time.perf_counter()
+    vectorized = scheduler.due_dates(anchor_dates, anchor_offsets, stage_offsets, ease)
+    numpy_elapsed = time.perf_counter() - start
+
+    rows = list(zip(anchor_dates.astype(object), anchor_offsets.tolist(), stage_offsets.tolist(), ease.tolist()))
+    start = time.perf_counter()
+    looped = [
+        anchor + timedelta(days=math.ceil((offset - anchor_offset) * item_ease / DEFAULT_EASE))
+        for anchor, anchor_offset, offset, item_ease in rows
+    ]
+    loop_elapsed = time.perf_counter() - start
+
+    assert vectorized.astype(object).tolist() == looped
+    print(f"arithmetic: numpy={numpy_elapsed * 1000:.1f}ms python-loop={loop_elapsed * 1000:.1f}ms "
+          f"({loop_elapsed / numpy_elapsed:.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    start = time.perf_counter()
+    seed(args.items)
+    print(f"seeded {args.items:,} items in {time.perf_counter() - start:.1f}s")
+
+    compare_arithmetic(args.items)
+
+    db = SessionLocal()
+    try:
+        for name in ("sm2", "fixed"):
+            start = time.perf_counter()
+            updated = crud.recompute_due_dates(db, get_scheduler(name))
+            elapsed = time.perf_counter() - start
+            print(f"recompute ({name}): {updated:,} tasks rescheduled in {elapsed:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+GET /api/learning-items/search の応答時間の計測
+
+学習項目 500,000 件を投入し（FTS5 の索引はトリガーで同期される）、
+一致件数の異なる検索語ごとに1ページ目と2ページ目の応答時間の中央値を計測する。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.bench_search --items 500000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="ars-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+# タイトル・内容に使う語（出現頻度が語ごとに変わるよう剰余で選ぶ）
+WORDS = [
+    "photosynthesis", "mitochondria", "derivative", "integral", "vocabulary",
+    "英単語", "歴史年表", "化学反応式", "微分積分", "古文単語", "世界史", "有機化学",
+]
+
+# (ラベル, 検索語)
+QUERIES = [
+    ("rare", "12345"),
+    ("common", "vocabulary"),
+    ("japanese", "化学反応式"),
+    ("two terms", "derivative 微分積分"),
+    ("short term filter", "integral 史"),
+]
+
+
+def seed(items: int) -> None:
+    words = " UNION ALL ".join(f"SELECT {i} AS i, '{word}' AS word" for i, word in enumerate(WORDS))
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO sources (id, title, created_at, updated_at) "
+            "VALUES (1, 'Benchmark Deck', datetime('now'), datetime('now'))"
+        )
+        conn.exec_driver_sql(f"CREATE TEMP TABLE words AS {words}")
+        conn.exec_driver_sql(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq "
+            f"WHERE n < {items}) "
+            "INSERT INTO learning_items (id, source_id, title, content, start_date, created_at, updated_at) "
+            "SELECT n, 1, "
+            f"(SELECT word FROM words WHERE i = n % {len(WORDS)}) || ' Card ' || n, "
+            f"'Notes about ' || (SELECT word FROM words WHERE i = (n / 7) % {len(WORDS)}) || ' and ' || "
+            f"(SELECT word FROM words WHERE i = (n / 13) % {len(WORDS)}) || ' for review ' || n, "
+            "date('now'), datetime('now'), datetime('now') FROM seq"
+        )
+
+
+def measure(client: TestClient, url: str, requests: int) -> list:
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.items)
+    print(f"items={args.items:,} seeded in {time.perf_counter() - start:.1f}s")
+
+    client = TestClient(app)
+    for label, q in QUERIES:
+        url = f"/api/learning-items/search?q={q}&limit={args.limit}"
+        next_cursor = client.get(url).json()["next_cursor"]
+        first = measure(client, url, args.requests)
+        line = f"{label:>18}: page1 median={statistics.median(first) * 1000:.1f}ms"
+        if next_cursor:
+            second = measure(client, f"{url}&cursor={next_cursor}", args.requests)
+            line += f" page2 median={statistics.median(second) * 1000:.1f}ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+GET /api/review-tasks/today のレイテンシ計測
+
+同時読み取りクライアント数を変えながら p50/p99 を計測する。
+before は旧実装（リクエストごとに Pending → Ready の UPDATE + COMMIT）を
+再現したもの、after は読み取り専用になった現在の実装。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.bench_today --items 2000 --readers 1 8 32
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="ars-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from app import crud, schemas  # noqa: E402
+from app.database import SessionLocal, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def seed(items: int) -> None:
+    """
+    過去1年に分散した学習項目を作成する
+
+    実運用に近づけるため、過去の予定日のタスクは大半を完了済みにしておく
+    """
+    db = SessionLocal()
+    try:
+        source = crud.create_source(db, schemas.SourceCreate(title="Benchmark"))
+        today = date.today()
+        for i in range(items):
+            crud.create_learning_item(db, schemas.LearningItemCreate(
+                source_id=source.id,
+                title=f"Item {i}",
+                content="x" * 200,
+                start_date=today - timedelta(days=i % 365)
+            ))
+        db.execute(
+            text(
+                "UPDATE review_tasks SET status = 'Completed', completed_at = due_date "
+                "WHERE due_date < :today AND id % 50 != 0"
+            ),
+            {"today": today}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def get_db_legacy():
+    """旧実装の再現: 読み取りのたびに Pending → Ready の UPDATE + COMMIT を行う"""
+    db = SessionLocal()
+    try:
+        crud.promote_due_review_tasks(db)
+        yield db
+    finally:
+        db.close()
+
+
+def measure(readers: int, requests_per_reader: int) -> dict:
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        client = TestClient(app)
+        local = []
+        for _ in range(requests_per_reader):
+            start = time.perf_counter()
+            try:
+                response = client.get("/api/review-tasks/today")
+                ok = response.status_code == 200
+            except Exception:
+                # 旧実装では "database is locked" が例外として上がってくる
+                ok = False
+            local.append(time.perf_counter() - start)
+            if not ok:
+                errors.append(1)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(readers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "rps": len(latencies) / elapsed,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=50, help="読み取りクライアントごとのリクエスト数")
+    args = parser.parse_args()
+
+    seed(args.items)
+    print(f"items={args.items}")
+    print(f"{'mode':<8}{'readers':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'req/s':>10}{'errors':>8}")
+    for mode, override in (("before", get_db_legacy), ("after", None)):
+        if override:
+            app.dependency_overrides[get_db] = override
+        else:
+            app.dependency_overrides.clear()
+        for readers in args.readers:
+            result = measure(readers, args.requests)
+            print(
+                f"{mode:<8}{readers:>8}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+                f"{result['rps']:>10.1f}{result['errors']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+ベンチマーク用の合成データセットの生成
+
+シードから決まる媒体・学習項目・復習タスクを空のデータベースに投入する。
+規模は復習タスク数で指定する（10k / 100k / 1m、学習項目1件あたり9タスク）。
+学習項目の開始日は過去2年に分散させ、予定日を過ぎたタスクの9割を完了済み、
+残りを Ready、予定日が未到来のタスクを Pending にする。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.datagen --scale 100k --seed 0 /tmp/bench.db
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from app.models import Base  # テーブル定義を登録済みの Base
+from app.migrations import run_migrations
+from app.scheduler import REVIEW_SCHEDULE
+
+# 規模（復習タスク数）
+SCALES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+# 1回の executemany で投入する学習項目数
+CHUNK_SIZE = 10_000
+
+# 1媒体あたりの学習項目数
+ITEMS_PER_SOURCE = 100
+
+# 学習項目の開始日を分散させる日数
+START_DATE_SPREAD_DAYS = 730
+
+# 予定日を過ぎたタスクを完了済みにする割合
+COMPLETED_RATIO = 0.9
+
+CATEGORIES = ["書籍", "動画", "記事", "講義"]
+WORDS = (
+    "memory recall spaced repetition forgetting curve review stage vocabulary grammar "
+    "theorem proof derivative integral cell protein enzyme history treaty empire"
+).split()
+
+
+def items_for_scale(scale: str) -> int:
+    """規模の復習タスク数に必要な学習項目数"""
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale: {scale} (choose from {', '.join(SCALES)})")
+    return -(-SCALES[scale] // len(REVIEW_SCHEDULE))
+
+
+def _datetime(value: datetime) -> str:
+    """SQLAlchemy の SQLite の DateTime と同じ形式（比較が文字列で行われるため）"""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _iter_chunks(
+    rng: random.Random,
+    items: int,
+    sources: int,
+    today: date
+) -> Iterator[tuple[List[tuple], List[tuple]]]:
+    """学習項目と復習タスクの行を CHUNK_SIZE 件ずつ生成する"""
+    now = datetime.combine(today, datetime.min.time())
+    task_id = 0
+    for chunk_start in range(0, items, CHUNK_SIZE):
+        item_rows = []
+        task_rows = []
+        for item_id in range(chunk_start + 1, min(chunk_start + CHUNK_SIZE, items) + 1):
+            start_date = today - timedelta(days=rng.randrange(START_DATE_SPREAD_DAYS))
+            created_at = datetime.combine(start_date, datetime.min.time()) \
+                + timedelta(seconds=rng.randrange(86400))
+            next_review = None
+            for stage_name, offset in REVIEW_SCHEDULE:
+                due_date = start_date + timedelta(days=offset)
+                completed_at = None
+                if due_date > today:
+                    status = "Pending"
+                elif due_date < today and rng.random() < COMPLETED_RATIO:
+                    status = "Completed"
+                    completed_at = min(
+                        datetime.combine(due_date, datetime.min.time())
+                        + timedelta(seconds=rng.randrange(3 * 86400)),
+                        now
+                    )
+                else:
+                    status = "Ready"
+                if status != "Completed" and next_review is None:
+                    next_review = (due_date, offset)
+                task_id += 1
+                task_rows.append((
+                    task_id, item_id, stage_name, offset, due_date.isoformat(), status,
+                    _datetime(completed_at) if completed_at else None, _datetime(created_at)
+                ))
+            next_due_date, next_stage = next_review if next_review else (None, None)
+            item_rows.append((
+                item_id, (item_id - 1) % sources + 1,
+                f"Item {item_id} {_sentence(rng, 3)}", _sentence(rng, rng.randint(5, 40)),
+                start_date.isoformat(), next_due_date.isoformat() if next_due_date else None,
+                next_stage, _datetime(created_at), _datetime(created_at)
+            ))
+        yield item_rows, task_rows
+
+
+def generate(engine: Engine, scale: str, seed: int = 0, today: Optional[date] = None) -> dict:
+    """
+    空のデータベースに合成データセットを投入する
+
+    Args:
+        engine: スキーマ（マイグレーション適用済み）を持つデータベースのエンジン
+        scale: 規模（SCALES のキー）
+        seed: 乱数のシード（同じシード・規模・基準日なら同じデータになる）
+        today: 基準日（省略時は今日）
+
+    Returns:
+        投入した件数と所要時間
+
+    Raises:
+        ValueError: 規模が不正な場合、データベースが空でない場合
+    """
+    items = items_for_scale(scale)
+    sources = -(-items // ITEMS_PER_SOURCE)
+    today = today if today else date.today()
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        if conn.exec_driver_sql("SELECT count(*) FROM learning_items").scalar():
+            raise ValueError("Database is not empty")
+
+        now = _datetime(datetime.combine(today, datetime.min.time()))
+        conn.exec_driver_sql(
+            "INSERT INTO sources (id, title, category, description, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (source_id, f"Source {source_id}", rng.choice(CATEGORIES), _sentence(rng, 8), now, now)
+                for source_id in range(1, sources + 1)
+            ]
+        )
+        tasks = 0
+        for item_rows, task_rows in _iter_chunks(rng, items, sources, today):
+            conn.exec_driver_sql(
+                "INSERT INTO learning_items (id, source_id, title, content, start_date, "
+                "next_due_date, next_stage_offset_days, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                item_rows
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO review_tasks (id, learning_item_id, stage_name, stage_offset_days, "
+                "due_date, status, completed_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                task_rows
+            )
+            tasks += len(task_rows)
+        conn.exec_driver_sql("ANALYZE")
+
+    return {
+        "scale": scale,
+        "seed": seed,
+        "today": today.isoformat(),
+        "sources": sources,
+        "learning_items": items,
+        "review_tasks": tasks,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def create_database(path: str) -> Engine:
+    """ファイルの SQLite データベースを作成し、スキーマとマイグレーションを適用する"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="作成する SQLite データベースのパス")
+    parser.add_argument("--scale", choices=list(SCALES), default="100k")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = create_database(args.path)
+    try:
+        summary = generate(engine, args.scale, args.seed)
+    finally:
+        engine.dispose()
+    print(
+        f"sources={summary['sources']:,} learning_items={summary['learning_items']:,} "
+        f"review_tasks={summary['review_tasks']:,} in {summary['seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
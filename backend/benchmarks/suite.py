@@ -0,0 +1,301 @@
+"""
+バックエンドのベンチマークスイート
+
+合成データセット（benchmarks.datagen）を投入したデータベースに対して、
+主要なエンドポイントのシナリオを繰り返し実行し、統計を JSON で出力する。
+コミット間の JSON を compare で比べ、中央値が閾値を超えて遅くなったシナリオを検出する。
+
+シナリオ:
+    today              GET  /api/review-tasks/today
+    list_first_page    GET  /api/learning-items/?limit=100
+    list_cursor_page   GET  /api/learning-items/?limit=100&cursor=...（10ページ目）
+    item_detail        GET  /api/learning-items/{id}（毎回別の学習項目）
+    create             POST /api/learning-items/
+    complete           POST /api/review-tasks/{id}/complete（毎回別の Ready タスク）
+    delete_cascade     DELETE /api/learning-items/{id}（復習タスクもカスケード削除）
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.suite run --scale 100k --output before.json
+    python -m benchmarks.suite compare before.json after.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+_tmpdir = tempfile.mkdtemp(prefix="ars-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.datagen import SCALES, generate  # noqa: E402
+
+# JSON レポートの形式のバージョン
+REPORT_VERSION = 1
+
+# cursor で辿る一覧のページ数（list_cursor_page）
+CURSOR_PAGE_DEPTH = 10
+
+# 一覧の1ページの件数
+PAGE_SIZE = 100
+
+
+# ============================================================================
+# Statistics
+# ============================================================================
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """
+    所要時間（秒）のリストの統計（pytest-benchmark の stats と同じキー）
+
+    Args:
+        timings: 1回ごとの所要時間（秒）
+
+    Returns:
+        min / max / mean / stddev / median / iqr / q1 / q3 / p95 / ops / rounds
+    """
+    ordered = sorted(timings)
+    q1, median, q3 = statistics.quantiles(ordered, n=4) if len(ordered) > 1 else ordered * 3
+    mean = statistics.fmean(ordered)
+    return {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": mean,
+        "stddev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "median": median,
+        "iqr": q3 - q1,
+        "q1": q1,
+        "q3": q3,
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "ops": 1 / mean if mean else 0.0,
+        "rounds": len(ordered),
+    }
+
+
+def measure(call: Callable[[], None], rounds: int, warmup: int) -> Dict[str, float]:
+    """call を warmup 回実行してから rounds 回計測する"""
+    for _ in range(warmup):
+        call()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+# ============================================================================
+# Scenarios
+# ============================================================================
+
+def _expect(response, status_code: int = 200):
+    if response.status_code != status_code:
+        raise RuntimeError(
+            f"{response.request.method} {response.request.url} returned "
+            f"{response.status_code}: {response.text[:200]}"
+        )
+    return response
+
+
+def build_scenarios(client, db, rng: random.Random, calls: int) -> Dict[str, Callable[[], None]]:
+    """
+    シナリオ名から1回分のリクエストを送る関数への対応を作る
+
+    書き込みのシナリオは毎回別の行を対象にするため、calls 回分の対象を先に選んでおく。
+    読み取りのシナリオの後に書き込みのシナリオを並べる（実行順）
+
+    Args:
+        client: TestClient
+        db: データベースセッション（対象の行の選択用）
+        rng: 対象を選ぶ乱数
+        calls: 1シナリオあたりの実行回数（ウォームアップを含む）
+
+    Returns:
+        シナリオ名 → 関数（実行順）
+    """
+    item_ids = [row[0] for row in db.execute(text("SELECT id FROM learning_items ORDER BY id"))]
+    ready_ids = [
+        row[0] for row in db.execute(text("SELECT id FROM review_tasks WHERE status = 'Ready' ORDER BY id"))
+    ]
+    if len(item_ids) < 2 * calls or len(ready_ids) < calls:
+        raise ValueError("Dataset is too small for the requested rounds")
+    rng.shuffle(item_ids)
+    detail_ids = iter(item_ids[:calls])
+    delete_ids = iter(item_ids[calls:2 * calls])
+    complete_ids = iter(rng.sample(ready_ids, calls))
+    source_id = db.execute(text("SELECT min(id) FROM sources")).scalar()
+
+    cursor = None
+    for _ in range(CURSOR_PAGE_DEPTH):
+        params = {"limit": PAGE_SIZE, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        cursor = _expect(client.get("/api/learning-items/", params=params)).json()["next_cursor"]
+    deep_page = {"limit": PAGE_SIZE, "include_total": "false", "cursor": cursor}
+
+    return {
+        "today": lambda: _expect(client.get("/api/review-tasks/today")),
+        "list_first_page": lambda: _expect(
+            client.get("/api/learning-items/", params={"limit": PAGE_SIZE})
+        ),
+        "list_cursor_page": lambda: _expect(client.get("/api/learning-items/", params=deep_page)),
+        "item_detail": lambda: _expect(client.get(f"/api/learning-items/{next(detail_ids)}")),
+        "create": lambda: _expect(client.post("/api/learning-items/", json={
+            "source_id": source_id, "title": "Benchmark item", "content": "created by the suite"
+        }), 201),
+        "complete": lambda: _expect(client.post(f"/api/review-tasks/{next(complete_ids)}/complete")),
+        "delete_cascade": lambda: _expect(
+            client.delete(f"/api/learning-items/{next(delete_ids)}"), 204
+        ),
+    }
+
+
+# ============================================================================
+# Report
+# ============================================================================
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale: str, seed: int, rounds: int, warmup: int, only: Optional[List[str]] = None) -> dict:
+    """
+    一時データベースにデータセットを投入してシナリオを実行する
+
+    Args:
+        scale: データセットの規模（datagen.SCALES のキー）
+        seed: データセットと対象の選択の乱数のシード
+        rounds: 1シナリオあたりの計測回数
+        warmup: 計測前に実行する回数
+        only: 実行するシナリオ名（省略時はすべて）
+
+    Returns:
+        JSON レポート
+    """
+    dataset = generate(engine, scale, seed)
+    client = TestClient(app)
+    db = SessionLocal()
+    try:
+        scenarios = build_scenarios(client, db, random.Random(seed), rounds + warmup)
+    finally:
+        db.close()
+
+    benchmarks = []
+    for name, call in scenarios.items():
+        if only and name not in only:
+            continue
+        stats = measure(call, rounds, warmup)
+        benchmarks.append({"name": name, "stats": stats})
+        print(
+            f"{name:<18} median={stats['median'] * 1000:8.2f}ms "
+            f"p95={stats['p95'] * 1000:8.2f}ms ops={stats['ops']:9.1f}",
+            file=sys.stderr
+        )
+
+    return {
+        "version": REPORT_VERSION,
+        "datetime": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "machine_info": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "dataset": dataset,
+        "options": {"rounds": rounds, "warmup": warmup},
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(before: dict, after: dict, threshold: float) -> tuple[List[str], List[str]]:
+    """
+    2つのレポートの中央値を比べる
+
+    Args:
+        before: 基準のレポート
+        after: 比較するレポート
+        threshold: 遅くなったとみなす中央値の増加率（0.1 なら 10%）
+
+    Returns:
+        (表の行のリスト, 遅くなったシナリオ名のリスト)
+    """
+    before_stats = {b["name"]: b["stats"] for b in before["benchmarks"]}
+    lines = [f"{'scenario':<18}{'before(ms)':>12}{'after(ms)':>12}{'change':>10}"]
+    regressions = []
+    for benchmark in after["benchmarks"]:
+        name = benchmark["name"]
+        if name not in before_stats:
+            lines.append(f"{name:<18}{'-':>12}{benchmark['stats']['median'] * 1000:>12.2f}{'new':>10}")
+            continue
+        old = before_stats[name]["median"]
+        new = benchmark["stats"]["median"]
+        change = new / old - 1 if old else 0.0
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            mark = "  improved"
+        lines.append(f"{name:<18}{old * 1000:>12.2f}{new * 1000:>12.2f}{change:>+10.1%}{mark}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="シナリオを実行して JSON レポートを出力する")
+    run_parser.add_argument("--scale", choices=list(SCALES), default="100k")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--rounds", type=int, default=50)
+    run_parser.add_argument("--warmup", type=int, default=5)
+    run_parser.add_argument("--only", nargs="+", help="実行するシナリオ名")
+    run_parser.add_argument("--output", help="JSON レポートの出力先（省略時は標準出力）")
+
+    compare_parser = commands.add_parser("compare", help="2つの JSON レポートを比べる")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="遅くなったとみなす中央値の増加率")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args.scale, args.seed, args.rounds, args.warmup, args.only)
+        body = json.dumps(report, indent=2, sort_keys=True)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(body + "\n")
+        else:
+            print(body)
+        return
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    if before.get("dataset", {}).get("scale") != after.get("dataset", {}).get("scale"):
+        print("warning: reports use different dataset scales", file=sys.stderr)
+    lines, regressions = compare(before, after, args.threshold)
+    print("\n".join(lines))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
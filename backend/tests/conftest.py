@@ -0,0 +1,81 @@
+import pytest
+from datetime import date
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app import crud, models, schemas
+from app.database import Base, set_sqlite_pragmas
+from app.migrations import run_migrations
+from app.query_guard import GUARD
+
+
+@pytest.fixture
+def query_guard():
+    """
+    N+1 クエリの検出を raise モードで有効にする
+
+    ルートの query_budget を超えたリクエストや、同じ SQL 文を繰り返した
+    リクエストは QueryBudgetExceeded で失敗する（TestClient が例外を送出する）
+    """
+    previous = GUARD.mode
+    GUARD.mode = "raise"
+    try:
+        yield GUARD
+    finally:
+        GUARD.mode = previous
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """
+    マイグレーション済みのファイルのデータベース
+
+    本番と同じ PRAGMA（WAL・外部キー制約など）を接続ごとに適用する。
+    スレッドをまたいで使えるよう check_same_thread は無効にする
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    """engine のセッションのファクトリ（空のデータベース）"""
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    """媒体（id=1）を1件登録したデータベースのセッション"""
+    session = session_factory()
+    session.add(models.Source(id=1, title="Test Source"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def create_item(db):
+    """
+    db に学習項目を作成する関数
+
+    Returns:
+        create_item(start_date=None, title="Item", content=None, source_id=1)
+        （作成した学習項目を返す。開始日の省略時は今日）
+    """
+    def create(
+        start_date: Optional[date] = None,
+        title: str = "Item",
+        content: Optional[str] = None,
+        source_id: int = 1
+    ) -> models.LearningItem:
+        return crud.create_learning_item(db, schemas.LearningItemCreate(
+            source_id=source_id, title=title, content=content, start_date=start_date
+        ))
+    return create
@@ -0,0 +1,156 @@
+import os
+import subprocess
+import sys
+import time
+import pytest
+from pathlib import Path
+from datetime import date, datetime, timedelta
+from app import config, crud, models
+from app.scheduler import SCHEDULERS, get_scheduler
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def tokyo_time():
+    """ローカル時刻を UTC+9 にする（SQLite の localtime も同じ TZ を使う）"""
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "Asia/Tokyo"
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def due_dates(db, item_id: int) -> dict:
+    db.expire_all()
+    return {task.stage_offset_days: task.due_date for task in crud.get_learning_item(db, item_id).review_tasks}
+
+
+def test_config_validates_scheduler_names():
+    """設定で検証するスケジューラ名は登録済みのスケジューラと一致する"""
+    assert set(config.SCHEDULER_NAMES) == set(SCHEDULERS)
+
+
+def test_config_rejects_sm2_with_lazy_storage():
+    """遅延生成モードの未生成のステージは固定の間隔になるため、SM-2 とは併用できない"""
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.config"],
+        cwd=Path(__file__).resolve().parents[1],
+        env=dict(os.environ, SCHEDULER="sm2", REVIEW_TASK_STORAGE="lazy"),
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode != 0
+    assert "SCHEDULER=sm2 cannot be used with REVIEW_TASK_STORAGE=lazy" in result.stderr
+
+
+def test_sm2_completion_reschedules_remaining_tasks(db, monkeypatch, create_item):
+    """適応型スケジューラでは評価で易しさ係数が変わり、残りのタスクの予定日が変わる"""
+    monkeypatch.setattr(config, "SCHEDULER", "sm2")
+    easy = create_item(TODAY)
+    hard = create_item(TODAY)
+    completed_at = datetime.combine(TODAY, datetime.min.time())
+
+    crud.complete_review_tasks(db, [(easy.review_tasks[0].id, completed_at)], {easy.review_tasks[0].id: 5})
+    crud.complete_review_tasks(db, [(hard.review_tasks[0].id, completed_at)], {hard.review_tasks[0].id: 0})
+
+    easy_due = due_dates(db, easy.id)
+    hard_due = due_dates(db, hard.id)
+    assert easy_due[0] == hard_due[0] == TODAY
+    assert easy_due[1] == TODAY + timedelta(days=2)   # ceil(1 × 2.6 / 2.5)
+    assert hard_due[1] == TODAY + timedelta(days=1)   # ceil(1 × 1.7 / 2.5)
+    assert easy_due[365] > TODAY + timedelta(days=365) > hard_due[365]
+    assert db.get(models.LearningItem, easy.id).ease_factor == pytest.approx(2.6)
+    assert db.get(models.LearningItem, hard.id).ease_factor == pytest.approx(1.7)
+
+
+def test_fixed_completion_keeps_schedule(db, create_item):
+    """固定スケジュールでは評価を指定しても予定日は変わらない"""
+    item = create_item(TODAY)
+    before = due_dates(db, item.id)
+    crud.complete_review_task(db, item.review_tasks[0].id, grade=0)
+    assert due_dates(db, item.id) == before
+
+
+def test_recompute_due_dates(db, monkeypatch, create_item):
+    """一括再計算は完了済みの最後のステージを基準に Pending タスクの予定日を更新する"""
+    item = create_item(TODAY - timedelta(days=1))
+    fixed = due_dates(db, item.id)
+    db.query(models.LearningItem).update({"ease_factor": 5.0})
+    db.commit()
+
+    # 固定スケジュールのままなら何も変わらない
+    assert crud.recompute_due_dates(db, get_scheduler("fixed")) == 0
+
+    # SM-2 では開始日を基準に間隔が2倍になる（Ready のタスクは対象外）
+    assert crud.recompute_due_dates(db, get_scheduler("sm2")) == 7
+    rescheduled = due_dates(db, item.id)
+    assert rescheduled[1] == fixed[1]
+    assert rescheduled[3] == TODAY - timedelta(days=1) + timedelta(days=6)
+    assert rescheduled[365] == TODAY - timedelta(days=1) + timedelta(days=730)
+
+    # 固定スケジュールで再計算すると元に戻る
+    assert crud.recompute_due_dates(db, get_scheduler("fixed")) == 7
+    assert due_dates(db, item.id) == fixed
+
+
+def test_sm2_anchors_on_local_completion_date(db, monkeypatch, tokyo_time, create_item):
+    """UTC では前日でも、ローカルの日付で完了した日を基準にする"""
+    monkeypatch.setattr(config, "SCHEDULER", "sm2")
+    start_date = date.today() + timedelta(days=10)
+    item = create_item(start_date)
+    # ローカル時刻では開始日の 05:00
+    completed_at = datetime.combine(start_date - timedelta(days=1), datetime.min.time()) + timedelta(hours=20)
+    crud.complete_review_tasks(db, [(item.review_tasks[0].id, completed_at)])
+    assert due_dates(db, item.id)[1] == start_date + timedelta(days=1)
+
+    # 一括再計算も同じ基準日になる
+    assert crud.recompute_due_dates(db, get_scheduler("sm2")) == 0
+
+
+def test_sm2_reschedules_lazy_items_like_eager_items(db, monkeypatch, create_item):
+    """遅延生成モードで作成した学習項目も、未生成のステージを含めて評価で予定日が変わる"""
+    eager = create_item(TODAY)
+    monkeypatch.setattr(config, "REVIEW_TASK_STORAGE", "lazy")
+    lazy = create_item(TODAY)
+    # 遅延生成モードで作成した後にスケジューラを SM-2 に切り替えた場合
+    monkeypatch.setattr(config, "SCHEDULER", "sm2")
+
+    completed_at = datetime.combine(TODAY, datetime.min.time())
+    for item in (eager, lazy):
+        crud.complete_review_tasks(db, [(item.review_tasks[0].id, completed_at)], {item.review_tasks[0].id: 0})
+
+    assert due_dates(db, lazy.id) == due_dates(db, eager.id)
+    assert due_dates(db, lazy.id)[7] == TODAY + timedelta(days=5)   # ceil(7 × 1.7 / 2.5)
+    assert db.get(models.LearningItem, lazy.id).materialized_through is None
+
+
+def test_sm2_recompute_covers_lazy_items(db, monkeypatch, create_item):
+    """一括再計算は遅延生成モードの未生成のステージも実体化して再計算する"""
+    eager = create_item(TODAY - timedelta(days=1))
+    monkeypatch.setattr(config, "REVIEW_TASK_STORAGE", "lazy")
+    lazy = create_item(TODAY - timedelta(days=1))
+    db.query(models.LearningItem).update({"ease_factor": 5.0})
+    db.commit()
+
+    assert crud.recompute_due_dates(db, get_scheduler("sm2")) == 14
+    assert due_dates(db, lazy.id) == due_dates(db, eager.id)
+    assert due_dates(db, lazy.id)[365] == TODAY - timedelta(days=1) + timedelta(days=730)
+
+
+def test_collapse_keeps_rescheduled_items(db, monkeypatch, create_item):
+    """SM-2 で予定日を変更した学習項目は遅延生成モードに変換しない"""
+    fixed = create_item(TODAY)
+    rescheduled = create_item(TODAY)
+    monkeypatch.setattr(config, "SCHEDULER", "sm2")
+    crud.complete_review_task(db, rescheduled.review_tasks[0].id, grade=0)
+    before = due_dates(db, rescheduled.id)
+
+    assert crud.collapse_pending_review_tasks(db)[0] == 1
+    assert db.get(models.LearningItem, fixed.id).materialized_through == 1
+    assert db.get(models.LearningItem, rescheduled.id).materialized_through is None
+    assert due_dates(db, rescheduled.id) == before
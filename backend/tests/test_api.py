@@ -192,3 +192,238 @@ def test_uncomplete_review_task():
     data = response.json()
     assert data["status"] == "Ready"
     assert data["completed_at"] is None
+
+
+def test_recomplete_yearly_task_does_not_duplicate_next_task():
+    """1年後タスクを完了→取り消し→再完了しても次の1年後タスクは1つだけ"""
+    source = client.post("/api/sources/", json={"title": "Yearly Source"}).json()
+    create_response = client.post(
+        "/api/learning-items/",
+        json={"source_id": source["id"], "title": "Yearly Item", "start_date": "2020-01-01"}
+    )
+    item = create_response.json()
+    yearly_task = next(t for t in item["review_tasks"] if t["stage_offset_days"] == 365)
+
+    client.post(f"/api/review-tasks/{yearly_task['id']}/complete")
+    client.post(f"/api/review-tasks/{yearly_task['id']}/uncomplete")
+    client.post(f"/api/review-tasks/{yearly_task['id']}/complete")
+
+    detail = client.get(f"/api/learning-items/{item['id']}").json()
+    offsets = [t["stage_offset_days"] for t in detail["review_tasks"]]
+    assert offsets.count(730) == 1
+    assert offsets == sorted(offsets)
+
+
+def test_get_sources_with_cursor():
+    """媒体一覧のキーセットページネーション"""
+    for i in range(3):
+        client.post("/api/sources/", json={"title": f"Cursor Source {i}"})
+
+    first = client.get("/api/sources/?limit=2").json()
+    assert len(first["items"]) == 2
+    assert first["next_cursor"] is not None
+
+    second = client.get(f"/api/sources/?limit=2&cursor={first['next_cursor']}").json()
+    assert len(second["items"]) >= 1
+
+    # 2ページ目は1ページ目の続き（created_at, id の降順）
+    offset_page = client.get("/api/sources/?limit=2&skip=2").json()
+    assert [s["id"] for s in second["items"]] == [s["id"] for s in offset_page["items"]]
+    first_ids = {s["id"] for s in first["items"]}
+    assert not first_ids & {s["id"] for s in second["items"]}
+
+
+def test_get_learning_items_without_total():
+    """include_total=false の場合は総件数を返さない"""
+    response = client.get("/api/learning-items/?include_total=false&limit=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] is None
+    assert "next_cursor" in data
+
+
+def test_get_learning_items_with_invalid_cursor():
+    """不正なカーソルは400エラー"""
+    response = client.get("/api/learning-items/?cursor=invalid")
+    assert response.status_code == 400
+
+
+def test_bulk_create_learning_items():
+    """学習項目の一括作成（JSON配列）"""
+    source = client.post("/api/sources/", json={"title": "Bulk Source"}).json()
+    response = client.post(
+        "/api/learning-items/bulk",
+        json=[
+            {"source_id": source["id"], "title": "Bulk 1", "start_date": "2024-01-01"},
+            {"source_id": source["id"], "title": ""},
+            {"source_id": 999999, "title": "Unknown source"},
+            {"source_id": source["id"], "title": "Bulk 2", "content": "Content"},
+        ]
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    results = data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[0]["id"] is not None
+    assert "title" in results[1]["error"]
+    assert results[2]["error"] == "Source not found"
+
+    detail = client.get(f"/api/learning-items/{results[0]['id']}").json()
+    assert detail["title"] == "Bulk 1"
+    assert len(detail["review_tasks"]) == 9
+    assert detail["review_tasks"][0]["due_date"] == "2024-01-01"
+    assert all(t["status"] == "Ready" for t in detail["review_tasks"])
+
+
+def test_bulk_create_learning_items_ndjson():
+    """学習項目の一括作成（NDJSON）"""
+    source = client.post("/api/sources/", json={"title": "NDJSON Source"}).json()
+    body = "\n".join([
+        f'{{"source_id": {source["id"]}, "title": "Line 1"}}',
+        "not json",
+        "",
+        f'{{"source_id": {source["id"]}, "title": "Line 2"}}',
+    ])
+    response = client.post(
+        "/api/learning-items/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["results"][1] == {"index": 1, "id": None, "error": "Invalid JSON"}
+
+    detail = client.get(f"/api/learning-items/{data['results'][2]['id']}").json()
+    assert detail["title"] == "Line 2"
+    assert len(detail["review_tasks"]) == 9
+
+
+def test_bulk_create_learning_items_rejects_non_array():
+    """JSON配列以外のボディは400エラー"""
+    response = client.post("/api/learning-items/bulk", json={"title": "Not a list"})
+    assert response.status_code == 400
+
+
+def test_complete_review_tasks_batch():
+    """復習タスクの一括完了"""
+    source = client.post("/api/sources/", json={"title": "Batch Source"}).json()
+    item = client.post(
+        "/api/learning-items/",
+        json={"source_id": source["id"], "title": "Batch Item", "start_date": "2020-01-01"}
+    ).json()
+    tasks = {t["stage_offset_days"]: t for t in item["review_tasks"]}
+    client.post(f"/api/review-tasks/{tasks[0]['id']}/complete")
+
+    response = client.post(
+        "/api/review-tasks/complete-batch",
+        json={"items": [
+            {"task_id": tasks[0]["id"]},
+            {"task_id": tasks[1]["id"], "completed_at": "2020-01-02T09:00:00"},
+            {"task_id": tasks[365]["id"]},
+            {"task_id": 99999999},
+        ]}
+    )
+    assert response.status_code == 200
+    outcomes = {r["task_id"]: r["outcome"] for r in response.json()["results"]}
+    assert outcomes == {
+        tasks[0]["id"]: "already_completed",
+        tasks[1]["id"]: "completed",
+        tasks[365]["id"]: "completed",
+        99999999: "not_found",
+    }
+
+    detail = client.get(f"/api/learning-items/{item['id']}").json()
+    detail_tasks = {t["stage_offset_days"]: t for t in detail["review_tasks"]}
+    assert detail_tasks[1]["status"] == "Completed"
+    assert detail_tasks[1]["completed_at"] == "2020-01-02T09:00:00"
+    # 1年後タスクの完了で2年後タスクが生成される
+    assert detail_tasks[730]["status"] == "Ready"
+
+
+def test_uncomplete_review_tasks_batch():
+    """復習タスクの一括完了取り消し"""
+    source = client.post("/api/sources/", json={"title": "Batch Source"}).json()
+    item = client.post(
+        "/api/learning-items/",
+        json={"source_id": source["id"], "title": "Batch Uncomplete Item"}
+    ).json()
+    task_id = item["review_tasks"][0]["id"]
+    client.post("/api/review-tasks/complete-batch", json={"items": [{"task_id": task_id}]})
+
+    response = client.post(
+        "/api/review-tasks/uncomplete-batch",
+        json={"task_ids": [task_id, 99999999]}
+    )
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"task_id": task_id, "outcome": "uncompleted"},
+        {"task_id": 99999999, "outcome": "not_found"},
+    ]
+    assert client.get(f"/api/review-tasks/{task_id}").json()["status"] == "Ready"
+
+
+def test_get_today_reviews_with_item_title():
+    """今日の復習タスクに学習項目のタイトルと内容の先頭部分が含まれる"""
+    source = client.post("/api/sources/", json={"title": "Today Source"}).json()
+    item = client.post(
+        "/api/learning-items/",
+        json={"source_id": source["id"], "title": "Today Item", "content": "あ" * 500}
+    ).json()
+    task_id = item["review_tasks"][0]["id"]
+
+    tasks = {t["id"]: t for t in client.get("/api/review-tasks/today").json()}
+    task = tasks[task_id]
+    assert task["learning_item_title"] == "Today Item"
+    assert task["learning_item_content_preview"] == "あ" * 100
+    assert task["learning_item_content"] is None
+
+    tasks = {t["id"]: t for t in client.get("/api/review-tasks/today?fields=content").json()}
+    assert tasks[task_id]["learning_item_content"] == "あ" * 500
+
+
+def test_get_today_reviews_with_unknown_field():
+    """未知のフィールド指定は400エラー"""
+    response = client.get("/api/review-tasks/today?fields=unknown")
+    assert response.status_code == 400
+
+
+def test_list_fast_path_matches_schema_serialization():
+    """一覧の高速シリアライズはレスポンススキーマを通した場合と同じ JSON になる"""
+    from fastapi.responses import JSONResponse
+    from app import models, schemas
+    from app.database import SessionLocal
+
+    source = client.post(
+        "/api/sources/",
+        json={"title": "Parity Source", "category": "本", "description": "説明"}
+    ).json()
+    client.post(
+        "/api/learning-items/",
+        json={"source_id": source["id"], "title": "Parity Item", "content": "内容"}
+    )
+
+    cases = [
+        ("/api/sources/", models.Source, schemas.SourceListResponse),
+        ("/api/learning-items/", models.LearningItem, schemas.LearningItemListResponse),
+    ]
+    db = SessionLocal()
+    try:
+        for url, model, response_schema in cases:
+            response = client.get(url, params={"limit": 5})
+            assert response.status_code == 200
+
+            items = db.query(model)\
+                .order_by(model.created_at.desc(), model.id.desc())\
+                .limit(5)\
+                .all()
+            expected = response_schema.model_validate({
+                "items": items,
+                "total": db.query(model).count(),
+                "next_cursor": response.json()["next_cursor"]
+            })
+            assert response.content == JSONResponse(expected.model_dump(mode="json")).body
+    finally:
+        db.close()
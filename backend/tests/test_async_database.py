@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from datetime import date
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app import rollover
+from app.main import app
+from app.database import Base, create_async_sessionmaker, get_db, set_sqlite_pragmas
+from app.migrations import run_migrations
+
+
+@pytest.fixture
+def async_client(tmp_path, monkeypatch):
+    """非同期スタック（aiosqlite + AsyncSession）でルーターを動かすクライアント"""
+    url = f"sqlite:///{tmp_path}/async.db"
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False})
+    event.listen(sync_engine, "connect", set_sqlite_pragmas)
+    Base.metadata.create_all(bind=sync_engine)
+    run_migrations(sync_engine)
+    # 日付切り替え処理は同期セッションで同じデータベースに対して行う
+    monkeypatch.setattr(rollover, "SessionLocal", sessionmaker(bind=sync_engine))
+
+    async_session = create_async_sessionmaker(url)
+
+    async def get_async_db():
+        async with async_session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = get_async_db
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        asyncio.run(async_session.kw["bind"].dispose())
+        sync_engine.dispose()
+
+
+def test_async_stack_end_to_end(async_client):
+    """非同期セッションで作成・取得・完了・一覧の一連の操作ができる"""
+    source = async_client.post("/api/sources/", json={"title": "Async Source"})
+    assert source.status_code == 201
+    source_id = source.json()["id"]
+
+    created = async_client.post(
+        "/api/learning-items/",
+        json={"source_id": source_id, "title": "Async Item", "start_date": "2024-01-01"}
+    )
+    assert created.status_code == 201
+    item = created.json()
+    assert len(item["review_tasks"]) == 9
+
+    task_id = item["review_tasks"][0]["id"]
+    completed = async_client.post(f"/api/review-tasks/{task_id}/complete")
+    assert completed.status_code == 200
+    assert completed.json()["status"] == "Completed"
+
+    today = async_client.get("/api/review-tasks/today")
+    assert today.status_code == 200
+    assert task_id not in {t["id"] for t in today.json()}
+
+    listing = async_client.get("/api/learning-items/?limit=10").json()
+    assert listing["total"] == 1
+
+    detail = async_client.get(f"/api/sources/{source_id}").json()
+    assert [i["id"] for i in detail["learning_items"]] == [item["id"]]
+
+    bulk = async_client.post(
+        "/api/learning-items/bulk",
+        json=[{"source_id": source_id, "title": "Async Bulk"}]
+    )
+    assert bulk.json()["created"] == 1
+
+    assert async_client.delete(f"/api/sources/{source_id}").status_code == 204
+    assert async_client.get(f"/api/learning-items/{item['id']}").status_code == 404
+
+
+def test_concurrent_requests_before_rollover(async_client, monkeypatch):
+    """日付切り替え前の同時リクエストがイベントループを止めない"""
+    # 起動時の日付切り替え処理が終わってから未実施の状態に戻す
+    deadline = time.monotonic() + 10
+    while rollover._last_rollover_date != date.today() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    monkeypatch.setattr(rollover, "_last_rollover_date", None)
+    statuses = []
+
+    async def fetch_concurrently():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*(
+                client.get(path) for path in ["/api/review-tasks/today"] * 5 + ["/api/review-tasks/forecast"]
+            ))
+        statuses.extend(response.status_code for response in responses)
+
+    # ループのスレッドが止まると wait_for も働かないため、別スレッドで実行して待つ
+    worker = threading.Thread(target=asyncio.run, args=(fetch_concurrently(),), daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+    assert not worker.is_alive(), "concurrent requests deadlocked the event loop"
+    assert statuses == [200] * 6
+    assert rollover._last_rollover_date is not None
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from app import crud, schemas
+from app.main import app
+
+client = TestClient(app)
+
+
+def table_counts(db) -> dict:
+    return {
+        table: db.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+        for table in ("sources", "learning_items", "review_tasks", "learning_items_fts")
+    }
+
+
+def test_delete_source_cascades_in_the_database(db):
+    # db の媒体（id=1）は残す
+    source_id = crud.create_source(db, schemas.SourceCreate(title="Deleted")).id
+    start_date = date.today() - timedelta(days=10)
+    crud.bulk_create_learning_items(db, [
+        schemas.LearningItemCreate(source_id=owner_id, title=f"Item {i}", start_date=start_date)
+        for owner_id in (1, source_id) for i in range(50)
+    ])
+    assert table_counts(db) == {
+        "sources": 2, "learning_items": 100, "review_tasks": 900, "learning_items_fts": 100
+    }
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    assert crud.delete_source(db, source_id)
+    # 子の行を読み込まず、DELETE 1回と変更カウンタの更新だけで削除する
+    assert len(statements) <= 4
+    assert table_counts(db) == {
+        "sources": 1, "learning_items": 50, "review_tasks": 450, "learning_items_fts": 50
+    }
+    assert not crud.delete_source(db, source_id)
+
+
+def test_delete_learning_item_cascades_to_review_tasks(db, create_item):
+    item_id = create_item().id
+    assert crud.delete_learning_item(db, item_id)
+    assert table_counts(db)["review_tasks"] == 0
+    assert not crud.delete_learning_item(db, item_id)
+
+
+def test_create_learning_item_for_missing_source(db):
+    assert crud.create_learning_item(db, schemas.LearningItemCreate(source_id=999999, title="Orphan")) is None
+    assert table_counts(db)["learning_items"] == 0
+
+    response = client.post("/api/learning-items/", json={"source_id": 999999, "title": "Orphan"})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Source not found"
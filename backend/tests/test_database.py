@@ -0,0 +1,74 @@
+import threading
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.main import app
+from app.database import engine, is_memory_database
+from app.config import SQLITE_BUSY_TIMEOUT
+
+client = TestClient(app)
+
+
+def test_sqlite_pragmas_are_applied():
+    """接続ごとに WAL などの PRAGMA が設定される"""
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == SQLITE_BUSY_TIMEOUT
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -64000
+
+
+def test_is_memory_database():
+    assert is_memory_database("sqlite://")
+    assert is_memory_database("sqlite:///:memory:")
+    assert not is_memory_database("sqlite:////app/data/ars.db")
+
+
+def test_concurrent_readers_and_writers():
+    """/today の読み取りとタスク完了の書き込みを並行しても database is locked にならない"""
+    source = client.post("/api/sources/", json={"title": "Concurrency Source"}).json()
+    bulk = client.post(
+        "/api/learning-items/bulk",
+        json=[
+            {"source_id": source["id"], "title": f"Concurrent {i}", "start_date": "2024-01-01"}
+            for i in range(40)
+        ]
+    ).json()
+    item_ids = [r["id"] for r in bulk["results"]]
+    task_ids = [
+        t["id"]
+        for item_id in item_ids
+        for t in client.get(f"/api/learning-items/{item_id}").json()["review_tasks"]
+    ]
+
+    errors = []
+
+    def reader():
+        local_client = TestClient(app)
+        try:
+            for _ in range(15):
+                response = local_client.get("/api/review-tasks/today")
+                assert response.status_code == 200
+        except Exception as e:
+            errors.append(e)
+
+    def writer(ids):
+        local_client = TestClient(app)
+        try:
+            for task_id in ids:
+                response = local_client.post(f"/api/review-tasks/{task_id}/complete")
+                assert response.status_code == 200
+        except Exception as e:
+            errors.append(e)
+
+    writer_count = 3
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    threads += [
+        threading.Thread(target=writer, args=(task_ids[i::writer_count],))
+        for i in range(writer_count)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
@@ -0,0 +1,51 @@
+from datetime import date
+import pytest
+from sqlalchemy import text
+from benchmarks.datagen import create_database, generate, items_for_scale
+
+TODAY = date(2024, 6, 1)
+
+
+def snapshot(engine) -> list:
+    with engine.connect() as conn:
+        return [
+            conn.execute(text(f"SELECT * FROM {table} ORDER BY id")).all()
+            for table in ("sources", "learning_items", "review_tasks")
+        ]
+
+
+def test_generate_is_deterministic(tmp_path):
+    engines = [create_database(tmp_path / f"{i}.db") for i in range(2)]
+    summaries = [generate(engine, "10k", seed=1, today=TODAY) for engine in engines]
+    assert summaries[0]["learning_items"] == items_for_scale("10k")
+    assert summaries[0]["review_tasks"] >= 10_000
+    assert snapshot(engines[0]) == snapshot(engines[1])
+
+    with engines[0].connect() as conn:
+        # 予定日が未到来のタスクは Pending、Ready のタスクの予定日は今日以前
+        assert conn.execute(text(
+            "SELECT count(*) FROM review_tasks WHERE "
+            "(due_date > :today) != (status = 'Pending')"
+        ), {"today": TODAY.isoformat()}).scalar() == 0
+        # 次の復習予定は未完了の最初のタスク
+        assert conn.execute(text(
+            "SELECT count(*) FROM learning_items li WHERE li.next_due_date IS NOT "
+            "(SELECT min(rt.due_date) FROM review_tasks rt "
+            "WHERE rt.learning_item_id = li.id AND rt.status != 'Completed')"
+        )).scalar() == 0
+        assert conn.execute(text(
+            "SELECT count(*) FROM learning_items_fts WHERE learning_items_fts MATCH 'memory'"
+        )).scalar() > 0
+
+    for engine in engines:
+        engine.dispose()
+
+
+def test_generate_rejects_non_empty_database_and_unknown_scale(tmp_path):
+    engine = create_database(tmp_path / "bench.db")
+    with pytest.raises(ValueError):
+        generate(engine, "5k")
+    generate(engine, "10k", today=TODAY)
+    with pytest.raises(ValueError):
+        generate(engine, "10k", today=TODAY)
+    engine.dispose()
@@ -0,0 +1,108 @@
+import re
+from datetime import date, datetime
+from fastapi.testclient import TestClient
+from app.main import app
+from app.http_cache import etag_matches, make_etag
+
+client = TestClient(app)
+
+# RFC 9110 の entity-tag（弱い ETag）: etagc は空白と '"' を含まない
+WEAK_ETAG = re.compile(r'W/"[\x21\x23-\x7e]*"')
+
+
+def create_item() -> dict:
+    """テスト用の媒体と学習項目を作成する"""
+    source = client.post("/api/sources/", json={"title": "ETag Source"}).json()
+    return client.post(
+        "/api/learning-items/",
+        json={"source_id": source["id"], "title": "ETag Item"}
+    ).json()
+
+
+def revalidate(url: str, etag: str):
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+def test_learning_item_conditional_get():
+    """学習項目詳細は ETag が一致すれば 304、更新や復習で変わる"""
+    item = create_item()
+    url = f"/api/learning-items/{item['id']}"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    etag = response.headers["ETag"]
+    assert WEAK_ETAG.fullmatch(etag)
+
+    cached = revalidate(url, etag)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    client.post(f"/api/review-tasks/{item['review_tasks'][0]['id']}/complete")
+    response = revalidate(url, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    etag = response.headers["ETag"]
+    client.put(url, json={"title": "ETag Item (updated)"})
+    response = revalidate(url, etag)
+    assert response.status_code == 200
+    assert response.json()["title"] == "ETag Item (updated)"
+
+
+def test_source_conditional_get():
+    """媒体詳細は学習項目の追加で ETag が変わる"""
+    item = create_item()
+    url = f"/api/sources/{item['source_id']}"
+
+    etag = client.get(url).headers["ETag"]
+    assert WEAK_ETAG.fullmatch(etag)
+    assert revalidate(url, etag).status_code == 304
+
+    client.post(
+        "/api/learning-items/",
+        json={"source_id": item["source_id"], "title": "ETag Item 2"}
+    )
+    response = revalidate(url, etag)
+    assert response.status_code == 200
+    assert len(response.json()["learning_items"]) == 2
+
+
+def test_today_conditional_get():
+    """今日の復習タスクは完了操作で ETag が変わり、fields ごとに別の ETag になる"""
+    item = create_item()
+    url = "/api/review-tasks/today"
+
+    etag = client.get(url).headers["ETag"]
+    assert WEAK_ETAG.fullmatch(etag)
+    assert revalidate(url, etag).status_code == 304
+    assert client.get(f"{url}?fields=content").headers["ETag"] != etag
+
+    client.post(f"/api/review-tasks/{item['review_tasks'][0]['id']}/complete")
+    assert revalidate(url, etag).status_code == 200
+
+
+def test_missing_resource_is_not_found():
+    """存在しない学習項目は If-None-Match に関わらず 404"""
+    response = revalidate("/api/learning-items/99999999", "*")
+    assert response.status_code == 404
+
+
+def test_etag_matches():
+    """If-None-Match の弱い比較"""
+    etag = make_etag("item", 1, None, 3)
+    assert etag == 'W/"item-1--3"'
+    assert etag_matches(etag, etag)
+    assert etag_matches('"item-1--3"', etag)
+    assert etag_matches('W/"other", W/"item-1--3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"item-1--4"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_etag_encodes_dates_without_spaces():
+    """更新日時を含めても ETag に空白が入らない"""
+    etag = make_etag("item", 1, datetime(2026, 10, 18, 5, 0, 50, 431983), date(2026, 10, 18), 9)
+    assert etag == 'W/"item-1-2026-10-18T05:00:50.431983-2026-10-18-9"'
+    assert WEAK_ETAG.fullmatch(etag)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app.events import EventBroker, broker, format_sse
+from app.main import app
+from app.rollover import run_rollover
+
+client = TestClient(app)
+
+
+def parse_sse(text: str) -> list:
+    """SSE のレスポンス本文を (イベント名, データ) のリストにする（コメントは無視）"""
+    events = []
+    for message in text.split("\n\n"):
+        fields = {}
+        for line in message.splitlines():
+            if line.startswith(":") or ":" not in line:
+                continue
+            name, value = line.split(":", 1)
+            fields.setdefault(name, []).append(value.removeprefix(" "))
+        if "event" in fields:
+            events.append((fields["event"][0], json.loads("\n".join(fields["data"]))))
+    return events
+
+
+def consume_stream(actions, timeout: float = 1.5) -> list:
+    """
+    /stream を購読しながら actions を別スレッドで実行し、受け取ったイベントを返す
+
+    TestClient はレスポンスが終わるまで戻らないため、timeout で接続を閉じさせる
+    """
+    subscribers = broker.subscriber_count
+    errors = []
+
+    def run_actions():
+        deadline = time.monotonic() + timeout
+        while broker.subscriber_count <= subscribers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        try:
+            actions()
+        except Exception as e:  # pragma: no cover - テスト失敗時の表示用
+            errors.append(e)
+
+    thread = threading.Thread(target=run_actions)
+    thread.start()
+    with client.stream("GET", f"/api/review-tasks/stream?timeout={timeout}") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+    thread.join()
+    assert errors == []
+    return parse_sse(body)
+
+
+def create_item(start_date: date) -> dict:
+    source = client.post("/api/sources/", json={"title": "Stream Source"}).json()
+    response = client.post(
+        "/api/learning-items/",
+        json={"source_id": source["id"], "title": "Stream Item", "start_date": start_date.isoformat()}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def task_by_offset(item: dict, offset_days: int) -> dict:
+    return next(t for t in item["review_tasks"] if t["stage_offset_days"] == offset_days)
+
+
+def test_format_sse():
+    assert format_sse(3, "task_completed", {"ids": [1]}) == \
+        'id: 3\nevent: task_completed\ndata: {"ids":[1]}\n\n'
+    assert parse_sse(format_sse(3, "task_completed", {"ids": [1]}) + ": keep-alive\n\n") == \
+        [("task_completed", {"ids": [1]})]
+
+
+def test_broker_delivers_across_threads_and_resets_on_overflow():
+    async def scenario():
+        events = EventBroker(queue_size=2)
+        subscription = events.subscribe()
+        publisher = threading.Thread(target=lambda: events.publish("task_completed", {"ids": [1]}))
+        publisher.start()
+        publisher.join()
+        assert (await subscription.get(1))[1:] == ("task_completed", {"ids": [1]})
+
+        for i in range(3):
+            events.publish("task_completed", {"ids": [i]})
+        await asyncio.sleep(0)
+        assert (await subscription.get(1))[1:] == ("reset", {"reason": "overflow"})
+        assert await subscription.get(0.01) is None
+
+        events.unsubscribe(subscription)
+        assert not events.has_subscribers()
+
+    asyncio.run(scenario())
+
+
+def test_stream_starts_with_reset():
+    events = consume_stream(lambda: None, timeout=0.2)
+    assert events[0] == ("reset", {"reason": "connected"})
+    assert broker.subscriber_count == 0
+
+
+def test_stream_pushes_task_changes():
+    """作成・完了・取り消しの差分だけが配信される"""
+    state = {}
+
+    def actions():
+        item = create_item(date.today())
+        task = task_by_offset(item, 0)
+        state["item_id"], state["task_id"] = item["id"], task["id"]
+        assert client.post(f"/api/review-tasks/{task['id']}/complete").status_code == 200
+        assert client.post(f"/api/review-tasks/{task['id']}/uncomplete").status_code == 200
+
+    events = consume_stream(actions)
+    task_id = state["task_id"]
+    relevant = [
+        (event, data) for event, data in events
+        if event == "task_completed" and task_id in data["ids"]
+        or event == "task_ready" and any(t["id"] == task_id for t in data["tasks"])
+    ]
+    assert [event for event, _ in relevant] == ["task_ready", "task_completed", "task_ready"]
+
+    ready = next(t for t in relevant[0][1]["tasks"] if t["id"] == task_id)
+    # /today と同じ形の行が届く
+    today_row = next(t for t in client.get("/api/review-tasks/today").json() if t["id"] == task_id)
+    assert ready == today_row
+
+
+def test_stream_pushes_yearly_follow_up():
+    """1年後のタスクを完了すると次のタスクの作成が配信される"""
+    item = create_item(date.today() - timedelta(days=400))
+    yearly = task_by_offset(item, 365)
+    assert yearly["status"] == "Ready"
+
+    events = consume_stream(
+        lambda: client.post(f"/api/review-tasks/{yearly['id']}/complete").raise_for_status()
+    )
+
+    created = [
+        task for event, data in events if event == "yearly_task_created"
+        for task in data["tasks"] if task["learning_item_id"] == item["id"]
+    ]
+    assert len(created) == 1
+    assert created[0]["stage_offset_days"] == 730
+    assert created[0]["due_date"] == (date.today() + timedelta(days=330)).isoformat()
+    assert ("task_completed", {"ids": [yearly["id"]]}) in events
+
+
+def test_rollover_sends_reset():
+    def actions():
+        create_item(date.today())
+        run_rollover(today=date.today() + timedelta(days=1))
+        run_rollover()
+
+    events = consume_stream(actions)
+    assert ("reset", {"reason": "rollover"}) in events
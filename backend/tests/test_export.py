@@ -0,0 +1,146 @@
+import csv
+import gc
+import io
+import json
+import os
+import pytest
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.export import stream_export
+from app.main import app
+from app.migrations import run_migrations
+from app.scheduler import REVIEW_SCHEDULE
+
+client = TestClient(app)
+
+# 1M件の復習タスク（学習項目 111,112件 × 9ステージ）
+ITEM_COUNT = 111_112
+
+# エクスポート中に増えてよい RSS の上限
+RSS_CEILING_BYTES = 64 * 1024 * 1024
+
+
+def current_rss() -> int:
+    """現在の RSS（バイト）"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.fixture(scope="module")
+def large_session_factory(tmp_path_factory):
+    """1M件の復習タスクを持つファイルのデータベース"""
+    path = tmp_path_factory.mktemp("export") / "export.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    stages = " UNION ALL ".join(
+        f"SELECT '{name}' AS name, {offset} AS offset" for name, offset in REVIEW_SCHEDULE
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO sources (id, title, created_at, updated_at) "
+            "VALUES (1, 'Source', '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        )
+        conn.exec_driver_sql(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq "
+            f"WHERE n < {ITEM_COUNT}) "
+            "INSERT INTO learning_items "
+            "(id, source_id, title, content, start_date, created_at, updated_at) "
+            "SELECT n, 1, 'Item ' || n, 'Content, with \"quotes\"', '2024-01-01', "
+            "'2024-01-01 00:00:00', '2024-01-01 00:00:00' FROM seq"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO review_tasks "
+            "(learning_item_id, stage_name, stage_offset_days, due_date, status, created_at) "
+            "SELECT li.id, s.name, s.offset, date('2024-01-01', '+' || s.offset || ' days'), "
+            "'Pending', '2024-01-01 00:00:00' "
+            f"FROM learning_items li CROSS JOIN ({stages}) s"
+        )
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def assert_constant_memory(chunks) -> int:
+    """エクスポートを読み捨てながら RSS の増加が上限以下であることを確かめる"""
+    gc.collect()
+    baseline = current_rss()
+    peak = baseline
+    lines = 0
+    for i, chunk in enumerate(chunks):
+        lines += chunk.count(b"\n")
+        if i % 50 == 0:
+            peak = max(peak, current_rss())
+    assert peak - baseline < RSS_CEILING_BYTES, f"RSS grew by {(peak - baseline) >> 20} MiB"
+    return lines
+
+
+def test_ndjson_export_of_1m_tasks_uses_constant_memory(large_session_factory):
+    lines = assert_constant_memory(stream_export("ndjson", session_factory=large_session_factory))
+    assert lines == 1 + ITEM_COUNT + ITEM_COUNT * len(REVIEW_SCHEDULE)
+
+
+def test_csv_export_of_1m_tasks_uses_constant_memory(large_session_factory):
+    lines = assert_constant_memory(stream_export("csv", session_factory=large_session_factory))
+    assert lines == 1 + ITEM_COUNT * len(REVIEW_SCHEDULE)
+
+
+def create_item() -> dict:
+    source = client.post(
+        "/api/sources/", json={"title": "Export Source", "category": "書籍"}
+    ).json()
+    response = client.post(
+        "/api/learning-items/",
+        json={
+            "source_id": source["id"],
+            "title": "Export Item",
+            "content": "line 1\nline 2, \"quoted\"",
+            "start_date": date.today().isoformat()
+        }
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_ndjson_export_endpoint():
+    item = create_item()
+    response = client.get("/api/export?format=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    types = [record["type"] for record in records]
+    # 媒体 → 学習項目 → 復習タスクの順
+    assert types == sorted(types, key=["source", "learning_item", "review_task"].index)
+
+    exported_item = next(
+        r for r in records if r["type"] == "learning_item" and r["id"] == item["id"]
+    )
+    assert exported_item["content"] == "line 1\nline 2, \"quoted\""
+    assert exported_item["start_date"] == date.today().isoformat()
+    tasks = [r for r in records if r["type"] == "review_task" and r["learning_item_id"] == item["id"]]
+    assert {t["id"] for t in tasks} == {t["id"] for t in item["review_tasks"]}
+    assert any(r["type"] == "source" and r["id"] == item["source_id"] for r in records)
+
+
+def test_csv_export_endpoint():
+    item = create_item()
+    response = client.get("/api/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    item_rows = [row for row in rows if row["learning_item_id"] == str(item["id"])]
+    assert [row["stage_offset_days"] for row in item_rows] == \
+        [str(offset) for _, offset in REVIEW_SCHEDULE]
+    assert item_rows[0]["learning_item_content"] == "line 1\nline 2, \"quoted\""
+    assert item_rows[0]["source_category"] == "書籍"
+    assert item_rows[0]["completed_at"] == ""
+
+
+def test_export_rejects_unknown_format():
+    assert client.get("/api/export?format=xml").status_code == 422
@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app import config, crud, models
+from app.main import app
+
+client = TestClient(app)
+
+TODAY = date.today()
+
+
+def forecast(db, days: int) -> dict:
+    return {
+        (due_date - TODAY).days: count
+        for due_date, count in crud.get_review_forecast(db, days, today=TODAY)
+        if count
+    }
+
+
+def test_forecast_counts_pending_tasks_by_due_date(db, create_item):
+    """未完了のタスクを予定日ごとに数え、予定日が過ぎたものは今日に数える"""
+    create_item(TODAY)
+    create_item(TODAY - timedelta(days=2))
+
+    result = crud.get_review_forecast(db, 90, today=TODAY)
+    assert len(result) == 90
+    assert result[0][0] == TODAY
+    # 2件目の学習直後・1日後タスクは Ready（予定日超過）なので今日に数える
+    assert forecast(db, 90) == {0: 3, 1: 2, 3: 1, 5: 1, 7: 1, 12: 1, 14: 1, 28: 1, 30: 1, 88: 1}
+
+
+def test_forecast_excludes_completed_tasks(db, create_item):
+    """完了済みのタスクは数えない"""
+    item = create_item(TODAY)
+    crud.complete_review_task(db, item.review_tasks[0].id)
+    assert 0 not in forecast(db, 10)
+
+
+def test_forecast_projects_yearly_continuation(db, create_item):
+    """1年ごとのタスクは完了時に生成される次のタスクも数える"""
+    item = create_item(TODAY - timedelta(days=400))
+    yearly = next(task for task in item.review_tasks if task.stage_offset_days == 365)
+    # 1年後タスクは35日前に期限を迎えて Ready のまま
+    assert forecast(db, 365)[0] == 9
+    # 完了すると予定日の365日後（330日後）に2年後タスクが生成される
+    assert forecast(db, 365)[330] == 1
+    assert forecast(db, 731) == {0: 9, 330: 1, 695: 1}
+
+    crud.complete_review_task(db, yearly.id)
+    assert forecast(db, 731) == {0: 8, 330: 1, 695: 1}
+
+
+def test_forecast_matches_completion_of_overdue_yearly_task(db, create_item):
+    """1年以上過ぎた1年ごとのタスクの次のタスクは、完了時と同じく予定日の365日後で数える"""
+    item = create_item(TODAY - timedelta(days=740))
+    yearly = next(task for task in item.review_tasks if task.stage_offset_days == 365)
+    # 1年後タスクは375日前が期限。次の2年後タスク（10日前）は完了すればすぐ Ready になる
+    before = forecast(db, 400)
+    assert before == {0: 10, 355: 1}
+
+    crud.complete_review_task(db, yearly.id)
+    next_task = db.query(models.ReviewTask).filter_by(
+        learning_item_id=item.id, stage_offset_days=730
+    ).one()
+    assert next_task.due_date == TODAY - timedelta(days=10)
+    assert next_task.status == "Ready"
+    # 完了したタスクの分だけ減り、生成されたタスクは予測どおりの日に数えられる
+    assert forecast(db, 400) == {0: 9, 355: 1}
+
+
+def test_forecast_includes_lazy_stages(db, monkeypatch, create_item):
+    """遅延生成モードの未生成ステージも数える"""
+    create_item(TODAY)
+    eager = forecast(db, 400)
+    db.query(models.ReviewTask).delete()
+    db.query(models.LearningItem).delete()
+    db.commit()
+
+    monkeypatch.setattr(config, "REVIEW_TASK_STORAGE", "lazy")
+    create_item(TODAY)
+    assert forecast(db, 400) == eager
+    assert eager == {0: 1, 1: 1, 3: 1, 7: 1, 14: 1, 30: 1, 90: 1, 180: 1, 365: 1}
+
+
+def test_forecast_endpoint():
+    """GET /api/review-tasks/forecast"""
+    response = client.get("/api/review-tasks/forecast?days=30")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["days"]) == 30
+    assert data["days"][0]["due_date"] == TODAY.isoformat()
+    assert data["total"] == sum(day["count"] for day in data["days"])
+
+    assert client.get("/api/review-tasks/forecast?days=0").status_code == 422
+    assert client.get("/api/review-tasks/forecast?days=731").status_code == 422
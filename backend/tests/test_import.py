@@ -0,0 +1,281 @@
+import asyncio
+import gc
+import io
+import tempfile
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+import zipfile
+import pytest
+from datetime import date
+from pathlib import Path
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.api.imports import import_deck
+from app.database import SessionLocal
+from app.importer import html_to_text, import_notes, iter_apkg_notes, iter_csv_notes, stream_import
+from app.main import app
+from app.scheduler import REVIEW_SCHEDULE
+
+client = TestClient(app)
+
+# 大きなデッキのノート数
+LARGE_NOTE_COUNT = 100_000
+
+# インポート中に増えてよい RSS の上限
+RSS_CEILING_BYTES = 64 * 1024 * 1024
+
+
+def current_rss() -> int:
+    """現在の RSS（バイト）"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def write_apkg(path: Path, decks: dict, notes) -> Path:
+    """
+    旧形式（col.decks が JSON）のコレクションを持つ .apkg を作る
+
+    Args:
+        path: 作成するパッケージのパス
+        decks: デッキID → デッキ名
+        notes: (フィールドのリスト, デッキID) のイテレータ
+    """
+    collection_path = path.with_suffix(".anki2")
+    conn = sqlite3.connect(collection_path)
+    conn.executescript(
+        "CREATE TABLE col (id INTEGER PRIMARY KEY, decks TEXT NOT NULL);"
+        "CREATE TABLE notes (id INTEGER PRIMARY KEY, flds TEXT NOT NULL);"
+        "CREATE TABLE cards (id INTEGER PRIMARY KEY, nid INTEGER NOT NULL, "
+        "did INTEGER NOT NULL, ord INTEGER NOT NULL);"
+    )
+    conn.execute(
+        "INSERT INTO col (id, decks) VALUES (1, ?)",
+        (json.dumps({str(deck_id): {"id": deck_id, "name": name} for deck_id, name in decks.items()}),)
+    )
+    for note_id, (fields, deck_id) in enumerate(notes, start=1):
+        conn.execute("INSERT INTO notes (id, flds) VALUES (?, ?)", (note_id, "\x1f".join(fields)))
+        conn.execute(
+            "INSERT INTO cards (nid, did, ord) VALUES (?, ?, 0)", (note_id, deck_id)
+        )
+    conn.commit()
+    conn.close()
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        package.write(collection_path, "collection.anki2")
+        package.writestr("media", "{}")
+    collection_path.unlink()
+    return path
+
+
+def test_html_to_text():
+    assert html_to_text("<b>Tom &amp; Jerry</b><br>cat<div>mouse</div>") == "Tom & Jerry\ncat\nmouse"
+
+
+def test_iter_csv_notes_accepts_aliases():
+    file = io.StringIO(
+        "Front,Back,Deck,start_date\n"
+        "apple,りんご,Fruits,2024-01-02\n"
+        "dog,犬,,\n"
+    )
+    assert list(iter_csv_notes(file, "Default")) == [
+        ("Fruits", "apple", "りんご", date(2024, 1, 2)),
+        ("Default", "dog", "犬", None),
+    ]
+
+
+def test_iter_csv_notes_rejects_missing_title_and_bad_date():
+    with pytest.raises(ValueError):
+        list(iter_csv_notes(io.StringIO("content\nx\n"), "Default"))
+    with pytest.raises(ValueError, match="line 2"):
+        list(iter_csv_notes(io.StringIO("title,start_date\nx,2024/01/02\n"), "Default"))
+
+
+def test_iter_apkg_notes(tmp_path):
+    path = write_apkg(
+        tmp_path / "deck.apkg",
+        {1: "Default", 1700000000: "Languages::English"},
+        [(["<b>apple</b>", "りんご", ""], 1700000000), (["dog", "犬<br>いぬ"], 1)],
+    )
+    assert list(iter_apkg_notes(path)) == [
+        ("Languages::English", "apple", "りんご", None),
+        ("Default", "dog", "犬\nいぬ", None),
+    ]
+
+
+def test_import_notes_reuses_sources_and_skips_empty_titles(session_factory):
+    db = session_factory()
+    try:
+        notes = [
+            ("Deck A", "one", None, date(2024, 1, 1)),
+            ("Deck A", "", "no title", None),
+            ("Deck B", "two", "content", None),
+            ("Deck A", "three", None, None),
+        ]
+        progress = list(import_notes(db, iter(notes), chunk_size=2))
+        assert [p["done"] for p in progress] == [False, True]
+        assert progress[-1] == {
+            "processed": 4, "created": 3, "skipped": 1, "sources_created": 2, "done": True
+        }
+
+        # 2回目は既存の媒体を使う
+        progress = list(import_notes(db, iter(notes[:1])))
+        assert progress[-1]["sources_created"] == 0
+        assert db.query(models.Source).count() == 2
+        assert db.query(models.LearningItem).count() == 4
+        assert db.query(models.ReviewTask).count() == 4 * len(REVIEW_SCHEDULE)
+    finally:
+        db.close()
+
+
+def test_stream_import_reports_errors_and_removes_file(tmp_path, session_factory):
+    path = tmp_path / "broken.apkg"
+    path.write_bytes(b"not a zip file")
+    lines = [json.loads(line) for line in stream_import(path, "apkg", "Default", session_factory=session_factory)]
+    assert lines[-1]["done"] is True
+    assert "error" in lines[-1]
+    assert not path.exists()
+
+
+def test_stream_import_reports_database_errors(tmp_path):
+    path = tmp_path / "cards.csv"
+    path.write_text("title\nno tables\n")
+    # テーブルのないデータベース
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    try:
+        lines = [
+            json.loads(line) for line in stream_import(
+                path, "csv", "Default", session_factory=sessionmaker(bind=engine)
+            )
+        ]
+    finally:
+        engine.dispose()
+    assert lines[-1]["done"] is True
+    assert lines[-1]["error"].startswith("Database error: no such table")
+    assert not path.exists()
+
+
+def test_import_endpoint_removes_upload_without_streaming(tmp_path, monkeypatch):
+    """レスポンスを読まずに切断されても一時ファイルを削除する"""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    upload = UploadFile(io.BytesIO(b"title\nnever read\n"), filename="cards.csv")
+    response = asyncio.run(import_deck(upload, None, None, None))
+    assert len(list(tmp_path.glob("ars-import-*"))) == 1
+    asyncio.run(response.background())
+    assert list(tmp_path.glob("ars-import-*")) == []
+
+
+def test_import_endpoint_copies_upload_off_the_event_loop(tmp_path, monkeypatch):
+    """アップロードのコピーはイベントループのスレッドをブロックしない"""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    copy_threads = []
+    copyfileobj = shutil.copyfileobj
+
+    def record_thread(*args, **kwargs):
+        copy_threads.append(threading.get_ident())
+        return copyfileobj(*args, **kwargs)
+
+    monkeypatch.setattr(shutil, "copyfileobj", record_thread)
+    upload = UploadFile(io.BytesIO(b"title\ncopied\n"), filename="cards.csv")
+    response = asyncio.run(import_deck(upload, None, None, None))
+    copied = list(tmp_path.glob("ars-import-*"))
+    assert [path.read_bytes() for path in copied] == [b"title\ncopied\n"]
+    assert copy_threads and copy_threads[0] != threading.get_ident()
+    asyncio.run(response.background())
+
+
+def limit_sqlite_memory(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA cache_size=-2000")
+    cursor.execute("PRAGMA mmap_size=0")
+    cursor.close()
+
+
+def test_import_100k_note_deck_uses_bounded_memory(tmp_path, session_factory):
+    path = write_apkg(
+        tmp_path / "large.apkg",
+        {1: "Default", 2: "Large"},
+        (([f"Note {i}", f"Answer {i}"], 2) for i in range(LARGE_NOTE_COUNT))
+    )
+
+    # 計測するのはインポート処理のメモリなので、SQLite のページキャッシュと
+    # mmap（本番設定では数百 MiB まで RSS に載る）は小さく抑えておく
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "connect", limit_sqlite_memory)
+    engine.dispose()
+
+    gc.collect()
+    baseline = current_rss()
+    peak = baseline
+    started = time.perf_counter()
+    lines = []
+    for line in stream_import(path, "apkg", "Default", session_factory=session_factory):
+        lines.append(json.loads(line))
+        peak = max(peak, current_rss())
+    elapsed = time.perf_counter() - started
+
+    assert peak - baseline < RSS_CEILING_BYTES, f"RSS grew by {(peak - baseline) >> 20} MiB"
+    assert lines[-1] == {
+        "processed": LARGE_NOTE_COUNT, "created": LARGE_NOTE_COUNT,
+        "skipped": 0, "sources_created": 1, "done": True
+    }
+    # チャンクごとに進捗が届く
+    assert len(lines) >= LARGE_NOTE_COUNT // 1000
+    assert not path.exists()
+
+    db = session_factory()
+    try:
+        assert db.query(func.count(models.ReviewTask.id)).scalar() == \
+            LARGE_NOTE_COUNT * len(REVIEW_SCHEDULE)
+    finally:
+        db.close()
+    print(f"imported {LARGE_NOTE_COUNT} notes in {elapsed:.1f}s")
+
+
+def test_import_endpoint_csv():
+    source_title = f"Endpoint Import {uuid.uuid4()}"
+    body = "front,back\nimport endpoint,answer\n,skipped\n"
+    response = client.post(
+        "/api/import",
+        params={"source_title": source_title},
+        files={"file": ("cards.csv", body.encode(), "text/csv")},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    progress = [json.loads(line) for line in response.text.splitlines()]
+    assert progress[-1] == {
+        "processed": 2, "created": 1, "skipped": 1, "sources_created": 1, "done": True
+    }
+
+    db = SessionLocal()
+    try:
+        source = db.query(models.Source).filter(models.Source.title == source_title).one()
+        assert [item.title for item in source.learning_items] == ["import endpoint"]
+    finally:
+        db.close()
+
+
+def test_import_endpoint_apkg(tmp_path):
+    path = write_apkg(tmp_path / "upload.apkg", {5: "Uploaded Deck"}, [(["front", "back"], 5)])
+    response = client.post(
+        "/api/import", files={"file": ("upload.apkg", path.read_bytes(), "application/octet-stream")}
+    )
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[-1])["created"] == 1
+
+
+def test_import_endpoint_requires_known_format():
+    response = client.post("/api/import", files={"file": ("notes.txt", b"title\nx\n", "text/plain")})
+    assert response.status_code == 400
+    response = client.post(
+        "/api/import", params={"format": "csv"}, files={"file": ("notes.txt", b"title\nx\n", "text/plain")}
+    )
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[-1])["created"] == 1
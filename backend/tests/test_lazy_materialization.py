@@ -0,0 +1,103 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app import config, crud, models, schemas
+from app.main import app
+
+client = TestClient(app)
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def lazy_storage(monkeypatch):
+    monkeypatch.setattr(config, "REVIEW_TASK_STORAGE", "lazy")
+
+
+def schedule(db, item_id: int) -> list:
+    """学習項目詳細の復習タスクを (オフセット, 予定日, 状態, 保存済みか) で返す"""
+    item = schemas.LearningItemWithTasks.model_validate(crud.get_learning_item(db, item_id))
+    return [
+        (task.stage_offset_days, task.due_date, task.status, task.id is not None)
+        for task in item.review_tasks
+    ]
+
+
+def test_lazy_item_materializes_due_stages_and_next(db, lazy_storage, monkeypatch, create_item):
+    """遅延生成モードでは予定日が到来したステージと次の1件だけを保存する"""
+    monkeypatch.setattr(config, "REVIEW_TASK_STORAGE", "eager")
+    eager_id = create_item(TODAY - timedelta(days=5)).id
+    monkeypatch.setattr(config, "REVIEW_TASK_STORAGE", "lazy")
+    lazy_id = create_item(TODAY - timedelta(days=5)).id
+
+    stored = db.query(models.ReviewTask).filter(models.ReviewTask.learning_item_id == lazy_id).count()
+    # 0, 1, 3日後（Ready）と 7日後（Pending）
+    assert stored == 4
+
+    eager = [task[:3] for task in schedule(db, eager_id)]
+    lazy = schedule(db, lazy_id)
+    assert [task[:3] for task in lazy] == eager
+    assert [task[3] for task in lazy] == [True] * 4 + [False] * 5
+
+
+def test_rollover_materializes_next_stage(db, lazy_storage, create_item):
+    """日付切り替えで次のステージが実体化され、結果は全ステージ作成時と同じになる"""
+    item_id = create_item(TODAY).id
+    assert [task[:3] for task in schedule(db, item_id)][:3] == [
+        (0, TODAY, "Ready"),
+        (1, TODAY + timedelta(days=1), "Pending"),
+        (3, TODAY + timedelta(days=3), "Pending"),
+    ]
+
+    # 1日後：1日後タスクが Ready になり、3日後タスクが実体化される
+    assert crud.promote_due_review_tasks(db, today=TODAY + timedelta(days=1)) == 1
+    tasks = schedule(db, item_id)
+    assert tasks[1] == (1, TODAY + timedelta(days=1), "Ready", True)
+    assert tasks[2] == (3, TODAY + timedelta(days=3), "Pending", True)
+    assert tasks[3][3] is False
+
+    # 長期間空いた場合は到来済みのステージをまとめて Ready で実体化する
+    crud.promote_due_review_tasks(db, today=TODAY + timedelta(days=40))
+    tasks = schedule(db, item_id)
+    assert [task[2] for task in tasks] == ["Ready"] * 6 + ["Pending"] * 3
+    assert [task[3] for task in tasks] == [True] * 7 + [False] * 2
+
+    # 完了は全ステージ作成時と同じように扱える
+    ready_id = crud.get_learning_item(db, item_id).review_tasks[5].id
+    assert crud.complete_review_tasks(db, [(ready_id, None)]) == {ready_id: "completed"}
+
+
+def test_collapse_pending_review_tasks(db, create_item):
+    """既存の学習項目の Pending タスクを次の1件だけ残して削除する"""
+    item_id = create_item(TODAY - timedelta(days=10)).id
+    # 予定日前に完了したステージはそのまま残す
+    early = db.query(models.ReviewTask)\
+        .filter(models.ReviewTask.learning_item_id == item_id, models.ReviewTask.stage_offset_days == 30)\
+        .one()
+    crud.complete_review_tasks(db, [(early.id, None)])
+    before = [task[:3] for task in schedule(db, item_id)]
+
+    assert crud.collapse_pending_review_tasks(db, today=TODAY) == (1, 3)
+    # 2回目は何もしない
+    assert crud.collapse_pending_review_tasks(db, today=TODAY) == (0, 0)
+
+    item = crud.get_learning_item(db, item_id)
+    assert item.start_date == TODAY - timedelta(days=10)
+    assert item.materialized_through == 30
+    tasks = schedule(db, item_id)
+    assert [task[:3] for task in tasks] == before
+    assert [task[3] for task in tasks] == [True] * 6 + [False] * 3
+
+
+def test_lazy_item_detail_api(lazy_storage):
+    """学習項目詳細の未生成ステージは id が null の Pending タスクになる"""
+    source = client.post("/api/sources/", json={"title": "Lazy Source"}).json()
+    item = client.post(
+        "/api/learning-items/",
+        json={"source_id": source["id"], "title": "Lazy Item"}
+    ).json()
+
+    tasks = client.get(f"/api/learning-items/{item['id']}").json()["review_tasks"]
+    assert [task["stage_offset_days"] for task in tasks] == [0, 1, 3, 7, 14, 30, 90, 180, 365]
+    assert all(task["id"] is not None for task in tasks[:2])
+    assert all(task["id"] is None and task["status"] == "Pending" for task in tasks[2:])
@@ -0,0 +1,163 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app import config, crud, models, schemas
+from app.main import app
+from app.migrations import _migrate_next_review_columns
+from app.scheduler import get_scheduler
+
+client = TestClient(app)
+
+TODAY = date.today()
+
+
+def next_review(db, item_id: int) -> tuple:
+    db.expire_all()
+    item = db.get(models.LearningItem, item_id)
+    return item.next_due_date, item.next_stage_offset_days
+
+
+def task_id(item: models.LearningItem, offset_days: int) -> int:
+    return next(t.id for t in item.review_tasks if t.stage_offset_days == offset_days)
+
+
+def list_ids(db, **kwargs) -> list:
+    items, _, _ = crud.get_learning_items(db, **kwargs)
+    return [item.id for item in items]
+
+
+def test_next_review_follows_completion(db, create_item):
+    item = create_item(TODAY)
+    assert next_review(db, item.id) == (TODAY, 0)
+
+    crud.complete_review_task(db, task_id(item, 0))
+    assert next_review(db, item.id) == (TODAY + timedelta(days=1), 1)
+
+    crud.uncomplete_review_task(db, task_id(item, 0))
+    assert next_review(db, item.id) == (TODAY, 0)
+    crud.complete_review_tasks(db, [(task_id(item, 0), None)])
+    crud.uncomplete_review_tasks(db, [task_id(item, 0)])
+    assert next_review(db, item.id) == (TODAY, 0)
+
+
+def test_next_review_of_bulk_created_items(db):
+    item_ids = crud.bulk_create_learning_items(db, [
+        schemas.LearningItemCreate(source_id=1, title="Bulk", start_date=TODAY - timedelta(days=2)),
+        schemas.LearningItemCreate(source_id=1, title="Bulk", start_date=TODAY + timedelta(days=5)),
+    ])
+    assert next_review(db, item_ids[0]) == (TODAY - timedelta(days=2), 0)
+    assert next_review(db, item_ids[1]) == (TODAY + timedelta(days=5), 0)
+
+
+def test_next_review_uses_virtual_stage_in_lazy_mode(db, monkeypatch, create_item):
+    """遅延生成モードで実体化済みのタスクを先に完了すると、未生成の次のステージになる"""
+    monkeypatch.setattr(config, "REVIEW_TASK_STORAGE", "lazy")
+    item = create_item(TODAY)
+    assert item.materialized_through == 1
+
+    crud.complete_review_tasks(db, [(task_id(item, 0), None), (task_id(item, 1), None)])
+    assert next_review(db, item.id) == (TODAY + timedelta(days=3), 3)
+
+
+def test_next_review_follows_recompute(db, create_item):
+    item = create_item(TODAY - timedelta(days=1))
+    crud.complete_review_tasks(db, [(task_id(item, 0), None), (task_id(item, 1), None)])
+    assert next_review(db, item.id) == (TODAY + timedelta(days=2), 3)
+
+    db.query(models.LearningItem).update({"ease_factor": 5.0})
+    db.commit()
+    assert crud.recompute_due_dates(db, get_scheduler("sm2")) > 0
+    stage_3 = db.get(models.ReviewTask, task_id(item, 3))
+    assert stage_3.due_date > TODAY + timedelta(days=2)
+    assert next_review(db, item.id) == (stage_3.due_date, 3)
+
+
+def test_migration_backfills_next_review(db, create_item):
+    item = create_item(TODAY)
+    db.query(models.LearningItem).update({"next_due_date": None, "next_stage_offset_days": None})
+    db.commit()
+
+    _migrate_next_review_columns(db.connection())
+    db.commit()
+    assert next_review(db, item.id) == (TODAY, 0)
+
+
+def test_filters(db, create_item):
+    db.add(models.Source(id=2, title="Other"))
+    db.commit()
+    due_today = create_item(TODAY)
+    due_later = create_item(TODAY + timedelta(days=10))
+    other_source = create_item(TODAY, source_id=2)
+    crud.complete_review_task(db, task_id(due_today, 0))
+
+    assert list_ids(db, source_id=2) == [other_source.id]
+    assert set(list_ids(db, due_before=TODAY + timedelta(days=1))) == {due_today.id, other_source.id}
+    assert list_ids(db, stage=1) == [due_today.id]
+    # 学習直後のタスクは開始日が先でも Ready で作成される
+    assert set(list_ids(db, status="Ready")) == {due_later.id, other_source.id}
+    assert list_ids(db, status="Completed") == [due_today.id]
+    assert list_ids(db, source_id=1, stage=0) == [due_later.id]
+
+    _, total, _ = crud.get_learning_items(db, stage=0)
+    assert total == 2
+
+
+def test_sorts_page_with_keyset_cursor(db, create_item):
+    titles = ["delta", "alpha", "charlie", "bravo", "echo"]
+    items = [create_item(TODAY + timedelta(days=i % 3), title=title) for i, title in enumerate(titles)]
+    # 未完了の復習がない学習項目（next_due_date が NULL）は先頭になる
+    db.query(models.LearningItem).filter(models.LearningItem.id == items[4].id)\
+        .update({"next_due_date": None, "next_stage_offset_days": None})
+    db.commit()
+
+    expected = {
+        "title": [item.id for item in sorted(items, key=lambda item: item.title)],
+        "next_due": [items[4].id] + [item.id for item in sorted(
+            items[:4], key=lambda item: (item.start_date, item.id)
+        )],
+        "created": [item.id for item in reversed(items)],
+    }
+    for sort, ids in expected.items():
+        pages, cursor = [], None
+        while True:
+            rows, _, cursor = crud.get_learning_items(db, limit=2, cursor=cursor, sort=sort)
+            pages.extend(row.id for row in rows)
+            if cursor is None:
+                break
+        assert pages == ids, sort
+
+
+def test_rejects_unknown_sort_and_cursor(db):
+    with pytest.raises(ValueError):
+        crud.get_learning_items(db, sort="random")
+    with pytest.raises(ValueError):
+        crud.get_learning_items(db, sort="next_due", cursor="broken")
+
+
+def test_list_endpoint_filters_and_sorts():
+    source = client.post("/api/sources/", json={"title": "Filter Endpoint"}).json()
+    for days, title in [(3, "b"), (1, "a")]:
+        response = client.post("/api/learning-items/", json={
+            "source_id": source["id"], "title": title,
+            "start_date": (TODAY + timedelta(days=days)).isoformat()
+        })
+        assert response.status_code == 201
+
+    response = client.get(
+        "/api/learning-items/", params={"source_id": source["id"], "sort": "next_due", "stage": 0}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert [item["title"] for item in data["items"]] == ["a", "b"]
+    assert data["items"][0]["next_due_date"] == (TODAY + timedelta(days=1)).isoformat()
+    assert data["items"][0]["next_stage_offset_days"] == 0
+
+    response = client.get(
+        "/api/learning-items/",
+        params={"source_id": source["id"], "due_before": (TODAY + timedelta(days=2)).isoformat()}
+    )
+    assert [item["title"] for item in response.json()["items"]] == ["a"]
+
+    assert client.get("/api/learning-items/", params={"sort": "random"}).status_code == 422
+    assert client.get("/api/learning-items/", params={"status": "Done"}).status_code == 422
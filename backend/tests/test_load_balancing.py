@@ -0,0 +1,170 @@
+import pytest
+from collections import Counter
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app import config, crud, models, schemas
+from app.main import app
+from app.scheduler import balance_due_dates, generate_review_tasks, load_balance_tolerance
+
+client = TestClient(app)
+
+TODAY = date.today()
+TOLERANCE = 0.15
+
+
+def new_tasks(count: int, start_date: date) -> list:
+    return [task for i in range(count) for task in generate_review_tasks(i, start_date)]
+
+
+def assert_within_tolerance(tasks: list, start_date: date) -> None:
+    for task in tasks:
+        nominal = start_date + timedelta(days=task["stage_offset_days"])
+        window = load_balance_tolerance(task["stage_offset_days"], TOLERANCE)
+        assert abs((task["due_date"] - nominal).days) <= window
+
+
+def test_tolerance_is_proportional_to_offset():
+    """ずらせる日数はオフセット日数に比例し、直後のステージは動かさない"""
+    assert load_balance_tolerance(0, TOLERANCE) == 0
+    assert load_balance_tolerance(3, TOLERANCE) == 0
+    assert load_balance_tolerance(30, TOLERANCE) == 4
+    assert load_balance_tolerance(365, TOLERANCE) == 54
+
+
+def test_balance_respects_cap_and_tolerance():
+    """許容範囲に空きがあるステージは上限以下になり、許容範囲を超えてずれない"""
+    tasks = new_tasks(500, TODAY)
+    daily_load = {}
+    balance_due_dates(tasks, daily_load, 60, earliest=TODAY + timedelta(days=1), tolerance=TOLERANCE)
+
+    assert_within_tolerance(tasks, TODAY)
+    counts = Counter(task["due_date"] for task in tasks if task["status"] == "Pending")
+    assert counts == {day: count for day, count in daily_load.items() if count}
+    # 1日後・3日後は許容範囲が0日なのでそのまま
+    assert counts[TODAY + timedelta(days=1)] == 500
+    assert counts[TODAY + timedelta(days=3)] == 500
+    # 許容範囲に収まりきらない2週間後は、あふれた分だけ元の予定日に残す
+    assert counts[TODAY + timedelta(days=14)] == 500 - 4 * 60
+    for offset in (30, 90, 180, 365):
+        window = load_balance_tolerance(offset, TOLERANCE)
+        days = [TODAY + timedelta(days=offset + d) for d in range(-window, window + 1)]
+        assert all(counts[day] <= 60 for day in days)
+    # 学習直後のタスクは動かさない
+    assert all(task["due_date"] == TODAY for task in tasks if task["stage_offset_days"] == 0)
+
+
+def test_balance_keeps_stage_order():
+    """ずらした後もステージの予定日の順序は変わらない"""
+    tasks = new_tasks(1000, TODAY)
+    balance_due_dates(tasks, {}, 10, earliest=TODAY + timedelta(days=1), tolerance=TOLERANCE)
+
+    for i in range(0, len(tasks), 9):
+        due_dates = [task["due_date"] for task in tasks[i:i + 9]]
+        assert due_dates == sorted(due_dates)
+
+
+def test_balance_prefers_nominal_and_nearest_day():
+    """上限に空きがあれば元の予定日のまま、なければ最も近い空き日にずらす"""
+    nominal = TODAY + timedelta(days=30)
+    daily_load = {nominal: 5, nominal + timedelta(days=1): 5, nominal - timedelta(days=1): 4}
+    tasks = [dict(generate_review_tasks(1, TODAY)[5]), dict(generate_review_tasks(2, TODAY)[5])]
+
+    balance_due_dates(tasks, daily_load, 5, earliest=TODAY + timedelta(days=1), tolerance=TOLERANCE)
+
+    assert tasks[0]["due_date"] == nominal - timedelta(days=1)
+    assert tasks[1]["due_date"] == nominal + timedelta(days=2)
+    assert daily_load[nominal] == 5
+
+    tasks = [dict(generate_review_tasks(3, TODAY)[5])]
+    balance_due_dates(tasks, {}, 5, earliest=TODAY + timedelta(days=1), tolerance=TOLERANCE)
+    assert tasks[0]["due_date"] == nominal
+
+
+def test_balance_never_moves_before_earliest():
+    """割り当て可能な最初の日より前にはずらさない"""
+    tasks = new_tasks(100, TODAY - timedelta(days=20))
+    for task in tasks:
+        if task["due_date"] <= TODAY:
+            task["status"] = "Ready"
+    balance_due_dates(tasks, {}, 1, earliest=TODAY + timedelta(days=1), tolerance=TOLERANCE)
+
+    assert all(
+        task["due_date"] > TODAY for task in tasks if task["status"] == "Pending"
+    )
+
+
+def test_balance_rejects_non_positive_cap():
+    with pytest.raises(ValueError):
+        balance_due_dates(new_tasks(1, TODAY), {}, 0, earliest=TODAY)
+
+
+def test_bulk_create_balances_against_existing_load(db):
+    """一括作成は既存のタスクも含めた日ごとの件数で予定日をずらす"""
+    items = [
+        schemas.LearningItemCreate(source_id=1, title=f"Item {i}", start_date=TODAY)
+        for i in range(300)
+    ]
+    crud.bulk_create_learning_items(db, items[:100], daily_cap=0)
+    crud.bulk_create_learning_items(db, items[100:], daily_cap=120)
+
+    counts = dict(crud.get_review_forecast(db, 450, today=TODAY))
+    # 既存の100件と合わせても1ヶ月後以降のステージは上限以下
+    for offset in (30, 90, 180, 365):
+        assert counts[TODAY + timedelta(days=offset)] <= 120
+    assert sum(counts.values()) == 300 * 9
+
+    rows = db.query(models.ReviewTask.stage_offset_days, models.ReviewTask.due_date).all()
+    assert_within_tolerance(
+        [{"stage_offset_days": offset, "due_date": due_date} for offset, due_date in rows],
+        TODAY
+    )
+
+
+def test_lazy_storage_keeps_balanced_later_stages(db, monkeypatch):
+    """遅延生成モードでも、予定日をずらした後のステージ（2週間後以降）を保存して上限を守る"""
+    monkeypatch.setattr(config, "REVIEW_TASK_STORAGE", "lazy")
+    items = [
+        schemas.LearningItemCreate(source_id=1, title=f"Item {i}", start_date=TODAY)
+        for i in range(300)
+    ]
+    crud.bulk_create_learning_items(db, items, daily_cap=120)
+
+    counts = dict(crud.get_review_forecast(db, 450, today=TODAY))
+    for offset in (14, 30, 90, 180, 365):
+        assert counts[TODAY + timedelta(days=offset)] <= 120
+    assert db.query(models.ReviewTask).count() == 300 * 9
+    assert db.query(models.LearningItem).filter(models.LearningItem.materialized_through.isnot(None)).count() == 0
+
+    # ずらした予定日は遅延生成モードへの変換でも失われない
+    crud.collapse_pending_review_tasks(db, today=TODAY)
+    assert dict(crud.get_review_forecast(db, 450, today=TODAY)) == counts
+
+
+def test_create_learning_item_balances_single_item(db):
+    """1件の作成でも上限に達した日を避ける"""
+    for _ in range(3):
+        crud.create_learning_item(
+            db, schemas.LearningItemCreate(source_id=1, title="Item", start_date=TODAY), daily_cap=3
+        )
+    item = crud.create_learning_item(
+        db, schemas.LearningItemCreate(source_id=1, title="Item", start_date=TODAY), daily_cap=3
+    )
+    due_dates = {task.stage_offset_days: task.due_date for task in item.review_tasks}
+    assert due_dates[1] == TODAY + timedelta(days=1)
+    assert due_dates[30] != TODAY + timedelta(days=30)
+
+
+def test_create_endpoint_accepts_daily_cap():
+    source = client.post("/api/sources/", json={"title": "Load Balancing Source"}).json()
+    response = client.post(
+        "/api/learning-items/?daily_cap=1000000",
+        json={"source_id": source["id"], "title": "Balanced Item"}
+    )
+    assert response.status_code == 201
+    assert len(response.json()["review_tasks"]) == 9
+
+    response = client.post(
+        "/api/learning-items/?daily_cap=-1",
+        json={"source_id": source["id"], "title": "Balanced Item"}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,95 @@
+import re
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from app.main import app
+from app.metrics import Histogram, MetricsRegistry, RequestMetrics, REGISTRY, _current, instrument_engine
+
+client = TestClient(app)
+
+SERVER_TIMING_PATTERN = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries, (\d+) rows", serialize;dur=([\d.]+), total;dur=[\d.]+'
+)
+
+
+def create_item() -> dict:
+    source = client.post("/api/sources/", json={"title": "Metrics Source"}).json()
+    response = client.post(
+        "/api/learning-items/", json={"source_id": source["id"], "title": "Metrics Item"}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def server_timing(response) -> tuple[int, int, float]:
+    match = SERVER_TIMING_PATTERN.fullmatch(response.headers["server-timing"])
+    assert match, response.headers["server-timing"]
+    return int(match[1]), int(match[2]), float(match[3])
+
+
+def test_server_timing_reports_queries_rows_and_serialization():
+    item = create_item()
+    queries, rows, serialize_ms = server_timing(client.get(f"/api/learning-items/{item['id']}"))
+    assert queries >= 1
+    assert rows >= 1 + len(item["review_tasks"])  # 学習項目と復習タスク（joinedload）
+    assert serialize_ms > 0
+
+    queries, rows, _ = server_timing(client.get("/health"))
+    assert (queries, rows) == (0, 0)
+
+
+def test_failed_statement_does_not_skew_later_timings():
+    """失敗した文の開始時刻が接続に残らない"""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+            time.sleep(0.05)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        _current.reset(token)
+        engine.dispose()
+    assert metrics.queries == 1
+    assert metrics.query_seconds < 0.05
+
+
+def test_metrics_endpoint_aggregates_by_route_template():
+    REGISTRY.reset()
+    first, second = create_item(), create_item()
+    client.get(f"/api/learning-items/{first['id']}")
+    client.get(f"/api/learning-items/{second['id']}")
+    client.get("/api/no-such-route")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'ars_http_requests_total{method="GET",route="/api/learning-items/{item_id}",status="200"} 2' in body
+    assert 'ars_http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+    assert 'ars_http_request_duration_seconds_count{method="GET",route="/api/learning-items/{item_id}"} 2' \
+        in body
+    assert 'ars_http_request_duration_seconds_bucket{method="GET",route="/api/learning-items/{item_id}",' \
+        'le="+Inf"} 2' in body
+    assert re.search(r'ars_db_rows_total\{method="GET",route="/api/learning-items/\{item_id\}"\} [1-9]', body)
+    assert "# TYPE ars_db_queries_per_request histogram" in body
+    assert "# TYPE ars_serialization_seconds_total counter" in body
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+    assert list(histogram.cumulative()) == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert histogram.sum == 5.65
+
+
+def test_registry_escapes_label_values():
+    registry = MetricsRegistry()
+    registry.observe("GET", '/a"b\\c', 200, 0.01, RequestMetrics())
+    assert 'route="/a\\"b\\\\c"' in registry.render()
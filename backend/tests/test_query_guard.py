@@ -0,0 +1,113 @@
+import logging
+from datetime import date, timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app import rollover
+from app.database import SessionLocal
+from app.main import app
+from app.metrics import MetricsMiddleware, RequestMetrics
+from app.query_guard import QueryBudgetExceeded, QueryGuard, query_budget, statement_shape
+
+client = TestClient(app)
+
+
+def guarded_app(guard: QueryGuard) -> FastAPI:
+    """1行ずつ SELECT する（N+1 の）ルートを持つアプリケーション"""
+    guarded = FastAPI()
+    guarded.add_middleware(MetricsMiddleware, registry=None, guard=guard)
+
+    @guarded.get("/rows")
+    @query_budget(10)
+    def rows(count: int):
+        db = SessionLocal()
+        try:
+            return [db.execute(text("SELECT :n"), {"n": n}).scalar() for n in range(count)]
+        finally:
+            db.close()
+
+    return guarded
+
+
+def test_statement_shape_ignores_in_list_length_and_whitespace():
+    assert statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?, ?)") == \
+        statement_shape("SELECT * FROM t WHERE id IN (?)") == \
+        "SELECT * FROM t WHERE id IN (?...)"
+
+
+def test_violations():
+    guard = QueryGuard("raise", default_budget=3, max_repeats=2)
+
+    @query_budget(5)
+    def budgeted():
+        pass
+
+    metrics = RequestMetrics(track_statements=True)
+    metrics.queries = 4
+    metrics.statements = {"SELECT 1 WHERE id IN (?)": 1, "SELECT 1 WHERE id IN (?, ?)": 2}
+    problems = guard.violations(None, metrics)
+    assert problems[0] == "4 queries exceed the budget of 3"
+    assert problems[1].startswith("statement repeated 3 times")
+    assert guard.violations(budgeted, metrics) == problems[1:]
+    assert guard.violations(query_budget(None)(lambda: None), metrics) == []
+
+
+def test_raise_mode_fails_n_plus_one_request():
+    guarded = TestClient(guarded_app(QueryGuard("raise", default_budget=10, max_repeats=3)))
+    assert guarded.get("/rows?count=3").json() == [0, 1, 2]
+    with pytest.raises(QueryBudgetExceeded, match="statement repeated 4 times: SELECT"):
+        guarded.get("/rows?count=4")
+
+
+def test_log_mode_warns(caplog):
+    guarded = TestClient(guarded_app(QueryGuard("log", default_budget=10, max_repeats=100)))
+    with caplog.at_level(logging.WARNING, logger="app.query_guard"):
+        assert guarded.get("/rows?count=11").status_code == 200
+    assert "GET /rows: 11 queries exceed the budget of 10" in caplog.text
+
+
+def test_off_mode_does_not_track_statements():
+    guarded = TestClient(guarded_app(QueryGuard("off", default_budget=0, max_repeats=0)))
+    assert guarded.get("/rows?count=5").status_code == 200
+
+
+def test_routes_stay_within_query_budgets(query_guard, monkeypatch):
+    """主なルートを raise モードで一通り呼び出す"""
+    # 日付切り替えジョブは1日1回だけ実行されるため、実行済みとして予算から除く
+    monkeypatch.setattr(rollover, "_last_rollover_date", date.today())
+    source = client.post("/api/sources/", json={"title": "Guard Source"}).json()
+    start_date = (date.today() - timedelta(days=40)).isoformat()
+    items = [
+        client.post("/api/learning-items/", json={
+            "source_id": source["id"], "title": f"Guard {i}", "start_date": start_date
+        }).json()
+        for i in range(3)
+    ]
+    bulk = [{"source_id": source["id"], "title": f"Bulk {i}"} for i in range(20)]
+    assert client.post("/api/learning-items/bulk", json=bulk).status_code == 200
+
+    assert client.get("/api/sources/").status_code == 200
+    assert client.get(f"/api/sources/{source['id']}").status_code == 200
+    assert client.put(f"/api/sources/{source['id']}", json={"title": "Guard Renamed"}).status_code == 200
+    assert client.get("/api/learning-items/?status=Ready&sort=next_due").status_code == 200
+    assert client.get("/api/learning-items/search?q=guard").status_code == 200
+    assert client.get(f"/api/learning-items/{items[0]['id']}").status_code == 200
+    assert client.put(f"/api/learning-items/{items[0]['id']}", json={"title": "Guard"}).status_code == 200
+    assert client.get("/api/review-tasks/today").status_code == 200
+    assert client.get("/api/review-tasks/forecast").status_code == 200
+
+    ready = [t["id"] for item in items for t in item["review_tasks"] if t["status"] == "Ready"]
+    assert len(ready) > 6
+    assert client.get(f"/api/review-tasks/{ready[0]}").status_code == 200
+    assert client.post(f"/api/review-tasks/{ready[0]}/complete").status_code == 200
+    assert client.post(f"/api/review-tasks/{ready[0]}/uncomplete").status_code == 200
+    batch = {"items": [{"task_id": task_id} for task_id in ready[1:]]}
+    assert client.post("/api/review-tasks/complete-batch", json=batch).status_code == 200
+    assert client.post(
+        "/api/review-tasks/uncomplete-batch", json={"task_ids": ready[1:]}
+    ).status_code == 200
+
+    assert client.delete(f"/api/learning-items/{items[0]['id']}").status_code == 204
+    # 学習項目・復習タスクは外部キーのカスケードで削除されるため件数に比例しない
+    assert client.delete(f"/api/sources/{source['id']}").status_code == 204
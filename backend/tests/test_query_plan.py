@@ -0,0 +1,202 @@
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import crud, models
+from app.database import Base
+from app.migrations import _migrate_next_review_columns, run_migrations
+from app.scheduler import REVIEW_SCHEDULE
+
+# 1M件の復習タスク（学習項目 111,112件 × 9ステージ）
+ITEM_COUNT = 111_112
+
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    """大量データを投入したインメモリデータベース"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    stages = " UNION ALL ".join(
+        f"SELECT '{name}' AS name, {offset} AS offset" for name, offset in REVIEW_SCHEDULE
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO sources (id, title, created_at, updated_at) "
+            "VALUES (1, 'Source', '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        )
+        conn.exec_driver_sql(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq "
+            f"WHERE n < {ITEM_COUNT}) "
+            "INSERT INTO learning_items (id, source_id, title, content, created_at, updated_at) "
+            "SELECT n, 1, 'Item ' || n, 'Content', '2024-01-01 00:00:00', '2024-01-01 00:00:00' "
+            "FROM seq"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO review_tasks "
+            "(learning_item_id, stage_name, stage_offset_days, due_date, status, created_at) "
+            "SELECT li.id, s.name, s.offset, "
+            "date('2024-01-01', '+' || (li.id % 730 + s.offset) || ' days'), "
+            "CASE WHEN li.id % 730 + s.offset < 300 THEN 'Completed' "
+            "WHEN li.id % 730 + s.offset < 310 THEN 'Ready' ELSE 'Pending' END, "
+            "'2024-01-01 00:00:00' "
+            f"FROM learning_items li CROSS JOIN ({stages}) s"
+        )
+        # 次の復習の予定日・ステージを復習タスクから埋める
+        _migrate_next_review_columns(conn)
+        conn.exec_driver_sql("ANALYZE")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def plan_db(plan_engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=plan_engine)()
+    yield session
+    session.rollback()
+    session.close()
+
+
+def capture_selects(engine, func):
+    """func の実行中に発行された SELECT 文とパラメータを記録する"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def query_plan(engine, statement, parameters) -> str:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def assert_plans(engine, statements, index_name):
+    assert statements
+    plans = [query_plan(engine, s, p) for s, p in statements]
+    for plan in plans:
+        assert "TEMP B-TREE" not in plan, plan
+    assert any(index_name in plan for plan in plans), plans
+
+
+def test_review_task_table_count(plan_engine):
+    with plan_engine.connect() as conn:
+        count = conn.exec_driver_sql("SELECT count(*) FROM review_tasks").scalar()
+    assert count >= 1_000_000
+
+
+def test_redundant_indexes_are_dropped(plan_engine):
+    index_names = {index["name"] for index in inspect(plan_engine).get_indexes("review_tasks")}
+    assert "idx_status_due_date" in index_names
+    assert "idx_learning_item_id_stage_offset_days" in index_names
+    assert not index_names & {"idx_learning_item_id", "idx_due_date", "idx_status"}
+
+
+def test_today_query_uses_composite_index(plan_engine, plan_db):
+    """今日のタスク取得は (status, due_date) インデックスでソートなしに処理される"""
+    statements = capture_selects(plan_engine, lambda: crud.get_today_review_tasks(plan_db))
+    assert_plans(plan_engine, statements, "idx_status_due_date")
+
+
+def test_learning_item_detail_uses_composite_index(plan_engine, plan_db):
+    """学習項目詳細のタスク取得は (learning_item_id, stage_offset_days) インデックスを使う"""
+    statements = capture_selects(plan_engine, lambda: crud.get_learning_item(plan_db, 12345))
+    assert_plans(plan_engine, statements, "idx_learning_item_id_stage_offset_days")
+
+
+
+def test_learning_item_version_uses_composite_index(plan_engine, plan_db):
+    """学習項目詳細の ETag 用の参照はインデックスだけで処理される"""
+    statements = capture_selects(plan_engine, lambda: crud.get_learning_item_version(plan_db, 12345))
+    assert_plans(plan_engine, statements, "idx_learning_item_id_stage_offset_days")
+
+def test_yearly_continuation_lookup_uses_composite_index(plan_engine, plan_db):
+    """1年ごとの継続タスクの重複チェックは複合インデックスで処理される"""
+    yearly_task = plan_db.query(models.ReviewTask)\
+        .filter(
+            models.ReviewTask.learning_item_id == 12345,
+            models.ReviewTask.stage_offset_days == 365
+        )\
+        .one()
+
+    statements = capture_selects(
+        plan_engine,
+        lambda: crud.complete_review_tasks(plan_db, [(yearly_task.id, None)])
+    )
+    assert_plans(plan_engine, statements, "idx_learning_item_id_stage_offset_days")
+
+
+def test_forecast_uses_covering_index(plan_engine, plan_db):
+    """予測の集計はインデックスだけでソートなしに処理される"""
+    statements = capture_selects(
+        plan_engine, lambda: crud.get_review_forecast(plan_db, 400, today=date(2024, 10, 1))
+    )
+    assert_plans(plan_engine, statements, "COVERING INDEX idx_status_due_date")
+    assert_plans(plan_engine, statements, "idx_review_tasks_yearly_status_due_date")
+    assert_plans(plan_engine, statements, "idx_learning_items_start_date_materialized")
+
+
+def test_learning_item_cursor_page_uses_keyset_index(plan_engine, plan_db):
+    """カーソル指定の一覧取得は (created_at, id) インデックスでソートなしに処理される"""
+    _, _, next_cursor = crud.get_learning_items(plan_db, limit=50, include_total=False)
+
+    statements = capture_selects(
+        plan_engine,
+        lambda: crud.get_learning_items(plan_db, limit=50, cursor=next_cursor, include_total=False)
+    )
+    assert_plans(plan_engine, statements, "idx_learning_items_created_at_id")
+
+
+@pytest.mark.parametrize("filters, index_name", [
+    ({"sort": "next_due"}, "idx_learning_items_next_due_date_id"),
+    ({"sort": "title"}, "idx_learning_items_title_id"),
+    ({"source_id": 1}, "idx_learning_items_source_id_created_at_id"),
+    ({"stage": 90, "sort": "next_due"}, "idx_learning_items_next_stage_next_due_date_id"),
+    ({"due_before": date(2024, 11, 1), "sort": "next_due"}, "idx_learning_items_next_due_date_id"),
+])
+def test_filtered_learning_item_page_uses_index(plan_engine, plan_db, filters, index_name):
+    """絞り込み・並べ替えた一覧のカーソル指定の取得はインデックスでソートなしに処理される"""
+    _, _, next_cursor = crud.get_learning_items(plan_db, limit=50, include_total=False, **filters)
+    assert next_cursor is not None
+
+    statements = capture_selects(
+        plan_engine,
+        lambda: crud.get_learning_items(
+            plan_db, limit=50, cursor=next_cursor, include_total=False, **filters
+        )
+    )
+    assert_plans(plan_engine, statements, index_name)
+
+
+def test_migration_replaces_legacy_indexes():
+    """旧インデックスを持つ既存データベースのマイグレーション"""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX idx_status_due_date")
+        conn.exec_driver_sql("DROP INDEX idx_learning_item_id_stage_offset_days")
+        conn.exec_driver_sql("CREATE INDEX idx_learning_item_id ON review_tasks (learning_item_id)")
+        conn.exec_driver_sql("CREATE INDEX idx_due_date ON review_tasks (due_date)")
+        conn.exec_driver_sql("CREATE INDEX idx_status ON review_tasks (status)")
+
+    assert run_migrations(engine) >= 1
+    # 2回目は何もしない
+    assert run_migrations(engine) >= 1
+
+    index_names = {index["name"] for index in inspect(engine).get_indexes("review_tasks")}
+    assert {"idx_status_due_date", "idx_learning_item_id_stage_offset_days"} <= index_names
+    assert not index_names & {"idx_learning_item_id", "idx_due_date", "idx_status"}
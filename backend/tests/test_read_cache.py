@@ -0,0 +1,220 @@
+import pytest
+import threading
+from fastapi.testclient import TestClient
+from app import crud, schemas
+from app.main import app
+from app.read_cache import LRUCache, learning_item_cache, source_cache
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    source_cache.clear()
+    learning_item_cache.clear()
+    yield
+    source_cache.clear()
+    learning_item_cache.clear()
+
+
+# ============================================================================
+# LRUCache
+# ============================================================================
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache("test", max_entries=2, ttl_seconds=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1, 1)
+
+
+def test_ttl_expires_entries():
+    clock = FakeClock()
+    cache = LRUCache("test", max_entries=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidate_and_disabled_cache():
+    cache = LRUCache("test", max_entries=10, ttl_seconds=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a", "missing")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.get("b") is None
+    assert cache.stats()["invalidations"] == 2
+
+    disabled = LRUCache("test", max_entries=0, ttl_seconds=0)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
+
+
+# ============================================================================
+# Write-through invalidation
+# ============================================================================
+
+def test_detail_is_served_from_cache(db, create_item):
+    item = create_item(title="v0")
+    first = crud.get_learning_item_detail(db, item.id)
+    hits = learning_item_cache.hits
+
+    assert crud.get_learning_item_detail(db, item.id) is first
+    assert learning_item_cache.hits == hits + 1
+    assert crud.get_source_detail(db, item.source_id) is crud.get_source_detail(db, item.source_id)
+
+
+def test_writes_invalidate_detail(db, create_item):
+    item = create_item(title="v0")
+    source_id = item.source_id
+    task_id = next(task.id for task in item.review_tasks if task.stage_offset_days == 0)
+    crud.get_learning_item_detail(db, item.id)
+    crud.get_source_detail(db, source_id)
+
+    crud.update_learning_item(db, item.id, schemas.LearningItemUpdate(title="v1"))
+    assert crud.get_learning_item_detail(db, item.id).title == "v1"
+    assert crud.get_source_detail(db, source_id).learning_items[0].title == "v1"
+
+    crud.complete_review_task(db, task_id)
+    detail = crud.get_learning_item_detail(db, item.id)
+    assert next(t for t in detail.review_tasks if t.id == task_id).status == "Completed"
+
+    crud.uncomplete_review_task(db, task_id)
+    detail = crud.get_learning_item_detail(db, item.id)
+    assert next(t for t in detail.review_tasks if t.id == task_id).status == "Ready"
+
+    crud.update_source(db, source_id, schemas.SourceUpdate(title="Renamed"))
+    assert crud.get_source_detail(db, source_id).title == "Renamed"
+
+    crud.create_learning_item(db, schemas.LearningItemCreate(source_id=source_id, title="v2"))
+    assert len(crud.get_source_detail(db, source_id).learning_items) == 2
+
+    crud.delete_learning_item(db, item.id)
+    assert crud.get_learning_item_detail(db, item.id) is None
+    assert len(crud.get_source_detail(db, source_id).learning_items) == 1
+
+    crud.delete_source(db, source_id)
+    assert crud.get_source_detail(db, source_id) is None
+
+
+def test_stale_entry_from_other_worker_is_not_served(db, create_item):
+    """他のワーカーの書き込みはキャッシュを破棄しなくても変更カウンタで検出する"""
+    item = create_item(title="v0")
+    stale = crud.get_learning_item_detail(db, item.id)
+    version = crud.get_learning_item_version(db, item.id)
+
+    crud.update_learning_item(db, item.id, schemas.LearningItemUpdate(title="v1"))
+    # 別のプロセスのキャッシュには古い内容が残っている
+    learning_item_cache.set(item.id, (tuple(version), stale))
+
+    assert crud.get_learning_item_detail(db, item.id).title == "v1"
+
+
+def test_rollover_invalidates_item_detail(db, create_item):
+    item = create_item(title="v0")
+    crud.get_learning_item_detail(db, item.id)
+    crud.promote_due_review_tasks(db, today=item.start_date.replace(year=item.start_date.year + 2))
+
+    detail = crud.get_learning_item_detail(db, item.id)
+    assert all(task.status == "Ready" for task in detail.review_tasks if task.stage_offset_days > 0)
+
+
+# ============================================================================
+# Concurrency
+# ============================================================================
+
+def test_concurrent_reads_never_see_older_writes(session_factory, create_item):
+    """並行して読み書きしても、読み始める前にコミットされた書き込みより古い内容は返さない"""
+    item = create_item(title="v0")
+    item_id, source_id = item.id, item.source_id
+    task_id = next(task.id for task in item.review_tasks if task.stage_offset_days == 0)
+
+    writes = 60
+    state = {"title": 0, "source": 0, "toggles": 0, "toggling": 0}
+    done = threading.Event()
+    errors = []
+
+    def update_titles():
+        with session_factory() as db:
+            for n in range(1, writes + 1):
+                crud.update_learning_item(db, item_id, schemas.LearningItemUpdate(title=f"v{n}"))
+                state["title"] = n
+
+    def rename_source():
+        with session_factory() as db:
+            for n in range(1, writes + 1):
+                crud.update_source(db, source_id, schemas.SourceUpdate(title=f"s{n}"))
+                state["source"] = n
+
+    def toggle_task():
+        with session_factory() as db:
+            for n in range(1, writes + 1):
+                state["toggling"] = n
+                if n % 2:
+                    crud.complete_review_task(db, task_id)
+                else:
+                    crud.uncomplete_review_task(db, task_id)
+                state["toggles"] = n
+
+    def read():
+        while not done.is_set():
+            before = dict(state)
+            with session_factory() as db:
+                item = crud.get_learning_item_detail(db, item_id)
+                source = crud.get_source_detail(db, source_id)
+            after = dict(state)
+            if int(item.title[1:]) < before["title"]:
+                errors.append(("item", item.title, before["title"]))
+            if int(source.title[1:]) < before["source"]:
+                errors.append(("source", source.title, before["source"]))
+            status = next(t for t in item.review_tasks if t.id == task_id).status
+            # 読み取り中に完了・取り消しが始まっていなければ状態が確定している
+            if before["toggles"] == after["toggling"]:
+                expected = "Completed" if before["toggles"] % 2 else "Ready"
+                if status != expected:
+                    errors.append(("task", status, before["toggles"]))
+
+    with session_factory() as db:
+        crud.update_source(db, source_id, schemas.SourceUpdate(title="s0"))
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    writers = [threading.Thread(target=f) for f in (update_titles, rename_source, toggle_task)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    with session_factory() as db:
+        assert crud.get_learning_item_detail(db, item_id).title == f"v{writes}"
+        assert crud.get_source_detail(db, source_id).title == f"s{writes}"
+    assert learning_item_cache.hits > 0
+
+
+def test_cache_stats_endpoint():
+    response = client.get("/api/cache/stats")
+    assert response.status_code == 200
+    assert {stats["name"] for stats in response.json()} == {"sources", "learning_items"}
+    assert {"hits", "misses", "evictions"} <= set(response.json()[0])
@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from app.main import app
+from app.database import engine
+from app.rollover import run_rollover, seconds_until_next_midnight
+
+client = TestClient(app)
+
+
+def create_item(start_date: date) -> dict:
+    """テスト用の媒体と学習項目を作成する"""
+    source = client.post("/api/sources/", json={"title": "Rollover Source"}).json()
+    response = client.post(
+        "/api/learning-items/",
+        json={
+            "source_id": source["id"],
+            "title": "Rollover Item",
+            "start_date": start_date.isoformat()
+        }
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def task_by_offset(item: dict, offset_days: int) -> dict:
+    return next(t for t in item["review_tasks"] if t["stage_offset_days"] == offset_days)
+
+
+def test_rollover_promotes_due_pending_tasks():
+    """日付切り替えで予定日が到来した Pending タスクが Ready になる"""
+    today = date.today()
+    item = create_item(today)
+    assert task_by_offset(item, 1)["status"] == "Pending"
+
+    run_rollover(today=today + timedelta(days=1))
+
+    item = client.get(f"/api/learning-items/{item['id']}").json()
+    assert task_by_offset(item, 1)["status"] == "Ready"
+    assert task_by_offset(item, 3)["status"] == "Pending"
+
+    # 今日の日付で再度実行しておく（他のテストへの影響を避ける）
+    run_rollover()
+
+
+def test_past_start_date_tasks_are_ready_on_creation():
+    """過去の開始日で作成したタスクは日付切り替えを待たずに Ready になる"""
+    item = create_item(date.today() - timedelta(days=5))
+
+    assert task_by_offset(item, 0)["status"] == "Ready"
+    assert task_by_offset(item, 1)["status"] == "Ready"
+    assert task_by_offset(item, 3)["status"] == "Ready"
+    assert task_by_offset(item, 7)["status"] == "Pending"
+
+    today_ids = {t["id"] for t in client.get("/api/review-tasks/today").json()}
+    assert task_by_offset(item, 3)["id"] in today_ids
+
+
+def test_today_endpoint_is_read_only():
+    """日付切り替え済みなら /today は書き込みを行わない"""
+    run_rollover()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/api/review-tasks/today")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert statements
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+
+
+def test_seconds_until_next_midnight():
+    """次の0時までの秒数の計算"""
+    assert seconds_until_next_midnight(datetime(2024, 1, 1, 23, 0, 0)) == 3600
+    assert seconds_until_next_midnight(datetime(2024, 1, 1, 0, 0, 0)) == 86400
@@ -1,6 +1,7 @@
 import pytest
+import numpy as np
 from datetime import date, timedelta
-from app.scheduler import generate_review_tasks, generate_next_yearly_task
+from app.scheduler import generate_review_tasks, generate_next_yearly_task, get_scheduler
 
 
 def test_generate_review_tasks():
@@ -113,3 +114,40 @@ def test_due_dates_are_in_order():
 
     for i in range(len(tasks) - 1):
         assert tasks[i]["due_date"] < tasks[i + 1]["due_date"]
+
+
+def test_fixed_scheduler_ignores_grades():
+    """固定スケジュールは評価に関わらず開始日 + オフセット日数になる"""
+    scheduler = get_scheduler("fixed")
+    ease = np.array([2.5, 2.5])
+    assert np.array_equal(scheduler.update_ease(ease, np.array([0.0, 5.0])), ease)
+
+    due = scheduler.due_dates(
+        np.array(["2024-01-01", "2024-01-04"], dtype="datetime64[D]"),
+        np.array([0, 3]),
+        np.array([7, 7]),
+        np.array([1.3, 3.0])
+    )
+    assert due.tolist() == [date(2024, 1, 8), date(2024, 1, 8)]
+
+
+def test_sm2_scheduler():
+    """SM-2 の易しさ係数の更新と間隔の伸縮"""
+    scheduler = get_scheduler("sm2")
+    ease = scheduler.update_ease(np.array([2.5, 2.5, 2.5, 1.3]), np.array([5, 3, np.nan, 0]))
+    assert ease == pytest.approx([2.6, 2.36, 2.5, 1.3])
+
+    # 完了日を基準に、固定スケジュールの間隔 × 易しさ係数 / 2.5 日後
+    due = scheduler.due_dates(
+        np.array(["2024-01-10", "2024-01-10"], dtype="datetime64[D]"),
+        np.array([3, 3]),
+        np.array([7, 7]),
+        np.array([5.0, 1.3])
+    )
+    assert due.tolist() == [date(2024, 1, 18), date(2024, 1, 13)]
+
+
+def test_get_scheduler_unknown():
+    """未知のスケジューラ名は ValueError"""
+    with pytest.raises(ValueError):
+        get_scheduler("unknown")
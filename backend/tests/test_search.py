@@ -0,0 +1,109 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app import crud, schemas
+from app.main import app
+
+client = TestClient(app)
+
+
+def search_ids(db, q: str, **kwargs) -> list:
+    return [row["id"] for row in crud.search_learning_items(db, q, **kwargs)[0]]
+
+
+def test_search_ranks_title_matches_first(db, create_item):
+    in_content = create_item(title="数学", content="英単語とは関係ない").id
+    in_title = create_item(title="英単語の覚え方", content="単語帳を使う").id
+    other = create_item(title="歴史", content="年号").id
+
+    assert search_ids(db, "英単語") == [in_title, in_content]
+    # 媒体名も検索対象
+    assert set(search_ids(db, "Test Source")) == {in_content, in_title, other}
+
+
+def test_search_requires_all_terms_and_filters_short_terms(db, create_item):
+    both = create_item(title="photosynthesis", content="light reaction in plants").id
+    create_item(title="photosynthesis", content="dark reaction")
+    create_item(title="cell", content="light microscope")
+
+    # 大文字小文字を区別しない
+    assert search_ids(db, "PHOTOSYNTHESIS Light") == [both]
+    # 3文字未満の検索語は部分一致の条件として加える
+    assert search_ids(db, "photosynthesis in") == [both]
+    with pytest.raises(ValueError):
+        crud.search_learning_items(db, "in 英")
+
+
+def test_search_snippet_is_escaped_and_marked(db, create_item):
+    create_item(title="HTML", content="<script>alert(1)</script> escapes & entities")
+    (result,), _ = crud.search_learning_items(db, "entities")
+    assert result["snippet"] == \
+        "&lt;script&gt;alert(1)&lt;/script&gt; escapes &amp; <mark>entities</mark>"
+    assert result["source_title"] == "Test Source"
+
+
+def test_search_quotes_fts_syntax(db, create_item):
+    item_id = create_item(title='say "hello" OR NOT', content="x").id
+    assert search_ids(db, '"hello" OR') == [item_id]
+    assert search_ids(db, "NEAR(hello") == []
+
+
+def test_search_keyset_paging(db, create_item):
+    item_ids = [
+        create_item(title=f"vocabulary {i}", content="vocabulary " * (i % 3)).id for i in range(7)
+    ]
+    pages = []
+    cursor = None
+    while True:
+        rows, cursor = crud.search_learning_items(db, "vocabulary", limit=3, cursor=cursor)
+        pages.append([row["id"] for row in rows])
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sorted(sum(pages, [])) == item_ids
+    assert sum(pages, []) == search_ids(db, "vocabulary", limit=10)
+
+
+def test_search_index_follows_updates_and_deletes(db, create_item):
+    item_id = create_item(title="mitochondria", content="powerhouse").id
+    crud.update_learning_item(db, item_id, schemas.LearningItemUpdate(title="chloroplast"))
+    assert search_ids(db, "mitochondria") == []
+    assert search_ids(db, "chloroplast") == [item_id]
+
+    crud.update_source(db, 1, schemas.SourceUpdate(title="Biology Notes"))
+    assert search_ids(db, "biology") == [item_id]
+
+    crud.delete_learning_item(db, item_id)
+    assert search_ids(db, "chloroplast") == []
+
+
+def test_search_endpoint():
+    marker = uuid.uuid4().hex
+    source = client.post("/api/sources/", json={"title": "Search Source"}).json()
+    for i in range(3):
+        response = client.post(
+            "/api/learning-items/",
+            json={"source_id": source["id"], "title": f"Search {marker} {i}", "content": "body"}
+        )
+        assert response.status_code == 201
+
+    response = client.get("/api/learning-items/search", params={"q": marker, "limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 2
+    assert data["items"][0]["snippet"].count("<mark>") == 1
+    assert data["next_cursor"] is not None
+
+    response = client.get(
+        "/api/learning-items/search",
+        params={"q": marker, "limit": 2, "cursor": data["next_cursor"]}
+    )
+    assert len(response.json()["items"]) == 1
+    assert response.json()["next_cursor"] is None
+
+
+def test_search_endpoint_rejects_bad_input():
+    assert client.get("/api/learning-items/search", params={"q": "ab"}).status_code == 400
+    assert client.get("/api/learning-items/search", params={"q": ""}).status_code == 422
+    response = client.get("/api/learning-items/search", params={"q": "abc", "cursor": "broken"})
+    assert response.status_code == 400
@@ -98,16 +98,31 @@ const api = {
     /**
      * 学習項目の一覧を取得
      */
-    async getLearningItems(limit = 100, offset = 0) {
-        const response = await fetch(
-            `${API_BASE_URL}/learning-items/?limit=${limit}&skip=${offset}`
-        );
+    async getLearningItems(limit = 100, offset = 0, filters = {}) {
+        const params = new URLSearchParams({ limit, skip: offset, ...filters });
+        const response = await fetch(`${API_BASE_URL}/learning-items/?${params}`);
         if (!response.ok) {
             throw new Error('Failed to fetch learning items');
         }
         return response.json();
     },
 
+    /**
+     * 学習項目を全文検索（関連度順、cursor で続きを取得）
+     */
+    async searchLearningItems(q, limit = 20, cursor = null) {
+        const params = new URLSearchParams({ q, limit });
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        const response = await fetch(`${API_BASE_URL}/learning-items/search?${params}`);
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.detail || 'Failed to search learning items');
+        }
+        return response.json();
+    },
+
     /**
      * 学習項目の詳細を取得
      */
@@ -164,6 +179,20 @@ const api = {
         return response.json();
     },
 
+    /**
+     * 今日の復習タスクの変更イベント（SSE）を購読
+     *
+     * handlers はイベント名（reset / task_ready / task_completed /
+     * yearly_task_created）ごとのコールバック
+     */
+    streamReviewTaskEvents(handlers) {
+        const source = new EventSource(`${API_BASE_URL}/review-tasks/stream`);
+        for (const [event, handler] of Object.entries(handlers)) {
+            source.addEventListener(event, (e) => handler(JSON.parse(e.data)));
+        }
+        return source;
+    },
+
     /**
      * 復習タスクを完了
      */
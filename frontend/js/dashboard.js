@@ -1,7 +1,13 @@
 // ダッシュボードのロジック
 
+// 表示中の今日の復習タスク（ID → タスク）
+const todayTasks = new Map();
+
+// 変更イベントの購読（未対応・切断中は操作のたびに再取得する）
+let taskEvents = null;
+
 document.addEventListener('DOMContentLoaded', () => {
-    loadTodayReviews();
+    subscribeTaskEvents();
     setupNewItemForm();
     setupRecallEditor();
 
@@ -13,54 +19,51 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 });
 
+/**
+ * 今日の復習タスクの変更イベントを購読する
+ *
+ * 接続時と reset で一覧を取得し直し、それ以外は差分だけを反映する
+ */
+function subscribeTaskEvents() {
+    if (typeof EventSource === 'undefined') {
+        loadTodayReviews();
+        return;
+    }
+
+    taskEvents = api.streamReviewTaskEvents({
+        reset: () => loadTodayReviews(),
+        task_ready: ({ tasks }) => {
+            tasks.forEach(task => todayTasks.set(task.id, task));
+            renderTodayReviews();
+        },
+        task_completed: ({ ids }) => {
+            ids.forEach(id => todayTasks.delete(id));
+            renderTodayReviews();
+        },
+        // 予定日が到来済みの次のタスクは task_ready でも届くため、ここでは何もしない
+        yearly_task_created: () => {}
+    });
+}
+
+/**
+ * 変更イベントを受信できる状態か
+ */
+function isStreaming() {
+    return taskEvents !== null && taskEvents.readyState === EventSource.OPEN;
+}
+
 /**
  * 今日の復習タスクを読み込んで表示
  */
 async function loadTodayReviews() {
     const container = document.getElementById('today-reviews');
-    const countElement = document.getElementById('review-count');
 
     try {
         const tasks = await api.getTodayReviews();
 
-        countElement.textContent = tasks.length;
-
-        if (tasks.length === 0) {
-            container.innerHTML = `
-                <div class="bg-blue-50 border border-blue-200 rounded-lg p-6 text-center">
-                    <p class="text-blue-700">今日の復習タスクはありません</p>
-                    <p class="text-sm text-blue-600 mt-2">新しい学習項目を追加しましょう！</p>
-                </div>
-            `;
-            return;
-        }
-
-        container.innerHTML = tasks.map(task => `
-            <div class="bg-white border border-gray-200 rounded-lg p-4 hover:shadow-md transition-shadow">
-                <div class="flex items-start justify-between">
-                    <div class="flex-1">
-                        <h3 class="text-lg font-semibold text-gray-900 mb-1">
-                            学習項目 #${task.learning_item_id}
-                        </h3>
-                        <p class="text-sm text-gray-600 mb-2">
-                            <span class="font-medium">${task.stage_name}</span>
-                            <span class="mx-2">•</span>
-                            予定日: ${formatDate(task.due_date)}
-                        </p>
-                        ${isPastDue(task.due_date) ?
-                            '<span class="inline-block px-2 py-1 bg-red-100 text-red-700 text-xs rounded">期限超過</span>'
-                            : ''
-                        }
-                    </div>
-                    <button
-                        onclick="completeTask(${task.id})"
-                        class="ml-4 px-4 py-2 bg-green-500 hover:bg-green-600 text-white rounded-lg transition-colors"
-                    >
-                        完了
-                    </button>
-                </div>
-            </div>
-        `).join('');
+        todayTasks.clear();
+        tasks.forEach(task => todayTasks.set(task.id, task));
+        renderTodayReviews();
     } catch (error) {
         console.error('Failed to load today reviews:', error);
         container.innerHTML = `
@@ -71,6 +74,59 @@ async function loadTodayReviews() {
     }
 }
 
+/**
+ * 表示中の今日の復習タスクを描画（予定日順）
+ */
+function renderTodayReviews() {
+    const container = document.getElementById('today-reviews');
+    const countElement = document.getElementById('review-count');
+    const tasks = [...todayTasks.values()].sort((a, b) => a.due_date.localeCompare(b.due_date));
+
+    countElement.textContent = tasks.length;
+
+    if (tasks.length === 0) {
+        container.innerHTML = `
+            <div class="bg-blue-50 border border-blue-200 rounded-lg p-6 text-center">
+                <p class="text-blue-700">今日の復習タスクはありません</p>
+                <p class="text-sm text-blue-600 mt-2">新しい学習項目を追加しましょう！</p>
+            </div>
+        `;
+        return;
+    }
+
+    container.innerHTML = tasks.map(task => `
+        <div class="bg-white border border-gray-200 rounded-lg p-4 hover:shadow-md transition-shadow">
+            <div class="flex items-start justify-between">
+                <div class="flex-1">
+                    <h3 class="text-lg font-semibold text-gray-900 mb-1">
+                        <a href="item-detail.html?id=${task.learning_item_id}" class="hover:text-blue-600">
+                            ${escapeHtml(task.learning_item_title)}
+                        </a>
+                    </h3>
+                    ${task.learning_item_content_preview ? `
+                        <p class="text-sm text-gray-500 mb-1 line-clamp-2">${escapeHtml(task.learning_item_content_preview)}</p>
+                    ` : ''}
+                    <p class="text-sm text-gray-600 mb-2">
+                        <span class="font-medium">${task.stage_name}</span>
+                        <span class="mx-2">•</span>
+                        予定日: ${formatDate(task.due_date)}
+                    </p>
+                    ${isPastDue(task.due_date) ?
+                        '<span class="inline-block px-2 py-1 bg-red-100 text-red-700 text-xs rounded">期限超過</span>'
+                        : ''
+                    }
+                </div>
+                <button
+                    onclick="completeTask(${task.id})"
+                    class="ml-4 px-4 py-2 bg-green-500 hover:bg-green-600 text-white rounded-lg transition-colors"
+                >
+                    完了
+                </button>
+            </div>
+        </div>
+    `).join('');
+}
+
 /**
  * 復習タスクを完了
  */
@@ -78,7 +134,7 @@ async function completeTask(taskId) {
     try {
         await api.completeReviewTask(taskId);
         showNotification('復習タスクを完了しました！', 'success');
-        loadTodayReviews();
+        if (!isStreaming()) loadTodayReviews();
     } catch (error) {
         console.error('Failed to complete task:', error);
         showNotification('エラー: ' + error.message, 'error');
@@ -177,7 +233,7 @@ function setupNewItemForm() {
             showNotification('学習項目を作成しました！', 'success');
             form.reset();
             modal.classList.add('hidden');
-            loadTodayReviews();
+            if (!isStreaming()) loadTodayReviews();
         } catch (error) {
             console.error('Failed to create item:', error);
             showNotification('エラー: ' + error.message, 'error');
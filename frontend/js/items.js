@@ -1,9 +1,127 @@
 // 学習項目一覧のロジック
 
+// 検索語の入力が止まってから検索するまでの時間（ミリ秒）
+const SEARCH_DEBOUNCE_MS = 300;
+
+// 全文検索に必要な検索語の最小文字数
+const SEARCH_MIN_LENGTH = 3;
+
+// 表示中の検索（続きの取得用）
+let searchState = { query: '', cursor: null };
+
 document.addEventListener('DOMContentLoaded', () => {
     loadItems();
+
+    document.getElementById('sort-select').addEventListener('change', () => {
+        document.getElementById('search-input').value = '';
+        searchState = { query: '', cursor: null };
+        document.getElementById('search-more').classList.add('hidden');
+        loadItems();
+    });
+
+    let timer = null;
+    document.getElementById('search-input').addEventListener('input', (event) => {
+        clearTimeout(timer);
+        timer = setTimeout(() => searchItems(event.target.value.trim()), SEARCH_DEBOUNCE_MS);
+    });
 });
 
+/**
+ * 学習項目を検索して表示（検索語が短ければ一覧に戻す）
+ */
+async function searchItems(query) {
+    const container = document.getElementById('items-container');
+    const countElement = document.getElementById('items-count');
+
+    if (!query.split(/\s+/).some(term => term.length >= SEARCH_MIN_LENGTH)) {
+        if (searchState.query) {
+            searchState = { query: '', cursor: null };
+            document.getElementById('search-more').classList.add('hidden');
+            loadItems();
+        }
+        return;
+    }
+
+    try {
+        const data = await api.searchLearningItems(query);
+        if (document.getElementById('search-input').value.trim() !== query) {
+            return; // 入力が変わった後の古い結果は捨てる
+        }
+        searchState = { query, cursor: data.next_cursor };
+        countElement.textContent = data.next_cursor ? `${data.items.length}+` : data.items.length;
+
+        if (data.items.length === 0) {
+            container.innerHTML = `
+                <tr>
+                    <td colspan="4" class="px-6 py-8 text-center text-gray-500">
+                        「${escapeHtml(query)}」に一致する学習項目はありません。
+                    </td>
+                </tr>
+            `;
+        } else {
+            container.innerHTML = data.items.map(renderSearchResult).join('');
+        }
+        document.getElementById('search-more').classList.toggle('hidden', !data.next_cursor);
+    } catch (error) {
+        console.error('Failed to search items:', error);
+        showNotification('エラー: ' + error.message, 'error');
+    }
+}
+
+/**
+ * 検索結果の続きを読み込む
+ */
+async function loadMoreSearchResults() {
+    const { query, cursor } = searchState;
+    if (!cursor) {
+        return;
+    }
+
+    try {
+        const data = await api.searchLearningItems(query, 20, cursor);
+        searchState = { query, cursor: data.next_cursor };
+        const container = document.getElementById('items-container');
+        container.insertAdjacentHTML('beforeend', data.items.map(renderSearchResult).join(''));
+        const countElement = document.getElementById('items-count');
+        const shown = container.querySelectorAll('tr').length;
+        countElement.textContent = data.next_cursor ? `${shown}+` : shown;
+        document.getElementById('search-more').classList.toggle('hidden', !data.next_cursor);
+    } catch (error) {
+        console.error('Failed to load more results:', error);
+        showNotification('エラー: ' + error.message, 'error');
+    }
+}
+
+/**
+ * 検索結果の行（snippet はサーバーでエスケープ済み、一致箇所は <mark>）
+ */
+function renderSearchResult(item) {
+    return `
+        <tr class="hover:bg-gray-50 transition-colors">
+            <td class="px-6 py-4 border-b border-gray-200">
+                <span class="text-gray-700 font-medium">${item.id}</span>
+            </td>
+            <td class="px-6 py-4 border-b border-gray-200">
+                <a href="item-detail.html?id=${item.id}" class="text-blue-600 hover:text-blue-800 font-semibold">
+                    ${escapeHtml(item.title)}
+                </a>
+                <p class="text-sm text-gray-600 mt-1 line-clamp-2">${item.snippet}</p>
+            </td>
+            <td class="px-6 py-4 border-b border-gray-200">
+                <span class="text-sm text-gray-600">${escapeHtml(item.source_title || '')}</span>
+            </td>
+            <td class="px-6 py-4 border-b border-gray-200 text-right">
+                <button
+                    onclick="deleteItem(${item.id}, '${escapeHtml(item.title)}')"
+                    class="px-3 py-1 bg-red-500 hover:bg-red-600 text-white text-sm rounded transition-colors"
+                >
+                    削除
+                </button>
+            </td>
+        </tr>
+    `;
+}
+
 /**
  * 学習項目一覧を読み込んで表示
  */
@@ -12,7 +130,8 @@ async function loadItems() {
     const countElement = document.getElementById('items-count');
 
     try {
-        const data = await api.getLearningItems();
+        const sort = document.getElementById('sort-select').value;
+        const data = await api.getLearningItems(100, 0, { sort });
         const items = data.items;
 
         countElement.textContent = data.total;
@@ -44,6 +163,9 @@ async function loadItems() {
                 </td>
                 <td class="px-6 py-4 border-b border-gray-200">
                     <span class="text-sm text-gray-600">${formatDateTime(item.created_at)}</span>
+                    ${item.next_due_date ? `
+                        <p class="text-xs text-gray-500 mt-1">次の復習: ${item.next_due_date}</p>
+                    ` : ''}
                 </td>
                 <td class="px-6 py-4 border-b border-gray-200 text-right">
                     <button
@@ -78,7 +200,11 @@ async function deleteItem(itemId, title) {
     try {
         await api.deleteLearningItem(itemId);
         showNotification('学習項目を削除しました', 'success');
-        loadItems();
+        if (searchState.query) {
+            searchItems(searchState.query);
+        } else {
+            loadItems();
+        }
     } catch (error) {
         console.error('Failed to delete item:', error);
         showNotification('エラー: ' + error.message, 'error');